@@ -0,0 +1,210 @@
+# accounts_import.py
+"""
+Bulk account provisioning (seasonal cashier/operator accounts before a derby).
+
+    python accounts_import.py accounts.csv [--reset] [--workers N]
+
+CSV header: username,password,role,name - role is a db value or display name
+("cashier", "Operator A", ...; default cashier), name defaults to the username.
+
+Rows are validated locally, usernames are checked against the database in one query,
+passwords are hashed across all cores in a process pool, and all valid rows go in with
+one multi-row INSERT in one transaction. With --reset, accounts that already exist get
+the new password, role and name instead of being reported as taken.
+The Accounts page "Import CSV" action uses the same functions.
+"""
+
+import csv
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import db
+
+_FIELDS = ("username", "password", "role", "name")
+# Display names accepted in the role column, e.g. "Operator A" -> operator_a
+_ROLE_ALIASES = {
+    **{r: r for r in db.ROLES_FOR_ACCOUNTS},
+    **{label.lower(): r for r, label in db.ROLE_DISPLAY.items()},
+}
+
+
+def read_csv(path: str) -> list | None:
+    """
+    Parse an import file. Returns rows [{"line", "username", "password", "role", "name"}, ...]
+    (line is the 1-based file line, for the report), or None if the file cannot be read.
+    """
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = {"username", "password"} - {(h or "").strip().lower() for h in reader.fieldnames or ()}
+            if missing:
+                print(f"Account import error:\n{path}: missing column(s) {', '.join(sorted(missing))}")
+                return None
+            rows = []
+            for record in reader:
+                record = {(k or "").strip().lower(): (v or "").strip() for k, v in record.items()}
+                if not any(record.values()):
+                    continue  # blank line
+                row = {k: record.get(k, "") for k in _FIELDS}
+                row["line"] = reader.line_num
+                rows.append(row)
+            return rows
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Account import error:\n{e}")
+        return None
+
+
+def _validate(row: dict, seen: dict) -> str | None:
+    """Same rules as CreateAccountModal. Returns an error message, or None."""
+    username, password, name = row["username"], row["password"], row["name"]
+    if len(username) < 3:
+        return "Username must be at least 3 characters"
+    if not all(c.isalnum() or c == "_" for c in username):
+        return "Username can only contain letters, numbers, underscores"
+    if username in seen:
+        return f"Duplicate username (line {seen[username]})"
+    if len(password) < 3:
+        return "Password must be at least 3 characters"
+    if name and len(name) < 2:
+        return "Name must be at least 2 characters"
+    if row["role"] and row["role"].lower() not in _ROLE_ALIASES:
+        return f"Unknown role '{row['role']}'"
+    return None
+
+
+def hash_passwords(passwords: list, workers: int = None) -> list:
+    """
+    bcrypt-hash passwords on all cores (process pool; 'spawn' so it is safe from a Qt
+    process with running threads). Falls back to threads if processes cannot start.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(passwords)))
+    if workers == 1:
+        return [db.hash_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(db.hash_password, passwords, chunksize=chunksize))
+    except (OSError, BrokenProcessPool) as e:
+        print(f"Account import: process pool unavailable, hashing in threads:\n{e}")
+        # bcrypt releases the GIL, so threads still use several cores
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(db.hash_password, passwords))
+
+
+def prepare(rows: list, reset_existing: bool = False) -> tuple:
+    """
+    Validate rows from read_csv() and look their usernames up in one query (database calls).
+    Returns (report, accounts): report maps line -> ("error", message) for rejected rows,
+    accounts are the rows to hash and insert. If the lookup fails, every valid row is
+    reported with the database error.
+    """
+    report = {}
+    seen = {}
+    valid = []
+    for row in rows:
+        error = _validate(row, seen)
+        seen.setdefault(row["username"], row["line"])
+        if error:
+            report[row["line"]] = ("error", error)
+        else:
+            valid.append(row)
+
+    # One query for the whole batch; the insert re-checks inside its transaction
+    existing = db.fetch_existing_usernames(r["username"] for r in valid)
+    if existing is None:
+        error = db.get_last_error() or "Unknown error"
+        for row in valid:
+            report[row["line"]] = ("error", error)
+        return report, []
+    accounts = []
+    for row in valid:
+        role = existing.get(row["username"])
+        if role == "super_admin" or (role is not None and not reset_existing):
+            report[row["line"]] = ("error", "Username already exists")
+        else:
+            accounts.append(row)
+    return report, accounts
+
+
+def insert(rows: list, report: dict, accounts: list, hashes: list, reset_existing: bool = False) -> list:
+    """
+    Insert the accounts from prepare() with their password hashes in one transaction
+    (database call). Returns the per-row report of provision().
+    """
+    report = dict(report)
+    if accounts:
+        outcome = db.bulk_create_users(
+            [
+                {
+                    "username": r["username"],
+                    "password_hash": h,
+                    "role": _ROLE_ALIASES.get(r["role"].lower(), "cashier"),
+                    "name": r["name"] or r["username"],
+                }
+                for r, h in zip(accounts, hashes)
+            ],
+            reset_existing=reset_existing,
+        )
+        for row in accounts:
+            status = outcome.get(row["username"]) if outcome is not None else None
+            if status is None:
+                report[row["line"]] = ("error", db.get_last_error() or "Unknown error")
+            elif status == "exists":
+                report[row["line"]] = ("error", "Username already exists")
+            else:
+                report[row["line"]] = (status, None)
+
+    return [
+        {"line": row["line"], "username": row["username"],
+         "status": report[row["line"]][0], "error": report[row["line"]][1]}
+        for row in rows
+    ]
+
+
+def provision(rows: list, reset_existing: bool = False, workers: int = None) -> list:
+    """
+    Validate, hash and insert rows from read_csv(). Returns the per-row report
+    [{"line", "username", "status": "created" | "reset" | "error", "error"}, ...] in file order.
+    If the lookup or the insert fails, every valid row is reported with the database error
+    (nothing is written).
+    """
+    report, accounts = prepare(rows, reset_existing)
+    hashes = hash_passwords([r["password"] for r in accounts], workers) if accounts else []
+    return insert(rows, report, accounts, hashes, reset_existing)
+
+
+def summarize(report: list) -> str:
+    counts = {s: sum(1 for r in report if r["status"] == s) for s in ("created", "reset", "error")}
+    return f"{counts['created']} created, {counts['reset']} reset, {counts['error']} failed"
+
+
+def format_errors(report: list) -> str:
+    return "\n".join(f"line {r['line']} ({r['username'] or '-'}): {r['error']}"
+                     for r in report if r["status"] == "error")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    reset = "--reset" in args
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    paths = [a for a in args if a != "--reset"]
+    if len(paths) != 1:
+        print(__doc__)
+        sys.exit(2)
+    rows = read_csv(paths[0])
+    if rows is None:
+        sys.exit(1)
+    result = provision(rows, reset_existing=reset, workers=workers)
+    for entry in result:
+        detail = entry["error"] or entry["status"]
+        print(f"line {entry['line']:>5}  {entry['username'] or '-':<24} {detail}")
+    print(summarize(result))
+    db.close_pool()
+    sys.exit(1 if any(r["status"] == "error" for r in result) else 0)
@@ -0,0 +1 @@
+# Background services: query worker pool and other non-UI helpers
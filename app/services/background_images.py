@@ -0,0 +1,248 @@
+# app/services/background_images.py
+"""
+Full-window background images (login, logout) - decoded and scaled off the GUI thread.
+
+Each request is for a source file at a label's size in device pixels. Scaled variants
+are kept in memory, and also written to a pre-scaled, pre-converted cache under the Qt
+cache dir (QStandardPaths.CacheLocation/backgrounds), keyed by the source's content hash
+and the geometry. Later launches read that file directly and skip PNG decoding (and the
+PIL fallback for formats Qt cannot read).
+
+Usage:
+    background_service().apply(self._bg_label, _BG_PATH, self.size())
+"""
+
+from __future__ import annotations
+import hashlib
+import io
+import os
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import shiboken6
+from PySide6.QtCore import QObject, QSize, QStandardPaths, Qt, Signal, Slot
+from PySide6.QtGui import QImage, QPixmap
+
+from app.services.startup_trace import startup_trace
+
+# Raw cache file: magic, width, height, bytes per line, QImage.Format
+_HEADER = struct.Struct("<4sIIII")
+_MAGIC = b"BGI1"
+
+
+def _read_raw(path: str) -> Optional[QImage]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, w, h, bpl, fmt = _HEADER.unpack_from(data)
+    if magic != _MAGIC or len(data) != _HEADER.size + bpl * h:
+        return None
+    # copy() detaches the image from the bytes buffer
+    return QImage(data[_HEADER.size:], w, h, bpl, QImage.Format(fmt)).copy()
+
+
+def _write_raw(path: str, img: QImage) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, img.width(), img.height(), img.bytesPerLine(), img.format().value))
+            f.write(bytes(img.constBits()))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Background cache write error:\n{e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _decode(data: bytes) -> Optional[QImage]:
+    img = QImage()
+    img.loadFromData(data)
+    if img.isNull():
+        try:
+            from PIL import Image
+            pil_img = Image.open(io.BytesIO(data)).convert("RGBA")
+            img = QImage(pil_img.tobytes(), pil_img.width, pil_img.height,
+                         QImage.Format.Format_RGBA8888).copy()
+        except (ImportError, ValueError, OSError, RuntimeError):
+            return None
+    return None if img.isNull() else img
+
+
+class BackgroundImageService(QObject):
+    """Scaled background pixmaps: memory LRU -> disk cache -> decode, on one worker thread."""
+
+    # Emitted from the worker thread; delivered queued on the GUI thread
+    _loaded = Signal(object, object)  # (key, QImage or None)
+
+    # Scaled pixmaps kept in memory (a few window sizes x login/logout)
+    _MAX_VARIANTS = 6
+    # Cached geometries kept on disk per source
+    _MAX_DISK_VARIANTS = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        self._cache_dir = os.path.join(base, "backgrounds") if base else None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background-images")
+        self._lock = threading.Lock()
+        self._variants: "OrderedDict[tuple, QPixmap]" = OrderedDict()  # GUI thread only
+        self._waiting: Dict[tuple, List[Callable]] = {}  # key -> callbacks (guarded by _lock)
+        self._label_requests: Dict[int, Tuple[tuple, Callable]] = {}  # id(label) -> pending request
+        self._sources: Dict[str, tuple] = {}  # path -> ((mtime, size), digest, decoded QImage or None)
+        self._loaded.connect(self._on_loaded)
+
+    def apply(self, label, path, size: QSize) -> None:
+        """
+        Show path scaled to size on label. Set immediately if the variant is in memory;
+        otherwise the label keeps its current pixmap until the worker delivers.
+        A newer request for the same label supersedes a pending one.
+        """
+        label_id = id(label)
+
+        def show(pix, label=label, label_id=label_id):
+            if self._label_requests.get(label_id, (None, None))[1] is show:
+                del self._label_requests[label_id]
+            if pix is not None and shiboken6.isValid(label):
+                label.setPixmap(pix)
+
+        previous = self._label_requests.pop(label_id, None)
+        if previous is not None:
+            self._discard_callback(*previous)
+        key = self._key(path, size, label.devicePixelRatioF())
+        if key in self._variants:
+            self._variants.move_to_end(key)
+            label.setPixmap(self._variants[key])
+            return
+        self._label_requests[label_id] = (key, show)
+        self._request(key, show)
+
+    def prefetch(self, path, size: QSize, dpr: float = 1.0) -> None:
+        """Prepare a variant ahead of time (e.g. the logout background while logged in)."""
+        key = self._key(path, size, dpr)
+        if key not in self._variants:
+            self._request(key, lambda pix: None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _key(path, size: QSize, dpr: float) -> tuple:
+        return (str(path), max(1, round(size.width() * dpr)), max(1, round(size.height() * dpr)), dpr)
+
+    def _request(self, key: tuple, callback: Callable) -> None:
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if waiting is not None:
+                waiting.append(callback)
+                return
+            self._waiting[key] = [callback]
+        self._executor.submit(self._load, key)
+
+    def _discard_callback(self, key: tuple, callback: Callable) -> None:
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if waiting and callback in waiting:
+                waiting.remove(callback)
+
+    # ---------- worker thread ----------
+
+    def _load(self, key: tuple) -> None:
+        img = None
+        try:
+            with self._lock:
+                wanted = bool(self._waiting.get(key))
+            if wanted:
+                with startup_trace().phase(f"background_image:{os.path.basename(key[0])}"):
+                    img = self._scaled_image(key)
+        except Exception as e:
+            print(f"Background image error:\n{e}")
+        self._loaded.emit(key, img)
+
+    def _scaled_image(self, key: tuple) -> Optional[QImage]:
+        path, w, h, _ = key
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._sources.get(path)
+        data = None
+        if entry is None or entry[0] != stamp:
+            with open(path, "rb") as f:
+                data = f.read()
+            entry = (stamp, hashlib.sha256(data).hexdigest()[:24], None)
+            self._sources[path] = entry
+        digest = entry[1]
+
+        cache_file = None
+        if self._cache_dir:
+            cache_file = os.path.join(self._cache_dir, f"{digest}_{w}x{h}.bgi")
+            cached = _read_raw(cache_file)
+            if cached is not None:
+                return cached
+
+        source = entry[2]
+        if source is None:
+            if data is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+            source = _decode(data)
+            if source is None:
+                return None
+            self._sources[path] = (stamp, digest, source)
+        # Same stretch-to-fill as QLabel.setScaledContents, done once instead of on every paint
+        img = source.scaled(w, h, Qt.AspectRatioMode.IgnoreAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation)
+        img = img.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        if cache_file:
+            _write_raw(cache_file, img)
+            self._prune_disk(digest)
+        return img
+
+    def _prune_disk(self, digest: str) -> None:
+        """Keep the newest _MAX_DISK_VARIANTS cached geometries of a source."""
+        try:
+            files = [os.path.join(self._cache_dir, f) for f in os.listdir(self._cache_dir)
+                     if f.startswith(digest + "_") and f.endswith(".bgi")]
+            files.sort(key=os.path.getmtime, reverse=True)
+            for old in files[self._MAX_DISK_VARIANTS:]:
+                os.remove(old)
+        except OSError:
+            pass
+
+    # ---------- GUI thread ----------
+
+    @Slot(object, object)
+    def _on_loaded(self, key: tuple, img: Optional[QImage]):
+        with self._lock:
+            callbacks = self._waiting.pop(key, [])
+        pix = None
+        if img is not None:
+            pix = QPixmap.fromImage(img)
+            pix.setDevicePixelRatio(key[3])
+            self._variants[key] = pix
+            while len(self._variants) > self._MAX_VARIANTS:
+                self._variants.popitem(last=False)
+        for callback in callbacks:
+            callback(pix)
+
+
+_service: Optional[BackgroundImageService] = None
+
+
+def background_service() -> BackgroundImageService:
+    """Return the process-wide BackgroundImageService (created on first use, on the GUI thread)."""
+    global _service
+    if _service is None:
+        _service = BackgroundImageService()
+    return _service
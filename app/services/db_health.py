@@ -0,0 +1,60 @@
+# app/services/db_health.py
+"""
+Qt side of db.connection_health(): re-emits the circuit breaker's online/offline changes
+as signals on the GUI thread.
+
+Usage:
+    monitor = connection_monitor()
+    monitor.status_changed.connect(self._on_db_status)   # show/hide the offline banner
+    monitor.came_online.connect(self._load_users)          # reload after an outage
+"""
+
+from __future__ import annotations
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+import db
+
+
+class ConnectionMonitor(QObject):
+    status_changed = Signal(bool)  # True = online
+    went_offline = Signal(str)  # last connect error
+    came_online = Signal()  # connectivity restored (reload data)
+
+    # Emitted from whichever thread saw the change; delivered queued on the GUI thread
+    _changed = Signal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._changed.connect(self._on_changed)
+        db.connection_health().add_listener(self._changed.emit)
+
+    def is_online(self) -> bool:
+        return db.is_online()
+
+    def state(self) -> dict:
+        return db.connection_health().state()
+
+    def retry_now(self) -> None:
+        """Probe the server immediately instead of waiting out the backoff."""
+        db.connection_health().probe_now()
+
+    @Slot(bool)
+    def _on_changed(self, online: bool):
+        self.status_changed.emit(online)
+        if online:
+            self.came_online.emit()
+        else:
+            self.went_offline.emit(db.connection_health().state()["last_error"] or "")
+
+
+_monitor: Optional[ConnectionMonitor] = None
+
+
+def connection_monitor() -> ConnectionMonitor:
+    """Return the process-wide ConnectionMonitor (created on first use, on the GUI thread)."""
+    global _monitor
+    if _monitor is None:
+        _monitor = ConnectionMonitor()
+    return _monitor
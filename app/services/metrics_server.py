@@ -0,0 +1,256 @@
+# app/services/metrics_server.py
+"""
+Optional per-terminal metrics endpoint for LAN monitoring, in Prometheus text format:
+
+    http://<terminal>:<config.METRICS_PORT>/metrics
+
+Exposes db query latency histograms (db.query_stats()), pool usage, server reachability,
+Qt event-loop lag, items rendered per view, fight state notification delivery delay,
+resident memory and the logged-in user/role.
+
+Off by default (config.METRICS_ENABLED). While off, nothing is started and the recording
+calls below return after one attribute check. While on, HTTP requests are served on a
+background thread that only reads thread-safe snapshots - the Qt loop is never waited on.
+
+Usage (GUI code; import it only when config.METRICS_ENABLED):
+    metrics().set_rendered("cashier_cards", len(ordered_ids))
+    metrics().set_session(user)   # on login; set_session(None) on logout
+"""
+
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, QTimer
+
+import config
+import db
+import fight_state
+from query_stats import LATENCY_BUCKETS_MS
+from app.services.ui_watchdog import ui_watchdog
+
+_PREFIX = "offline_lan"
+# Event-loop lag probe: a GUI timer that should fire every _LAG_INTERVAL_MS
+_LAG_INTERVAL_MS = 250
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, without optional dependencies."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        import resource  # macOS: peak, not current (ru_maxrss is in bytes there)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError, AttributeError, ImportError):
+        return None
+
+
+class MetricsServer(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._rendered: Dict[str, int] = {}
+        self._session: Optional[dict] = None
+        self._lag_ms = 0.0
+        self._lag_max_ms = 0.0  # since the previous scrape
+        self._lag_expected = None
+        self._lag_timer: Optional[QTimer] = None
+        self._httpd = None  # http.server.ThreadingHTTPServer while serving
+        self._started = time.time()
+
+    # ---------- recording (GUI thread; no-ops while disabled) ----------
+
+    def set_rendered(self, view: str, count: int) -> None:
+        """Number of items (cards, rows) currently rendered by a view."""
+        if self.enabled:
+            with self._lock:
+                self._rendered[view] = count
+
+    def set_session(self, user: Optional[dict]) -> None:
+        """Logged-in user (None after logout)."""
+        if self.enabled:
+            self._session = dict(user) if user else None
+
+    # ---------- lifecycle ----------
+
+    def start(self, host: str = None, port: int = None) -> bool:
+        """Serve /metrics and start the loop-lag probe. Call on the GUI thread. Returns False on bind errors."""
+        if self._httpd is not None:
+            return True
+        # Imported here so a disabled endpoint costs nothing at startup
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        host = config.METRICS_BIND if host is None else host
+        port = config.METRICS_PORT if port is None else port
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass  # scraped every few seconds; do not flood stdout
+
+        try:
+            self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            print(f"Metrics server error:\n{e}")
+            return False
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="metrics-http", daemon=True).start()
+        self.enabled = True
+
+        self._lag_timer = QTimer(self)
+        self._lag_timer.setInterval(_LAG_INTERVAL_MS)
+        self._lag_timer.timeout.connect(self._on_lag_tick)
+        self._lag_expected = time.perf_counter() + _LAG_INTERVAL_MS / 1000
+        self._lag_timer.start()
+        print(f"Metrics on http://{host or '0.0.0.0'}:{self._httpd.server_address[1]}/metrics")
+        return True
+
+    def stop(self) -> None:
+        self.enabled = False
+        if self._lag_timer is not None:
+            self._lag_timer.stop()
+            self._lag_timer = None
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def _on_lag_tick(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._lag_expected) * 1000)
+        self._lag_expected = now + _LAG_INTERVAL_MS / 1000
+        with self._lock:
+            self._lag_ms = lag_ms
+            self._lag_max_ms = max(self._lag_max_ms, lag_ms)
+
+    # ---------- exposition (HTTP thread) ----------
+
+    def render(self) -> str:
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            full = f"{_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{full}{suffix}{_labels(**labels)} {value}")
+
+        # DB query latency per fingerprint (cumulative buckets, seconds)
+        hist_samples, error_samples, info_samples = [], [], []
+        for fp_id, text, hist, errors in db.query_stats().histograms():
+            cumulative = 0
+            for bound, n in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], hist.buckets):
+                cumulative += n
+                le = "+Inf" if bound == "+Inf" else repr(bound / 1000)
+                hist_samples.append(("_bucket", {"fingerprint": fp_id, "le": le}, cumulative))
+            hist_samples.append(("_sum", {"fingerprint": fp_id}, round(hist.sum_ms / 1000, 6)))
+            hist_samples.append(("_count", {"fingerprint": fp_id}, hist.count))
+            error_samples.append(("", {"fingerprint": fp_id}, errors))
+            info_samples.append(("", {"fingerprint": fp_id, "query": text[:200]}, 1))
+        metric("db_query_duration_seconds", "histogram", "Query time including pool checkout.", hist_samples)
+        metric("db_query_errors_total", "counter", "Failed queries.", error_samples)
+        metric("db_query_info", "gauge", "Normalized query text per fingerprint.", info_samples)
+
+        pool = db.pool_stats()
+        metric("db_pool_connections", "gauge", "Pooled connections by state.", [
+            ("", {"state": "idle"}, pool["idle"]), ("", {"state": "in_use"}, pool["in_use"]),
+        ])
+        metric("db_pool_max_connections", "gauge", "Pool size limit.", [("", {}, pool["max_size"])])
+        for key in ("created", "reused", "discarded", "evicted", "waits", "timeouts", "connect_failures"):
+            metric(f"db_pool_{key}_total", "counter", f"Pool {key.replace('_', ' ')}.", [("", {}, pool[key])])
+        health = db.connection_health().state()
+        metric("db_online", "gauge", "1 if the database server is reachable.", [("", {}, int(health["online"]))])
+        metric("db_fast_fails_total", "counter", "Calls failed immediately while offline.",
+               [("", {}, health["fast_fails"])])
+
+        with self._lock:
+            lag_ms, lag_max_ms = self._lag_ms, self._lag_max_ms
+            self._lag_max_ms = lag_ms
+        metric("ui_loop_lag_seconds", "gauge", "Latest Qt event-loop timer delay.", [("", {}, round(lag_ms / 1000, 4))])
+        metric("ui_loop_lag_max_seconds", "gauge", "Largest event-loop delay since the previous scrape.",
+               [("", {}, round(lag_max_ms / 1000, 4))])
+        watchdog = ui_watchdog()
+        if watchdog.enabled:
+            metric("ui_stalls_total", "counter", "Event-loop stalls caught by the UI watchdog.",
+                   [("", {}, watchdog.stall_count())])
+        delivery = fight_state.delivery_stats().histogram()
+        delivery_samples, cumulative = [], 0
+        for bound, n in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], delivery.buckets):
+            cumulative += n
+            delivery_samples.append(("_bucket", {"le": "+Inf" if bound == "+Inf" else repr(bound / 1000)}, cumulative))
+        delivery_samples.append(("_sum", {}, round(delivery.sum_ms / 1000, 6)))
+        delivery_samples.append(("_count", {}, delivery.count))
+        metric("fight_state_delivery_seconds", "histogram",
+               "Server commit to this terminal of fight/event transitions (includes clock offset).", delivery_samples)
+        with self._lock:
+            rendered = dict(self._rendered)
+        metric("ui_items_rendered", "gauge", "Items currently rendered per view.",
+               [("", {"view": view}, n) for view, n in sorted(rendered.items())])
+
+        rss = _rss_bytes()
+        if rss is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory.", [("", {}, rss)])
+        metric("process_uptime_seconds", "gauge", "Seconds since the metrics server started.",
+               [("", {}, round(time.time() - self._started, 1))])
+
+        session = self._session
+        metric("session_info", "gauge", "Logged-in user on this terminal.", [(
+            "", {"terminal": db.terminal_id(), "user": session.get("username", "") if session else "",
+                 "role": session.get("role", "") if session else ""}, 1 if session else 0,
+        )])
+        return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[MetricsServer] = None
+
+
+def metrics() -> MetricsServer:
+    """Return the process-wide MetricsServer (created on first use, on the GUI thread)."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsServer()
+    return _metrics
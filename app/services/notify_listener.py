@@ -0,0 +1,175 @@
+# app/services/notify_listener.py
+"""
+PostgreSQL LISTEN/NOTIFY listener - a dedicated thread holds one connection
+(outside the query pool), waits for notifications and re-emits them as Qt
+signals on the GUI thread.
+
+Usage:
+    listener = notification_listener()
+    listener.user_changed.connect(self._on_user_changed)
+    listener.fight_state_changed.connect(self._on_fight_state)
+    listener.start()
+
+Notifications sent while the listener was disconnected are lost; connect to
+`reconnected` and reload from the database when it fires.
+"""
+
+from __future__ import annotations
+import json
+import select
+import socket
+import threading
+from typing import Optional, Set
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+import db
+import fight_state
+
+
+class NotificationListener(QObject):
+    """Listens on db.USER_CHANGES_CHANNEL and fight_state.FIGHT_STATE_CHANNEL (plus any extra channels) on a background thread."""
+
+    notified = Signal(str, object)  # (channel, payload dict or raw string)
+    user_changed = Signal(dict)  # payloads on db.USER_CHANGES_CHANNEL
+    fight_state_changed = Signal(dict)  # payloads on fight_state.FIGHT_STATE_CHANNEL (fight/event transitions)
+    reconnected = Signal()  # connection re-established after a failure (reload data)
+
+    # Emitted from the listener thread; delivered queued on the GUI thread
+    _received = Signal(str, str)
+    _connection_restored = Signal()
+
+    # Poll timeout (seconds); stop() and listen() also wake the thread immediately.
+    # A poll that times out pings the server, so a dead connection is replaced.
+    _POLL_INTERVAL = 5.0
+    _RETRY_MIN = 1.0
+    _RETRY_MAX = 30.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._channels: Set[str] = {db.USER_CHANGES_CHANNEL, fight_state.FIGHT_STATE_CHANNEL}
+        self._channels_lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set by stop() and when the db circuit breaker closes: retry the connect now
+        self._retry_now = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Self-pipe so stop()/listen() can interrupt select() without waiting for the timeout
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._received.connect(self._dispatch)
+        self._connection_restored.connect(self.reconnected.emit)
+        db.connection_health().add_listener(self._on_db_status)
+
+    def listen(self, channel: str) -> None:
+        """Subscribe to another channel (the listener thread picks it up immediately)."""
+        with self._channels_lock:
+            self._channels.add(channel)
+        self._wake()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-notify-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._retry_now.set()
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _on_db_status(self, online: bool):
+        # Any thread: skip the remaining backoff once the server is reachable again
+        if online:
+            self._retry_now.set()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"x")
+        except OSError:
+            pass
+
+    def _run(self):
+        retry = self._RETRY_MIN
+        had_connection = False
+        while not self._stop.is_set():
+            self._retry_now.clear()
+            conn = db.get_connection()
+            if conn is None:
+                self._retry_now.wait(retry)
+                retry = min(retry * 2, self._RETRY_MAX)
+                continue
+            retry = self._RETRY_MIN
+            if had_connection:
+                self._connection_restored.emit()
+            had_connection = True
+            try:
+                self._listen_loop(conn)
+            except Exception as e:
+                print(f"DB notify listener error:\n{e}")
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _listen_loop(self, conn):
+        conn.autocommit = True
+        subscribed: Set[str] = set()
+        while not self._stop.is_set():
+            with self._channels_lock:
+                missing = self._channels - subscribed
+            if missing:
+                with conn.cursor() as cur:
+                    for channel in missing:
+                        cur.execute(f'LISTEN "{channel}";')
+                subscribed |= missing
+            ready, _, _ = select.select([conn, self._wake_r], [], [], self._POLL_INTERVAL)
+            if self._wake_r in ready:
+                try:
+                    while self._wake_r.recv(64):
+                        pass
+                except BlockingIOError:
+                    pass
+            if conn in ready:
+                conn.poll()
+            elif not ready:
+                # Quiet for a whole interval: check the connection is still alive (raises if
+                # not; _run reconnects and emits reconnected). Keepalives bound the wait.
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+            while conn.notifies:
+                n = conn.notifies.pop(0)
+                if n.channel == fight_state.FIGHT_STATE_CHANNEL:
+                    # Timed here, before the hop to the GUI thread
+                    fight_state.delivery_stats().record(n.payload)
+                self._received.emit(n.channel, n.payload)
+
+    @Slot(str, str)
+    def _dispatch(self, channel: str, payload: str):
+        try:
+            data = json.loads(payload) if payload else {}
+        except ValueError:
+            data = payload
+        self.notified.emit(channel, data)
+        if channel == db.USER_CHANGES_CHANNEL and isinstance(data, dict):
+            self.user_changed.emit(data)
+        elif channel == fight_state.FIGHT_STATE_CHANNEL and isinstance(data, dict):
+            self.fight_state_changed.emit(data)
+
+
+_listener: Optional[NotificationListener] = None
+
+
+def notification_listener() -> NotificationListener:
+    """Return the process-wide NotificationListener (created on first use, on the GUI thread)."""
+    global _listener
+    if _listener is None:
+        _listener = NotificationListener()
+    return _listener
@@ -0,0 +1,109 @@
+# app/services/prefetch.py
+"""
+Speculative prefetch of query results, keyed by the call (function + arguments).
+
+Login starts the first page's query while the password is still being verified; the
+page then adopts that result (or the in-flight call) instead of issuing its own:
+
+    prefetch_cache().start(db.fetch_cashier_overview, None)       # login, before bcrypt finishes
+    if not prefetch_cache().take(self, self._on_loaded, db.fetch_cashier_overview, None):
+        ...submit the query as usual...
+
+Results are kept only briefly (MAX_AGE_S) and are dropped with clear() if the
+speculation turns out wrong (e.g. the password was rejected).
+"""
+
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Optional
+
+import shiboken6
+
+from app.services.query_service import query_service
+
+# Prefetched results older than this are ignored (the page queries fresh data)
+MAX_AGE_S = 30.0
+
+
+class _Entry:
+    __slots__ = ("started", "done", "failed", "result", "waiters")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.done = False
+        self.failed = False
+        self.result = None
+        self.waiters = []  # (owner, callback, on_error) taken before the call finished
+
+
+class PrefetchCache:
+    """GUI-thread only."""
+
+    def __init__(self):
+        self._entries: Dict[tuple, _Entry] = {}
+
+    def start(self, fn: Callable, *args) -> None:
+        """Run fn(*args) on the query pool unless the same call is already pending or fresh."""
+        key = (fn, args)
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry):
+            return
+        entry = _Entry()
+        self._entries[key] = entry
+        future = query_service().submit(fn, *args)
+        future.succeeded.connect(lambda result: self._resolve(key, entry, result, False))
+        future.failed.connect(lambda err: self._resolve(key, entry, None, True))
+
+    def take(self, owner, callback: Callable, fn: Callable, *args, on_error: Optional[Callable] = None) -> bool:
+        """
+        Hand the prefetched result of fn(*args) to callback: now if finished, else when it
+        arrives (unless owner has been deleted by then; if the prefetch fails, the call is
+        re-run for owner with the usual callback/on_error). Returns False if there is
+        nothing usable; the caller should then run the query itself. Each result is taken once.
+        """
+        entry = self._entries.pop((fn, args), None)
+        if entry is None or self._expired(entry) or entry.failed:
+            return False
+        if entry.done:
+            callback(entry.result)
+        else:
+            entry.waiters.append((owner, callback, on_error))
+        return True
+
+    def clear(self) -> None:
+        """Drop every prefetched result (pending calls finish and are discarded)."""
+        for entry in self._entries.values():
+            entry.waiters.clear()
+        self._entries.clear()
+
+    @staticmethod
+    def _expired(entry: _Entry) -> bool:
+        return time.monotonic() - entry.started > MAX_AGE_S
+
+    def _resolve(self, key: tuple, entry: _Entry, result, failed: bool) -> None:
+        entry.done = True
+        entry.failed = failed
+        entry.result = result
+        waiters, entry.waiters = entry.waiters, []
+        fn, args = key
+        for owner, callback, on_error in waiters:
+            if owner is not None and not shiboken6.isValid(owner):
+                continue
+            if not failed:
+                callback(result)
+                continue
+            future = query_service().submit(fn, *args, owner=owner)
+            future.succeeded.connect(callback)
+            if on_error:
+                future.failed.connect(on_error)
+
+
+_cache: Optional[PrefetchCache] = None
+
+
+def prefetch_cache() -> PrefetchCache:
+    """Return the process-wide PrefetchCache."""
+    global _cache
+    if _cache is None:
+        _cache = PrefetchCache()
+    return _cache
@@ -0,0 +1,175 @@
+# app/services/query_service.py
+"""
+Async query service - runs db.py calls on a QThreadPool and delivers results
+on the GUI thread via Qt signals, so no SQL runs on the event loop.
+
+Usage:
+    future = query_service().submit(db.fetch_cashiers, owner=self)
+    future.succeeded.connect(self._on_cashiers_loaded)
+    future.failed.connect(self._on_load_failed)
+
+Futures submitted with an owner can be cancelled together (e.g. when a page is
+hidden) with query_service().cancel_owner(self). A cancelled future never emits.
+
+CPU-bound calls (bcrypt hashing/verification) go to cpu_service() instead: a second
+pool of the same kind, so a slow hash never holds a worker (and connection slot)
+that a query could use. bcrypt releases the GIL, so these threads hash in parallel
+with the GUI and with each other.
+"""
+
+from __future__ import annotations
+import os
+import threading
+import traceback
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+import config
+
+
+class QueryFuture(QObject):
+    """Handle for a submitted call. Signals are always emitted on the GUI thread."""
+
+    succeeded = Signal(object)  # result of the call
+    failed = Signal(str)  # error message
+    finished = Signal()  # after succeeded/failed (not emitted when cancelled)
+
+    def __init__(self, owner_key: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        self.owner_key = owner_key
+        self._cancelled = threading.Event()
+        self._done = False
+        self._result = None
+        self._error: Optional[str] = None
+
+    def cancel(self) -> None:
+        """Cancel the call. If it has not started it is skipped; otherwise its result is dropped."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self):
+        """Result of a finished call (None if it failed or is still running)."""
+        return self._result
+
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def then(self, on_result: Callable, on_error: Optional[Callable] = None) -> "QueryFuture":
+        """Connect result/error callbacks; returns self for chaining."""
+        self.succeeded.connect(on_result)
+        if on_error:
+            self.failed.connect(on_error)
+        return self
+
+
+class _QueryRunnable(QRunnable):
+    """Runs one call on a pool thread and hands the outcome back to the service."""
+
+    def __init__(self, service: "QueryService", future: QueryFuture, fn: Callable, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._service = service
+        self._future = future
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def run(self):
+        if self._future.is_cancelled():
+            self._service._completed.emit(self._future, None, None)
+            return
+        try:
+            result = self._fn(*self._args, **self._kwargs)
+            self._service._completed.emit(self._future, result, None)
+        except Exception as e:
+            print(f"Query worker error:\n{traceback.format_exc()}")
+            self._service._completed.emit(self._future, None, str(e) or e.__class__.__name__)
+
+
+class QueryService(QObject):
+    """QThreadPool-backed executor for database calls."""
+
+    # (future, result, error) - emitted from pool threads, delivered queued on the GUI thread
+    _completed = Signal(object, object, object)
+
+    # Service-wide notifications (GUI thread)
+    query_failed = Signal(str)
+
+    def __init__(self, max_threads: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        # Never run more workers than the db connection pool can serve
+        self._pool.setMaxThreadCount(max_threads or min(4, config.DB_POOL_MAX))
+        self._pending: Dict[int, List[QueryFuture]] = {}
+        self._completed.connect(self._on_completed)
+
+    def submit(self, fn: Callable, *args, owner: Optional[object] = None, **kwargs) -> QueryFuture:
+        """Run fn(*args, **kwargs) on a worker thread. Must be called from the GUI thread."""
+        owner_key = id(owner) if owner is not None else None
+        future = QueryFuture(owner_key, parent=self)
+        if owner_key is not None:
+            self._pending.setdefault(owner_key, []).append(future)
+        self._pool.start(_QueryRunnable(self, future, fn, args, kwargs))
+        return future
+
+    def cancel_owner(self, owner: object) -> int:
+        """Cancel all outstanding calls submitted with this owner. Returns how many were cancelled."""
+        futures = self._pending.pop(id(owner), [])
+        for f in futures:
+            f.cancel()
+        return len(futures)
+
+    def active_count(self) -> int:
+        return self._pool.activeThreadCount()
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Block until all workers finish (used on shutdown)."""
+        return self._pool.waitForDone(msecs)
+
+    @Slot(object, object, object)
+    def _on_completed(self, future: QueryFuture, result, error):
+        if future.owner_key is not None:
+            pending = self._pending.get(future.owner_key)
+            if pending and future in pending:
+                pending.remove(future)
+                if not pending:
+                    del self._pending[future.owner_key]
+        future._done = True
+        if not future.is_cancelled():
+            future._result = result
+            future._error = error
+            if error is None:
+                future.succeeded.emit(result)
+            else:
+                future.failed.emit(error)
+                self.query_failed.emit(error)
+            future.finished.emit()
+        future.deleteLater()
+
+
+_service: Optional[QueryService] = None
+
+
+def query_service() -> QueryService:
+    """Return the process-wide QueryService (created on first use, on the GUI thread)."""
+    global _service
+    if _service is None:
+        _service = QueryService()
+    return _service
+
+
+_cpu_service: Optional[QueryService] = None
+
+
+def cpu_service() -> QueryService:
+    """Return the process-wide QueryService for CPU-bound calls such as db.hash_password."""
+    global _cpu_service
+    if _cpu_service is None:
+        _cpu_service = QueryService(max_threads=max(1, min(4, (os.cpu_count() or 2) // 2)))
+    return _cpu_service
@@ -0,0 +1,195 @@
+# app/services/startup_trace.py
+"""
+Startup-time trace for main.py, enabled with --profile-startup[=PATH].
+
+Records named phases (imports, DB check, login window build, asset decode, first paint),
+the inclusive time of every first-time module import, and writes a JSON report when
+the first window has painted:
+
+    python main.py --profile-startup                 -> startup-profile.json
+    python main.py --profile-startup=/tmp/cold.json
+
+Disabled (the default), every call is a cheap no-op. Does not import Qt at module level,
+so it can time the Qt import itself.
+"""
+
+from __future__ import annotations
+import builtins
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+FLAG = "--profile-startup"
+DEFAULT_REPORT = "startup-profile.json"
+# After first paint, wait up to this long for background phases (asset decode) to finish
+SETTLE_TIMEOUT_MS = 3000
+
+
+class StartupTrace:
+    def __init__(self):
+        self.enabled = False
+        self.report_path: Optional[str] = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases = []
+        self._marks = {}
+        self._imports = {}  # module -> inclusive ms of its first import
+        self._import_depth = threading.local()
+        self._orig_import = None
+        self._written = False
+        self._open_phases = 0
+
+    def configure(self, argv: list) -> None:
+        """Enable from argv (the flag is removed so Qt does not see it)."""
+        for arg in list(argv):
+            if arg == FLAG or arg.startswith(FLAG + "="):
+                argv.remove(arg)
+                self.enabled = True
+                self.report_path = arg.partition("=")[2] or DEFAULT_REPORT
+        if self.enabled:
+            self._install_import_hook()
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as a named phase."""
+        if not self.enabled:
+            yield
+            return
+        start = self._now_ms()
+        with self._lock:
+            self._open_phases += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._open_phases -= 1
+            self.add_phase(name, start, self._now_ms())
+
+    def add_phase(self, name: str, start_ms: float, end_ms: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._phases.append({
+                "name": name,
+                "start_ms": round(start_ms, 2),
+                "duration_ms": round(end_ms - start_ms, 2),
+                "thread": threading.current_thread().name,
+            })
+
+    def mark(self, name: str) -> None:
+        """Record a point in time (first occurrence wins)."""
+        if self.enabled:
+            with self._lock:
+                self._marks.setdefault(name, round(self._now_ms(), 2))
+
+    def watch_first_paint(self, widget, name: str = "first_paint") -> None:
+        """Mark the first Paint event of widget; write the report once background phases finish."""
+        if not self.enabled:
+            return
+        from PySide6.QtCore import QEvent, QObject, QTimer
+
+        trace = self
+
+        class _PaintWatcher(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint:
+                    trace.mark(name)
+                    obj.removeEventFilter(self)
+                    QTimer.singleShot(0, trace._write_when_settled)
+                return False
+
+        self._paint_watcher = _PaintWatcher(widget)
+        widget.installEventFilter(self._paint_watcher)
+
+    def _write_when_settled(self):
+        from PySide6.QtCore import QTimer
+
+        with self._lock:
+            open_phases = self._open_phases
+        if open_phases and self._now_ms() - self._marks.get("first_paint", 0) < SETTLE_TIMEOUT_MS:
+            QTimer.singleShot(50, self._write_when_settled)
+            return
+        self.write()
+
+    # ---------- imports ----------
+
+    def _install_import_hook(self):
+        if self._orig_import is not None:
+            return
+        self._orig_import = builtins.__import__
+        orig = self._orig_import
+        imports = self._imports
+        depth = self._import_depth
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+                return orig(name, globals, locals, fromlist, level)
+            depth.value = getattr(depth, "value", 0) + 1
+            start = time.perf_counter()
+            try:
+                return orig(name, globals, locals, fromlist, level)
+            finally:
+                depth.value -= 1
+                imports.setdefault(name, {
+                    "ms": round((time.perf_counter() - start) * 1000, 2),
+                    "top_level": depth.value == 0,
+                })
+
+        builtins.__import__ = timed_import
+
+    def _uninstall_import_hook(self):
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    # ---------- report ----------
+
+    def report(self) -> dict:
+        with self._lock:
+            imports = sorted(
+                ({"module": m, **v} for m, v in self._imports.items()),
+                key=lambda r: r["ms"], reverse=True,
+            )
+            return {
+                "total_ms": round(self._now_ms(), 2),
+                "marks": dict(self._marks),
+                "phases": sorted(self._phases, key=lambda p: p["start_ms"]),
+                "imports": imports,
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "pid": os.getpid(),
+            }
+
+    def write(self) -> Optional[str]:
+        """Write the JSON report once. Returns the path, or None if disabled/already written."""
+        if not self.enabled or self._written:
+            return None
+        self._written = True
+        self._uninstall_import_hook()
+        data = self.report()
+        try:
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"Startup profile write error:\n{e}")
+            return None
+        first_paint = data["marks"].get("first_paint")
+        suffix = f" (first paint at {first_paint:.0f} ms)" if first_paint is not None else ""
+        print(f"Startup profile written to {self.report_path}{suffix}")
+        return self.report_path
+
+
+_trace = StartupTrace()
+
+
+def startup_trace() -> StartupTrace:
+    """Return the process-wide StartupTrace."""
+    return _trace
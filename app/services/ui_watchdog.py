@@ -0,0 +1,364 @@
+# app/services/ui_watchdog.py
+"""
+Event-loop watchdog for "the dashboard froze" reports.
+
+A background thread pings the GUI thread every _POLL_MS through a queued signal and
+measures how long the ping waits in the Qt event queue. While a ping is overdue by more
+than the stall threshold, the thread samples the GUI thread's Python stack. When the loop
+catches up, the stall is logged with
+
+  - its length and a cause guess: "db" (a db.py call on the GUI thread), "qt_native"
+    (no Python running: layout, stylesheet, paint), "python" or "unsampled",
+  - the time attributed to each named span overlapping it (page load, card render, ...),
+  - the distinct stacks sampled, most frequent first.
+
+Enable with the environment flag (a number sets the threshold in ms):
+    OFFLINE_LAN_UI_WATCHDOG=1 python main.py
+    OFFLINE_LAN_UI_WATCHDOG=120 python main.py
+or config.UI_WATCHDOG, or toggle at runtime with the hidden HOTKEY in any main window.
+
+Spans (GUI thread; no-ops while disabled):
+    with ui_watchdog().span("card_render"): ...
+    @traced("login")
+    def handle_login(self): ...
+"""
+
+from __future__ import annotations
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+from PySide6.QtCore import QObject, Qt, Signal, Slot
+from PySide6.QtGui import QKeySequence, QShortcut
+
+import config
+from query_stats import LatencyHistogram
+
+ENV_FLAG = "OFFLINE_LAN_UI_WATCHDOG"
+HOTKEY = "Ctrl+Alt+Shift+W"
+_POLL_MS = 50
+# Stack samples kept per stall, frames kept per sample
+_MAX_SAMPLES = 20
+_MAX_FRAMES = 25
+# Finished spans kept for overlap attribution, stalls kept for snapshot()
+_RECENT_SPANS = 256
+_RECENT_STALLS = 100
+
+_DB_FILES = {"db.py", "query_stats.py"}
+
+
+class _Span:
+    __slots__ = ("_watchdog", "name", "start")
+
+    def __init__(self, watchdog, name: str):
+        self._watchdog = watchdog
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self._watchdog._active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self._watchdog._end_span(self, time.perf_counter())
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _env_threshold(value: str) -> Optional[float]:
+    """Threshold (ms) from the environment flag; None when the flag is off."""
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "off", "no"):
+        return None
+    try:
+        ms = float(value)
+    except ValueError:
+        return float(config.UI_STALL_MS)
+    return ms if ms > 1 else float(config.UI_STALL_MS)
+
+
+def _summarize_frames(frame) -> tuple:
+    """(filename, lineno, function) for the innermost _MAX_FRAMES frames, outermost first."""
+    frames = []
+    while frame is not None and len(frames) < _MAX_FRAMES:
+        code = frame.f_code
+        frames.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+def _classify(stacks: Counter) -> str:
+    if not stacks:
+        return "unsampled"
+    if any(os.path.basename(f[0]) in _DB_FILES for stack in stacks for f in stack):
+        return "db"
+    innermost = stacks.most_common(1)[0][0][-1]
+    # Only the top-level app.exec() frame: Qt was busy in C++ (layout, style, paint)
+    return "qt_native" if innermost[2] == "<module>" else "python"
+
+
+class UiWatchdog(QObject):
+    # Emitted by the watchdog thread; delivered queued on the GUI thread
+    _ping = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self.threshold_ms = float(config.UI_STALL_MS)
+        self._lock = threading.Lock()
+        self._gui_ident = threading.get_ident()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._sent_at: Optional[float] = None
+        self._samples = Counter()  # stack -> count for the stall in progress
+        # GUI thread only (the watchdog thread reads _active as a list copy)
+        self._active = []
+        self._recent = deque(maxlen=_RECENT_SPANS)  # (name, start, end) of finished spans
+        self._spans = {}  # name -> {"hist": LatencyHistogram, "stall_ms": float, "stalls": int}
+        self._lag = LatencyHistogram()
+        self._stalls = deque(maxlen=_RECENT_STALLS)
+        self._stall_count = 0
+        self._log = None
+        self._shortcuts = []
+        self._ping.connect(self._on_ping)
+
+    # ---------- lifecycle ----------
+
+    def configure(self, environ=None) -> None:
+        """Start if the environment flag or config.UI_WATCHDOG asks for it. Call on the GUI thread."""
+        environ = os.environ if environ is None else environ
+        threshold = _env_threshold(environ.get(ENV_FLAG, ""))
+        if threshold is not None:
+            self.start(threshold)
+        elif config.UI_WATCHDOG:
+            self.start()
+
+    def install_hotkey(self, window) -> None:
+        """Hidden shortcut toggling the watchdog while window (or any of the app's windows) is active."""
+        shortcut = QShortcut(QKeySequence(HOTKEY), window)
+        shortcut.setContext(Qt.ApplicationShortcut)
+        shortcut.activated.connect(self.toggle)
+        self._shortcuts.append(shortcut)
+
+    def start(self, threshold_ms: float = None) -> None:
+        if threshold_ms is not None:
+            self.threshold_ms = float(threshold_ms)
+        if self._thread is not None:
+            return
+        self.enabled = True
+        self._stop.clear()
+        self._sent_at = None
+        self._thread = threading.Thread(target=self._run, name="ui-watchdog", daemon=True)
+        self._thread.start()
+        print(f"UI watchdog on (stalls over {self.threshold_ms:.0f} ms, log: {config.UI_STALL_LOG or 'off'})")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+        self._active.clear()
+        print("UI watchdog off")
+        for line in self.summary_lines():
+            print(line)
+
+    def toggle(self) -> None:
+        if self._thread is None:
+            self.start()
+        else:
+            self.stop()
+
+    # ---------- spans (GUI thread) ----------
+
+    def span(self, name: str):
+        """Context manager attributing GUI-thread time to name (a no-op span when disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def _end_span(self, span: _Span, end: float) -> None:
+        try:
+            self._active.remove(span)
+        except ValueError:
+            return  # watchdog was switched off while the span was open
+        self._recent.append((span.name, span.start, end))
+        stats = self._spans.get(span.name)
+        if stats is None:
+            stats = self._spans[span.name] = {"hist": LatencyHistogram(), "stall_ms": 0.0, "stalls": 0}
+        stats["hist"].add((end - span.start) * 1000)
+
+    # ---------- measuring ----------
+
+    def _run(self):
+        poll = _POLL_MS / 1000
+        frames_of = sys._current_frames
+        while not self._stop.wait(poll):
+            now = time.perf_counter()
+            with self._lock:
+                sent = self._sent_at
+                if sent is None:
+                    self._sent_at = now
+            if sent is None:
+                self._ping.emit()
+                continue
+            if (now - sent) * 1000 < self.threshold_ms:
+                continue
+            # Overdue: sample where the GUI thread is
+            frame = frames_of().get(self._gui_ident)
+            if frame is None:
+                continue
+            stack = _summarize_frames(frame)
+            del frame
+            with self._lock:
+                if self._sent_at == sent and sum(self._samples.values()) < _MAX_SAMPLES:
+                    self._samples[stack] += 1
+
+    @Slot()
+    def _on_ping(self):
+        now = time.perf_counter()
+        with self._lock:
+            sent, self._sent_at = self._sent_at, None
+            samples, self._samples = self._samples, Counter()
+        if sent is None or not self.enabled:
+            return
+        lag_ms = (now - sent) * 1000
+        self._lag.add(lag_ms)
+        if lag_ms >= self.threshold_ms:
+            self._record_stall(sent, now, lag_ms, samples)
+
+    def _record_stall(self, start: float, end: float, lag_ms: float, samples: Counter) -> None:
+        # Time each span spent inside the stall window (finished and still open spans)
+        overlap = Counter()
+        intervals = [s for s in self._recent if s[2] > start]
+        intervals += [(s.name, s.start, end) for s in self._active]
+        for name, span_start, span_end in intervals:
+            ms = (min(span_end, end) - max(span_start, start)) * 1000
+            if ms > 0:
+                overlap[name] += ms
+        for name, ms in overlap.items():
+            stats = self._spans.get(name)
+            if stats is not None:
+                stats["stall_ms"] += ms
+                stats["stalls"] += 1
+
+        cause = _classify(samples)
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "lag_ms": round(lag_ms, 1),
+            "cause": cause,
+            "spans": {name: round(ms, 1) for name, ms in overlap.most_common()},
+            "stacks": [
+                {"count": n, "stack": [f"{path}:{line} {fn}" for path, line, fn in stack]}
+                for stack, n in samples.most_common(5)
+            ],
+        }
+        self._stalls.append(record)
+        self._stall_count += 1
+        where = ", ".join(record["spans"]) or "no span"
+        top = samples.most_common(1)[0][0][-1] if samples else None
+        at = f" at {os.path.basename(top[0])}:{top[1]} {top[2]}" if top else ""
+        print(f"UI stall {lag_ms:.0f} ms ({cause}) in {where}{at}")
+        logger = self._logger()
+        if logger is not None:
+            logger.info(json.dumps(record))
+
+    def _logger(self):
+        if self._log is None and config.UI_STALL_LOG:
+            logger = logging.getLogger("offline_lan.ui_stalls")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    config.UI_STALL_LOG, maxBytes=1_000_000, backupCount=3, encoding="utf-8", delay=True)
+            except OSError as e:
+                print(f"UI stall log error:\n{e}")
+                return None
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            self._log = logger
+        return self._log
+
+    # ---------- reporting ----------
+
+    def stall_count(self) -> int:
+        return self._stall_count
+
+    def snapshot(self) -> dict:
+        """Loop lag, per-span timings and recent stalls (GUI thread)."""
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "lag": self._lag.as_dict(),
+            "stalls": self._stall_count,
+            "spans": {
+                name: dict(s["hist"].as_dict(), stall_ms=round(s["stall_ms"], 1), stalls=s["stalls"])
+                for name, s in sorted(self._spans.items(), key=lambda kv: kv[1]["stall_ms"], reverse=True)
+            },
+            "recent_stalls": list(self._stalls),
+        }
+
+    def summary_lines(self) -> list:
+        snap = self.snapshot()
+        lines = [f"UI loop: {snap['lag']['count']} pings, p99 lag {snap['lag']['p99_ms']:.0f} ms, "
+                 f"max {snap['lag']['max_ms']:.0f} ms, {snap['stalls']} stalls"]
+        for name, s in snap["spans"].items():
+            lines.append(f"  {name}: {s['count']} runs, max {s['max_ms']:.0f} ms, "
+                         f"{s['stall_ms']:.0f} ms in {s['stalls']} stalls")
+        return lines
+
+    def dump(self, path: str) -> bool:
+        """Write snapshot() as JSON. Returns False (and prints the error) on failure."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+            return True
+        except OSError as e:
+            print(f"UI watchdog dump error:\n{e}")
+            return False
+
+
+_watchdog: Optional[UiWatchdog] = None
+
+
+def ui_watchdog() -> UiWatchdog:
+    """Return the process-wide UiWatchdog (created on first use, on the GUI thread)."""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = UiWatchdog()
+    return _watchdog
+
+
+def traced(name: str):
+    """Decorator: run a GUI-thread method inside ui_watchdog().span(name) while the watchdog is on."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _watchdog is None or not _watchdog.enabled:
+                return fn(*args, **kwargs)
+            with _watchdog.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
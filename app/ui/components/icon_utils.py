@@ -1,32 +1,181 @@
 # app/ui/components/icon_utils.py
 """
 Icon utility functions with fallback handling for missing icons.
+
+All asset images go through one process-wide cache:
+  - decoded source images by path (filled on first use, or ahead of time by warm_up()
+    on a background thread - QImage decoding is thread-safe, QPixmap is not)
+  - an LRU of pre-scaled QPixmap/QIcon keyed by (path, size, device-pixel-ratio)
+Paths are resolved relative to the package (app/assets), not the working directory.
 """
 from __future__ import annotations
 import os
-from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from PySide6.QtGui import QGuiApplication, QIcon, QImage, QPixmap
 from PySide6.QtCore import QSize, Qt
 
+from app.services.startup_trace import startup_trace
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets")
+
+# Scaled pixmaps/icons kept in the LRU (each entry is one small pre-scaled image)
+_MAX_ENTRIES = 256
+
 def asset_path(*parts: str) -> str:
     """Get absolute path to asset file"""
-    # Works if you run from project root
-    return os.path.join("app", "assets", *parts)
+    return os.path.join(ASSETS_DIR, *parts)
+
+
+class _AssetCache:
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._images = {}  # rel_path -> decoded QImage (None if missing/unreadable)
+        self._scaled = OrderedDict()  # (kind, rel_path, size, dpr) -> QPixmap | QIcon
+        self._stats = {"hits": 0, "misses": 0, "decoded": 0, "evicted": 0, "warmed": 0}
+
+    def image(self, rel_path: str) -> Optional[QImage]:
+        with self._lock:
+            if rel_path in self._images:
+                return self._images[rel_path]
+        img = self._decode(rel_path)
+        with self._lock:
+            return self._images.setdefault(rel_path, img)
+
+    def _decode(self, rel_path: str) -> Optional[QImage]:
+        path = asset_path(*rel_path.split("/"))
+        img = QImage(path) if os.path.exists(path) else QImage()
+        with self._lock:
+            self._stats["decoded"] += 1
+        return None if img.isNull() else img
+
+    def get(self, key):
+        with self._lock:
+            value = self._scaled.get(key)
+            if value is not None:
+                self._scaled.move_to_end(key)
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._scaled[key] = value
+            self._scaled.move_to_end(key)
+            while len(self._scaled) > self._max_entries:
+                self._scaled.popitem(last=False)
+                self._stats["evicted"] += 1
+        return value
+
+    def warm(self, rel_paths: Iterable[str]):
+        with startup_trace().phase("icons_decode"):
+            for rel_path in rel_paths:
+                with self._lock:
+                    if rel_path in self._images:
+                        continue
+                img = self._decode(rel_path)
+                with self._lock:
+                    self._images.setdefault(rel_path, img)
+                    self._stats["warmed"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._scaled), images=len(self._images))
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._scaled.clear()
+
+
+_cache = _AssetCache()
+
+
+def _device_pixel_ratio() -> float:
+    app = QGuiApplication.instance()
+    return app.devicePixelRatio() if app is not None else 1.0
 
-def icon(rel_path: str) -> QIcon:
+
+def _empty_pixmap(size: int) -> QPixmap:
+    # Transparent fallback for missing icons (prevents crashes)
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    return pixmap
+
+
+def has_asset(rel_path: str) -> bool:
+    """True if the asset exists and decodes (result cached)"""
+    return _cache.image(rel_path) is not None
+
+
+def pixmap(rel_path: str, size: int, dpr: Optional[float] = None) -> QPixmap:
+    """
+    Pixmap of an asset scaled to fit size x size logical pixels (aspect ratio kept),
+    rendered at the device pixel ratio. rel_path example: "icons/topbar/eye.png"
+    """
+    dpr = dpr or _device_pixel_ratio()
+    key = ("pixmap", rel_path, size, dpr)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    img = _cache.image(rel_path)
+    if img is None:
+        return _cache.put(key, _empty_pixmap(size))
+    px = round(size * dpr)
+    scaled = QPixmap.fromImage(img.scaled(px, px, Qt.AspectRatioMode.KeepAspectRatio,
+                                          Qt.TransformationMode.SmoothTransformation))
+    scaled.setDevicePixelRatio(dpr)
+    return _cache.put(key, scaled)
+
+
+def icon(rel_path: str, size: Optional[int] = None) -> QIcon:
     """
     Load icon from path, with fallback to empty icon if not found.
+    With size, the icon holds one pre-scaled pixmap; without, Qt scales the source on demand.
     rel_path example: "icons/sidebar/cashier_overview.png"
     """
-    path = asset_path(*rel_path.split("/"))
-    if os.path.exists(path):
-        return QIcon(path)
-    else:
-        # Return empty icon as fallback (prevents crashes)
-        pixmap = QPixmap(16, 16)
-        pixmap.fill(Qt.transparent)
-        return QIcon(pixmap)
+    dpr = _device_pixel_ratio() if size else None
+    key = ("icon", rel_path, size, dpr)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    if size:
+        return _cache.put(key, QIcon(pixmap(rel_path, size, dpr)))
+    img = _cache.image(rel_path)
+    return _cache.put(key, QIcon(QPixmap.fromImage(img) if img is not None else _empty_pixmap(16)))
+
 
 def set_icon(btn, rel_path: str, size: int = 18):
     """Set icon on button with size"""
-    btn.setIcon(icon(rel_path))
+    btn.setIcon(icon(rel_path, size))
     btn.setIconSize(QSize(size, size))
+
+
+def set_pixmap(label, rel_path: str, size: int):
+    """Show an asset on a QLabel at size x size"""
+    label.setPixmap(pixmap(rel_path, size))
+
+
+def warm_up(rel_paths: Optional[Iterable[str]] = None) -> threading.Thread:
+    """
+    Decode asset images on a background thread so the first pixmap()/icon() call only scales.
+    Defaults to every PNG under app/assets/icons.
+    """
+    if rel_paths is None:
+        icons_dir = asset_path("icons")
+        rel_paths = [
+            os.path.relpath(os.path.join(root, f), ASSETS_DIR).replace(os.sep, "/")
+            for root, _, files in os.walk(icons_dir) for f in sorted(files) if f.endswith(".png")
+        ]
+    thread = threading.Thread(target=_cache.warm, args=(list(rel_paths),), name="icon-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def cache_stats() -> dict:
+    """Counters: hits/misses (scaled LRU), decoded, evicted, warmed, entries, images."""
+    return _cache.stats()
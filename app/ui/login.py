@@ -2,7 +2,6 @@
 from pathlib import Path
 
 from PySide6.QtCore import Qt, QSettings
-from PySide6.QtGui import QImage, QPixmap
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -18,6 +17,10 @@ from PySide6.QtWidgets import (
 )
 
 import db
+from app.services.query_service import query_service, cpu_service
+from app.services.prefetch import prefetch_cache
+from app.services.background_images import background_service
+from app.services.ui_watchdog import traced
 
 # Path to background image relative to app/ui
 _BG_PATH = Path(__file__).resolve().parent.parent / "assets" / "backgrounds" / "rooster_squad_1.png"
@@ -26,6 +29,14 @@ _BG_HEIGHT = 1080
 _SETTINGS_KEY_REMEMBER = "login/remember_username"
 _SETTINGS_KEY_USERNAME = "login/username"
 
+# Started speculatively while bcrypt runs, once the user's role is known: the role
+# window's first-page queries (taken over by the page through prefetch_cache()).
+_ROLE_PREFETCH = {
+    "super_admin": [(db.fetch_cashier_overview, (None,))],
+}
+# Pooled connections opened during verification (first page query + session start)
+_WARM_CONNECTIONS = 2
+
 
 def save_remembered_username(username: str) -> None:
     """Save username when user logs out, so it is pre-filled on next login."""
@@ -61,12 +72,12 @@ class LoginWindow(QWidget):
             cy = geom.y()
             self.move(cx, cy)
 
-        # Background label (load from bytes to avoid Qt file path / pixmap creation errors)
+        # Background label (pre-scaled image delivered by the background service)
         self._bg_label = QLabel(self)
         self._bg_label.setScaledContents(True)
         self._bg_label.setGeometry(0, 0, w, h)
         self._bg_label.lower()
-        _load_background_pixmap(self._bg_label, w, h)
+        background_service().apply(self._bg_label, _BG_PATH, self._bg_label.size())
 
         # Main layout
         main_layout = QVBoxLayout(self)
@@ -130,6 +141,7 @@ class LoginWindow(QWidget):
         form.addWidget(self.remember_check)
 
         btn = QPushButton("Log In")
+        self.login_btn = btn
         btn.setFixedHeight(48)
         btn.setCursor(Qt.PointingHandCursor)
         btn.setStyleSheet("""
@@ -167,7 +179,7 @@ class LoginWindow(QWidget):
         super().resizeEvent(event)
         s = self.size()
         self._bg_label.setGeometry(0, 0, s.width(), s.height())
-        _load_background_pixmap(self._bg_label, s.width(), s.height())
+        background_service().apply(self._bg_label, _BG_PATH, s)
 
     def _load_remembered_username(self):
         settings = QSettings()
@@ -186,6 +198,7 @@ class LoginWindow(QWidget):
             settings.setValue(_SETTINGS_KEY_REMEMBER, False)
             settings.remove(_SETTINGS_KEY_USERNAME)
 
+    @traced("login")
     def handle_login(self):
         uname = self.username.text().strip()
         pw = self.password.text()
@@ -194,35 +207,55 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Missing", "Please enter username and password.")
             return
 
-        user = db.verify_login(uname, pw)
+        if not self.login_btn.isEnabled():
+            return  # login already in progress
+
+        # Row lookup on a query worker, bcrypt on a CPU worker: the window stays responsive
+        self._set_busy(True)
+        query_service().submit(db.get_pool().warm_up, _WARM_CONNECTIONS)
+        future = query_service().submit(db.fetch_login_user, uname, owner=self)
+        future.succeeded.connect(lambda row: self._on_login_user(row, pw))
+        future.failed.connect(lambda err: self._on_login_result(None))
+
+    @traced("login")
+    def _on_login_user(self, row, password: str):
+        if not row:
+            self._on_login_result(None)
+            return
+        # Overlap the role's first-page data with the ~0.2 s password check;
+        # discarded in _on_login_result if the password turns out wrong.
+        for fn, args in _ROLE_PREFETCH.get(row["role"], ()):
+            prefetch_cache().start(fn, *args)
+        self.login_btn.setText("Verifying...")
+        future = cpu_service().submit(db.verify_password, password, row["password_hash"], owner=self)
+        future.succeeded.connect(lambda ok: self._on_password_checked(row if ok else None))
+        future.failed.connect(lambda err: self._on_login_result(None))
+
+    @traced("login")
+    def _on_password_checked(self, row):
+        if not row:
+            self._on_login_result(None)
+            return
+        # One round trip: mark active + open a session row (public.app_login)
+        future = query_service().submit(db.start_session, row["user_id"], row["password_hash"], owner=self)
+        future.succeeded.connect(self._on_login_result)
+        future.failed.connect(lambda err: self._on_login_result(None))
+
+    @traced("login")
+    def _on_login_result(self, user):
+        self._set_busy(False)
         if not user:
+            prefetch_cache().clear()
             QMessageBox.critical(self, "Login failed", "Invalid credentials or inactive account.")
             return
 
-        db.update_last_active(user["user_id"])
         self._save_remembered_username()
         self.on_login_success(user)
         self.close()
 
+    def _set_busy(self, busy: bool):
+        self.login_btn.setEnabled(not busy)
+        self.login_btn.setText("Signing in..." if busy else "Log In")
+        self.username.setReadOnly(busy)
+        self.password.setReadOnly(busy)
 
-def _load_background_pixmap(label: QLabel, w: int, h: int) -> None:
-    """Load background image from bytes into label (same approach as test.py)."""
-    path = _BG_PATH
-    if not path.exists():
-        return
-    with open(path, "rb") as f:
-        data = f.read()
-    img = QImage()
-    img.loadFromData(data)
-    if img.isNull():
-        try:
-            from PIL import Image
-            import io
-            pil_img = Image.open(io.BytesIO(data)).convert("RGBA")
-            img = QImage(pil_img.tobytes(), pil_img.width, pil_img.height, QImage.Format.Format_RGBA8888)
-        except (ImportError, ValueError, OSError, RuntimeError):
-            return
-    pix = QPixmap.fromImage(img)
-    if not pix.isNull():
-        # Same as test.py: set full pixmap, setScaledContents handles scaling
-        label.setPixmap(pix)
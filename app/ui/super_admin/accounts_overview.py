@@ -8,18 +8,24 @@ from datetime import datetime, time as dt_time
 from typing import Optional
 
 from PySide6.QtWidgets import (
-    QSizePolicy,
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
-    QDialog, QMessageBox, QFrame, QGraphicsDropShadowEffect, QApplication,
-    QToolButton
+    QPushButton, QTableView, QHeaderView, QAbstractItemView,
+    QDialog, QMessageBox, QGraphicsDropShadowEffect, QApplication,
+    QStyledItemDelegate, QStyle, QFileDialog, QCheckBox
 )
-from PySide6.QtCore import Qt, QPoint
-from PySide6.QtGui import QColor, QPixmap
+from PySide6.QtCore import (
+    Qt, QPoint, QRect, QEvent, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Signal
+)
+from PySide6.QtGui import QColor, QFont, QPainter
 
+import accounts_import
+import config
 import db
 from app.ui.components.styles import COLORS, FONT_SIZES, FONT_WEIGHTS, RADIUS, DIMENSIONS
-from app.ui.components.icon_utils import set_icon
+from app.ui.components.icon_utils import has_asset, pixmap
+from app.services.query_service import query_service, cpu_service
+from app.services.db_health import connection_monitor
+from app.services.ui_watchdog import traced
 
 # Role mapping: db value -> display name
 ROLE_DISPLAY = db.ROLE_DISPLAY
@@ -76,20 +82,73 @@ def _format_last_active(ts) -> str:
     n = int(secs / 31536000)
     return f"{n} year{'s' if n != 1 else ''} ago"
 
-def _get_role_style(role: str) -> str:
-    styles = {
-        "administrator": "background-color: rgba(243, 232, 255, 0.6); color: #7C3AED; border: none;",
-        "cashier": "background-color: rgba(209, 250, 229, 0.6); color: #047857; border: none;",
-        "monitor": "background-color: rgba(219, 234, 254, 0.6); color: #1D4ED8; border: none;",
-        "operator_a": "background-color: rgba(219, 234, 254, 0.6); color: #1D4ED8; border: none;",
-        "operator_b": "background-color: rgba(254, 243, 199, 0.6); color: #A16207; border: none;",
+def _parse_last_active(value):
+    """last_active arrives as an ISO time string in notifications; match the DB type (time)."""
+    if isinstance(value, str):
+        try:
+            return dt_time.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+def _account_sort_key(user: dict):
+    """Same order as db.fetch_users_excluding_super_admin (role rank, then name)."""
+    rank = {"administrator": 1, "operator_a": 2, "operator_b": 3, "monitor": 4, "cashier": 5}
+    return rank.get(user.get("role"), 6), user.get("name") or user.get("username") or ""
+
+def _get_role_colors(role: str) -> tuple:
+    """(badge background, text color) for a role badge."""
+    colors = {
+        "administrator": (QColor(243, 232, 255, 153), QColor("#7C3AED")),
+        "cashier": (QColor(209, 250, 229, 153), QColor("#047857")),
+        "monitor": (QColor(219, 234, 254, 153), QColor("#1D4ED8")),
+        "operator_a": (QColor(219, 234, 254, 153), QColor("#1D4ED8")),
+        "operator_b": (QColor(254, 243, 199, 153), QColor("#A16207")),
     }
-    return styles.get(role, f"background-color: rgba(243, 244, 246, 0.6); color: {COLORS['gray_700']}; border: none;")
+    return colors.get(role, (QColor(243, 244, 246, 153), QColor(COLORS['gray_700'])))
 
-def _get_status_style(is_active: bool) -> str:
+def _get_status_colors(is_active: bool) -> tuple:
+    """(badge background, text color, dot color) for a status badge."""
     if is_active:
-        return "background-color: rgba(209, 250, 229, 0.6); color: #047857; border: none;"
-    return f"background-color: rgba(243, 244, 246, 0.6); color: {COLORS['gray_700']}; border: none;"
+        return QColor(209, 250, 229, 153), QColor("#047857"), QColor("#10B981")
+    return QColor(243, 244, 246, 153), QColor(COLORS['gray_700']), QColor(COLORS['gray_500'])
+
+# Role badge icons (operator_a/operator_b artwork is swapped in the asset set)
+_ROLE_ICONS = {"cashier": "cashier.png", "operator_a": "operator_b.png", "operator_b": "operator_a.png"}
+
+
+# ---------- Worker-thread jobs (run via query_service, never on the GUI thread) ----------
+
+def _fetch_accounts_job():
+    """Returns list of users, or None if the database is unreachable (at most one connect attempt)."""
+    if not db.is_online():
+        return None
+    users = db.fetch_users_excluding_super_admin()
+    return users if db.is_online() else None
+
+
+def _create_account_job(username: str, password_hash: str, role: str, name: str):
+    """Returns (status, error): status is "exists", "ok" or "error". The password is hashed beforehand."""
+    if db.username_exists(username):
+        return "exists", None
+    if db.create_user(username, None, role, name, password_hash=password_hash):
+        return "ok", None
+    return "error", db.get_last_error() or "Unknown error"
+
+
+def _update_account_job(user_id: int, old_username: str, username: str, name: str, role: str, password_hash):
+    """Returns (status, error): status is "exists", "ok" or "error". password_hash is None if unchanged."""
+    if username != old_username and db.username_exists(username):
+        return "exists", None
+    if db.update_user_account(user_id, username, name, role, password_hash=password_hash):
+        return "ok", None
+    return "error", db.get_last_error() or "Unknown error"
+
+
+def _delete_account_job(user_id: int):
+    """Returns (ok, error)."""
+    ok = db.delete_user_account(user_id)
+    return ok, None if ok else (db.get_last_error() or "Unknown error")
 
 
 # Styles matching register_super_admin.py
@@ -285,13 +344,13 @@ class CreateAccountModal(DraggableCardDialog):
         cancel_btn.setCursor(Qt.PointingHandCursor)
         cancel_btn.setStyleSheet(_BTN_SECONDARY)
         cancel_btn.clicked.connect(self.reject)
-        create_btn = QPushButton("Create Account")
-        create_btn.setFixedHeight(40)
-        create_btn.setCursor(Qt.PointingHandCursor)
-        create_btn.setStyleSheet(_BTN_PRIMARY)
-        create_btn.clicked.connect(self._on_create)
+        self.create_btn = QPushButton("Create Account")
+        self.create_btn.setFixedHeight(40)
+        self.create_btn.setCursor(Qt.PointingHandCursor)
+        self.create_btn.setStyleSheet(_BTN_PRIMARY)
+        self.create_btn.clicked.connect(self._on_create)
         btn_layout.addWidget(cancel_btn)
-        btn_layout.addWidget(create_btn)
+        btn_layout.addWidget(self.create_btn)
         layout.addLayout(btn_layout)
 
         # Enter key submits
@@ -330,9 +389,6 @@ class CreateAccountModal(DraggableCardDialog):
         elif not all(c.isalnum() or c == "_" for c in username):
             self.username_error.setText("Username can only contain letters, numbers, underscores")
             has_error = True
-        elif db.username_exists(username):
-            self.username_error.setText("Username already exists")
-            has_error = True
 
         if not pw:
             self.password_error.setText("Password is required")
@@ -351,7 +407,7 @@ class CreateAccountModal(DraggableCardDialog):
         return not has_error
 
     def _on_create(self):
-        if not self._validate():
+        if not self.create_btn.isEnabled() or not self._validate():
             return
         name = self.name_edit.text().strip()
         username = self.username_edit.text().strip()
@@ -359,14 +415,32 @@ class CreateAccountModal(DraggableCardDialog):
         role = self.role_combo.currentData() or "cashier"
         role = str(role)
 
-        ok = db.create_user(username, pw, role, name)
-        if ok:
+        # Hash on a CPU worker, then username check + insert on a query worker
+        self._set_busy(True)
+        future = cpu_service().submit(db.hash_password, pw, owner=self)
+        future.succeeded.connect(lambda password_hash: self._submit_create(username, password_hash, role, name))
+        future.failed.connect(lambda err: self._on_create_done(("error", err)))
+
+    def _submit_create(self, username: str, password_hash: str, role: str, name: str):
+        future = query_service().submit(_create_account_job, username, password_hash, role, name, owner=self)
+        future.succeeded.connect(self._on_create_done)
+        future.failed.connect(lambda err: self._on_create_done(("error", err)))
+
+    def _on_create_done(self, outcome):
+        self._set_busy(False)
+        status, err = outcome
+        if status == "exists":
+            self.username_error.setText("Username already exists")
+        elif status == "ok":
             QMessageBox.information(self, "Success", "Account created successfully.")
             self.accept()
         else:
-            err = db.get_last_error() or "Unknown error"
             QMessageBox.critical(self, "Error", f"Failed to create account.\n\n{err}")
 
+    def _set_busy(self, busy: bool):
+        self.setEnabled(not busy)
+        self.create_btn.setText("Creating..." if busy else "Create Account")
+
 
 class EditAccountModal(DraggableCardDialog):
     """Modal for editing account - same style as register_super_admin."""
@@ -468,13 +542,13 @@ class EditAccountModal(DraggableCardDialog):
         cancel_btn.setCursor(Qt.PointingHandCursor)
         cancel_btn.setStyleSheet(_BTN_SECONDARY)
         cancel_btn.clicked.connect(self.reject)
-        update_btn = QPushButton("Update Account")
-        update_btn.setFixedHeight(40)
-        update_btn.setCursor(Qt.PointingHandCursor)
-        update_btn.setStyleSheet(_BTN_UPDATE)
-        update_btn.clicked.connect(self._on_update)
+        self.update_btn = QPushButton("Update Account")
+        self.update_btn.setFixedHeight(40)
+        self.update_btn.setCursor(Qt.PointingHandCursor)
+        self.update_btn.setStyleSheet(_BTN_UPDATE)
+        self.update_btn.clicked.connect(self._on_update)
         btn_layout.addWidget(cancel_btn)
-        btn_layout.addWidget(update_btn)
+        btn_layout.addWidget(self.update_btn)
         layout.addLayout(btn_layout)
 
     def _clear_errors(self):
@@ -507,9 +581,6 @@ class EditAccountModal(DraggableCardDialog):
         elif not all(c.isalnum() or c == "_" for c in username):
             self.username_error.setText("Username can only contain letters, numbers, underscores")
             has_error = True
-        elif username != self.user.get("username") and db.username_exists(username):
-            self.username_error.setText("Username already exists")
-            has_error = True
 
         # Password validation only if password is provided
         if pw or confirm:
@@ -524,6 +595,8 @@ class EditAccountModal(DraggableCardDialog):
 
     def _on_update(self):
         print("[DEBUG] Update button clicked")
+        if not self.update_btn.isEnabled():
+            return
         if not self._validate():
             print("[DEBUG] Validation failed")
             return
@@ -535,19 +608,277 @@ class EditAccountModal(DraggableCardDialog):
         role = str(role)
 
         print(f"[DEBUG] Updating user_id={user_id}, role={role}, password_changed={'Yes' if pw else 'No'}")
-        print(f"[DEBUG] DB connection: {db.connection_ok()}")
-        
-        ok = db.update_user_account(user_id, username, name, role, password_plain=pw)
-        print(f"[DEBUG] update_user_account result: {ok}")
-        print(f"[DEBUG] Last error: {db.get_last_error()}")
-        
-        if ok:
+
+        # New password: hash on a CPU worker first; username check + update on a query worker
+        self._set_busy(True)
+        args = (user_id, self.user.get("username"), username, name, role)
+        if not pw:
+            self._submit_update(*args, None)
+            return
+        future = cpu_service().submit(db.hash_password, pw, owner=self)
+        future.succeeded.connect(lambda password_hash: self._submit_update(*args, password_hash))
+        future.failed.connect(lambda err: self._on_update_done(("error", err)))
+
+    def _submit_update(self, user_id: int, old_username: str, username: str, name: str, role: str, password_hash):
+        future = query_service().submit(
+            _update_account_job, user_id, old_username, username, name, role, password_hash, owner=self
+        )
+        future.succeeded.connect(self._on_update_done)
+        future.failed.connect(lambda err: self._on_update_done(("error", err)))
+
+    def _on_update_done(self, outcome):
+        self._set_busy(False)
+        status, err = outcome
+        print(f"[DEBUG] update_user_account result: {status}, error: {err}")
+        if status == "exists":
+            self.username_error.setText("Username already exists")
+        elif status == "ok":
             QMessageBox.information(self, "Success", "Account updated successfully.")
             self.accept()
         else:
-            err = db.get_last_error() or "Unknown error"
             QMessageBox.critical(self, "Error", f"Failed to update account.\n\n{err}")
 
+    def _set_busy(self, busy: bool):
+        self.setEnabled(not busy)
+        self.update_btn.setText("Updating..." if busy else "Update Account")
+
+# ---------- Accounts table: model, filter proxy and painting delegate ----------
+
+_COL_USER, _COL_ROLE, _COL_STATUS, _COL_LAST_ACTIVE, _COL_ACTIONS = range(5)
+_HEADERS = ["User", "Role", "Status", "Last Active", "Actions"]
+_ROW_HEIGHT = 56
+UserRole = Qt.UserRole + 1  # the user dict of a row
+
+
+class AccountsTableModel(QAbstractTableModel):
+    """One row per account dict; cells are painted by AccountsDelegate."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._users: list = []
+        self._row_of: dict = {}  # user_id -> row
+        self._search_keys: list = []  # lower-cased "name username role" per row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._users)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return _HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        u = self._users[index.row()]
+        if role == UserRole:
+            return u
+        if role == Qt.DisplayRole:
+            col = index.column()
+            if col == _COL_USER:
+                return u.get("name") or u.get("username", "")
+            if col == _COL_ROLE:
+                return ROLE_DISPLAY.get(u.get("role", ""), u.get("role", ""))
+            if col == _COL_STATUS:
+                return "Online" if u.get("is_active") else "Offline"
+            if col == _COL_LAST_ACTIVE:
+                return _format_last_active(u.get("last_active"))
+        return None
+
+    def set_users(self, users: list):
+        self.beginResetModel()
+        self._users = users
+        self._reindex()
+        self.endResetModel()
+
+    def update_user(self, user_id: int) -> bool:
+        """Signal that one user's dict changed in place. Returns False if unknown."""
+        row = self._row_of.get(user_id)
+        if row is None:
+            return False
+        self._search_keys[row] = self._search_key(self._users[row])
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(_HEADERS) - 1))
+        return True
+
+    def search_key(self, row: int) -> str:
+        return self._search_keys[row]
+
+    def _reindex(self):
+        self._row_of = {u.get("user_id"): i for i, u in enumerate(self._users)}
+        self._search_keys = [self._search_key(u) for u in self._users]
+
+    @staticmethod
+    def _search_key(u: dict) -> str:
+        role = u.get("role", "")
+        return "\n".join((u.get("name") or "", u.get("username") or "", ROLE_DISPLAY.get(role, role))).lower()
+
+
+class AccountsFilterProxy(QSortFilterProxyModel):
+    """Search / role / status filtering over AccountsTableModel (no sorting; source order is kept)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._role = "All"
+        self._status = "All"
+
+    def set_filters(self, query: str, role: str, status: str):
+        query = query.lower().strip()
+        if (query, role, status) != (self._query, self._role, self._status):
+            self._query, self._role, self._status = query, role, status
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        u = model.data(model.index(source_row, 0), UserRole)
+        if self._role != "All" and u["role"] != self._role:
+            return False
+        if self._status != "All" and ("Online" if u["is_active"] else "Offline") != self._status:
+            return False
+        return not self._query or self._query in model.search_key(source_row)
+
+
+class AccountsDelegate(QStyledItemDelegate):
+    """Paints avatar + name, role/status badges and the Edit/Delete buttons; hit-tests the buttons."""
+
+    edit_requested = Signal(dict)
+    delete_requested = Signal(dict)
+
+    _BTN = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hover = (None, None)  # (row, "edit" | "delete") under the mouse, set by the page
+
+    @staticmethod
+    def _font(base: QFont, px: int, weight: int) -> QFont:
+        f = QFont(base)
+        f.setPixelSize(px)
+        f.setWeight(QFont.Weight(weight))
+        return f
+
+    def button_rects(self, rect: QRect) -> dict:
+        """Edit/Delete button rects inside an Actions cell."""
+        b = self._BTN
+        top = rect.top() + (rect.height() - b) // 2
+        left = rect.left() + (rect.width() - (2 * b + 8)) // 2
+        return {"edit": QRect(left, top, b, b), "delete": QRect(left + b + 8, top, b, b)}
+
+    def button_at(self, rect: QRect, pos) -> Optional[str]:
+        for name, r in self.button_rects(rect).items():
+            if r.contains(pos):
+                return name
+        return None
+
+    def paint(self, painter: QPainter, option, index):
+        u = index.data(UserRole)
+        if u is None:
+            return
+        col = index.column()
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(rect, QColor(COLORS['blue_50']))
+        if col == _COL_USER:
+            self._paint_user(painter, option, u)
+        elif col == _COL_ROLE:
+            self._paint_role(painter, option, u, index.data())
+        elif col == _COL_STATUS:
+            self._paint_status(painter, option, u)
+        elif col == _COL_LAST_ACTIVE:
+            painter.setPen(QColor(COLORS['gray_800']))
+            painter.setFont(option.font)
+            painter.drawText(rect, Qt.AlignCenter, index.data())
+        else:
+            self._paint_actions(painter, rect, index.row())
+        painter.restore()
+
+    def _paint_user(self, painter, option, u):
+        rect = option.rect
+        name = u.get("name") or u.get("username", "")
+        color = QColor(_get_avatar_color(name))
+        avatar = QRect(rect.left() + 20, rect.top() + (rect.height() - 36) // 2, 36, 36)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawEllipse(avatar)
+        painter.setPen(QColor("#1F2937"))
+        painter.setFont(self._font(option.font, 13, 700))
+        painter.drawText(avatar, Qt.AlignCenter, _get_initials(name))
+        # Status dot, ringed in the avatar color
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawEllipse(QRect(avatar.left() + 22, avatar.top() + 22, 14, 14))
+        painter.setBrush(QColor('#10B981' if u.get("is_active") else COLORS['gray_400']))
+        painter.drawEllipse(QRect(avatar.left() + 24, avatar.top() + 24, 10, 10))
+        text_rect = QRect(avatar.right() + 13, rect.top(), rect.right() - avatar.right() - 16, rect.height())
+        painter.setPen(QColor(COLORS['gray_800']))
+        painter.setFont(self._font(option.font, FONT_SIZES['base'], FONT_WEIGHTS['medium']))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         painter.fontMetrics().elidedText(name, Qt.ElideRight, text_rect.width()))
+
+    def _paint_badge(self, painter, rect, bg, fg, text, font, lead_w, lead_paint):
+        """Centered rounded badge: [lead element][text]; lead_paint(painter, lead_rect) draws the lead."""
+        painter.setFont(font)
+        text_w = painter.fontMetrics().horizontalAdvance(text)
+        w = 8 + lead_w + (6 if lead_w else 0) + text_w + 10
+        h = 28
+        badge = QRect(rect.left() + (rect.width() - w) // 2, rect.top() + (rect.height() - h) // 2, w, h)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(bg)
+        painter.drawRoundedRect(badge, 8, 8)
+        if lead_w:
+            lead_paint(painter, QRect(badge.left() + 8, badge.top() + (h - lead_w) // 2, lead_w, lead_w))
+        painter.setPen(fg)
+        painter.drawText(QRect(badge.right() - 10 - text_w, badge.top(), text_w + 1, h), Qt.AlignCenter, text)
+
+    def _paint_role(self, painter, option, u, text):
+        role = u.get("role", "")
+        bg, fg = _get_role_colors(role)
+        icon_path = f"icons/role/{_ROLE_ICONS.get(role, f'{role}.png')}"
+        pm = pixmap(icon_path, 20)
+        font = self._font(option.font, FONT_SIZES['xs'], FONT_WEIGHTS['medium'])
+        self._paint_badge(painter, option.rect, bg, fg, text, font,
+                          20 if has_asset(icon_path) else 0, lambda p, r: p.drawPixmap(r, pm))
+
+    def _paint_status(self, painter, option, u):
+        bg, fg, dot = _get_status_colors(bool(u.get("is_active")))
+        font = self._font(option.font, FONT_SIZES['xs'], FONT_WEIGHTS['medium'])
+
+        def draw_dot(p, r):
+            p.setPen(Qt.NoPen)
+            p.setBrush(dot)
+            p.drawEllipse(r)
+
+        self._paint_badge(painter, option.rect, bg, fg, "Online" if u.get("is_active") else "Offline",
+                          font, 8, draw_dot)
+
+    def _paint_actions(self, painter, rect, row):
+        hovered = self.hover[1] if self.hover[0] == row else None
+        rects = self.button_rects(rect)
+        specs = (("edit", "#EFF6FF", "#DBEAFE", "icons/actions/edit.png", DIMENSIONS['icon_md']),
+                 ("delete", "#FEF2F2", "#FEE2E2", "icons/actions/trash_bin.png", 24))
+        for name, bg, bg_hover, path, size in specs:
+            r = rects[name]
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(bg_hover if hovered == name else bg))
+            painter.drawRoundedRect(r, RADIUS['lg'], RADIUS['lg'])
+            painter.drawPixmap(r.left() + (r.width() - size) // 2, r.top() + (r.height() - size) // 2,
+                               pixmap(path, size))
+
+    def editorEvent(self, event, model, option, index):
+        if (index.column() == _COL_ACTIONS and event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton):
+            button = self.button_at(option.rect, event.position().toPoint())
+            if button:
+                user = dict(index.data(UserRole))
+                (self.edit_requested if button == "edit" else self.delete_requested).emit(user)
+                return True
+        return super().editorEvent(event, model, option, index)
+
 
 class AccountsOverview(QWidget):
     """Accounts management page. Excludes super_admin from list."""
@@ -559,8 +890,9 @@ class AccountsOverview(QWidget):
         self.search_query = ""
         self.role_filter = "All"
         self.status_filter = "All"
+        self._loading = False
         self._build_ui()
-        self._load_users()
+        # Users load in showEvent (also on the first show)
 
     def _build_ui(self):
         GAP = 12
@@ -582,6 +914,20 @@ class AccountsOverview(QWidget):
         header.addLayout(title_col)
         header.addStretch()
 
+        import_btn = QPushButton("Import CSV")
+        import_btn.setFixedHeight(40)
+        import_btn.setStyleSheet(f"""
+            QPushButton {{ background-color: {COLORS['white']}; color: {COLORS['gray_800']};
+            border: 1px solid {COLORS['gray_300']}; border-radius: {RADIUS['lg']}px;
+            padding: 8px 16px; font-weight: 600; }}
+            QPushButton:hover {{ background-color: {COLORS['gray_100']}; }}
+            QPushButton:disabled {{ color: {COLORS['gray_400']}; }}
+        """)
+        import_btn.setCursor(Qt.PointingHandCursor)
+        import_btn.clicked.connect(self._on_import)
+        header.addWidget(import_btn)
+        self.import_btn = import_btn
+
         create_btn = QPushButton("Create account")
         create_btn.setFixedHeight(40)
         create_btn.setStyleSheet(f"""
@@ -647,19 +993,31 @@ class AccountsOverview(QWidget):
             border-radius: {RADIUS['md']}px; font-size: {FONT_SIZES['sm']}px;
         """)
         self.db_error_banner.setWordWrap(True)
-        self.db_error_banner.setVisible(False)
+        self.db_error_banner.setVisible(not db.is_online())
         layout.addWidget(self.db_error_banner)
-
-        # Table with Actions column
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["User", "Role", "Status", "Last Active", "Actions"])
+        connection_monitor().status_changed.connect(self._on_db_status)
+
+        # Table with Actions column: model -> filter proxy -> view, cells painted by the delegate
+        self.model = AccountsTableModel(self)
+        self.proxy = AccountsFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.delegate = AccountsDelegate(self)
+        self.delegate.edit_requested.connect(self._on_edit)
+        self.delegate.delete_requested.connect(self._on_delete)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegate(self.delegate)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(_ROW_HEIGHT)
+        self.table.setMouseTracking(True)
+        self.table.viewport().installEventFilter(self)
         self.table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background: {COLORS['white']};
                 border: 1px solid {COLORS['gray_200']};
                 border-radius: {RADIUS['lg']}px;
@@ -672,7 +1030,7 @@ class AccountsOverview(QWidget):
                 font-size: {FONT_SIZES['xs']}px;
                 color: {COLORS['gray_600']};
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 4px 0;
             }}
         """)
@@ -681,39 +1039,84 @@ class AccountsOverview(QWidget):
         self.setStyleSheet(f"QWidget#page-container {{ background-color: {COLORS['gray_50']}; }}")
 
     def _load_users(self):
-        if not db.connection_ok():
+        """Fetch accounts on a worker thread; the table updates when results arrive."""
+        query_service().cancel_owner(self)
+        self._loading = True
+        future = query_service().submit(_fetch_accounts_job, owner=self)
+        future.succeeded.connect(self._on_users_loaded)
+        future.failed.connect(lambda err: self._on_users_loaded(None))
+
+    @traced("table_populate")
+    def _on_users_loaded(self, users):
+        self._loading = False
+        if users is None:
             self.db_error_banner.setVisible(True)
             self.users = []
         else:
             self.db_error_banner.setVisible(False)
-            self.users = db.fetch_users_excluding_super_admin()
+            self.users = users
+        self.model.set_users(self.users)
         self._apply_filters()
         self.table.viewport().update()
 
+    def _on_db_status(self, online: bool):
+        # Offline: show the banner at once; online: the window reloads every page
+        if not online:
+            self.db_error_banner.setVisible(True)
+
     def showEvent(self, event):
         super().showEvent(event)
         self._load_users()
 
-    def _get_filtered_users(self):
-        q = self.search_query.lower().strip()
-        rf = self.role_filter
-        sf = self.status_filter
-        filtered = []
-        for u in self.users:
-            if rf != "All" and u["role"] != rf:
-                continue
-            if sf != "All":
-                status = "Online" if u["is_active"] else "Offline"
-                if status != sf:
-                    continue
-            if q:
-                name = (u.get("name") or "").lower()
-                username = (u.get("username") or "").lower()
-                role = (ROLE_DISPLAY.get(u.get("role", ""), u.get("role", ""))).lower()
-                if q not in name and q not in username and q not in role:
-                    continue
-            filtered.append(u)
-        return filtered
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self._loading:
+            query_service().cancel_owner(self)
+            self._loading = False
+
+    @traced("table_populate")
+    def apply_user_change(self, change: dict):
+        """
+        Patch self.users from a db.USER_CHANGES_CHANNEL notification without re-querying.
+        Changes that keep the row order update one model row in place.
+        """
+        user_id = change.get("user_id")
+        idx = next((i for i, u in enumerate(self.users) if u["user_id"] == user_id), None)
+        op = change.get("op")
+
+        if op == "delete" or change.get("role") == "super_admin":
+            if idx is not None:
+                del self.users[idx]
+                self.model.set_users(self.users)
+                self._apply_filters()
+            return
+
+        user = {
+            "user_id": user_id,
+            "username": change.get("username"),
+            "name": change.get("name"),
+            "role": change.get("role"),
+            "is_active": bool(change.get("is_active")),
+            "last_active": _parse_last_active(change.get("last_active")),
+        }
+        if idx is None:
+            self.users.append(user)
+            self.users.sort(key=_account_sort_key)
+            self.model.set_users(self.users)
+            self._apply_filters()
+            return
+
+        if _account_sort_key(self.users[idx]) == _account_sort_key(user):
+            # Order unchanged: update the dict in place; the proxy re-filters just that row
+            self.users[idx].update(user)
+            self.model.update_user(user_id)
+            self._update_stats()
+            return
+
+        self.users[idx] = user
+        self.users.sort(key=_account_sort_key)
+        self.model.set_users(self.users)
+        self._apply_filters()
 
     def _on_search_changed(self):
         self.search_query = self.search_edit.text()
@@ -722,184 +1125,38 @@ class AccountsOverview(QWidget):
     def _apply_filters(self):
         self.role_filter = self.role_combo.currentData() or "All"
         self.status_filter = self.status_combo.currentData() or "All"
-        filtered = self._get_filtered_users()
-        self.stats_label.setText(f"Showing {len(filtered)} of {len(self.users)} users")
-        self._populate_table(filtered)
+        self.proxy.set_filters(self.search_query, self.role_filter, self.status_filter)
+        self._update_stats()
         has_filters = self.role_filter != "All" or self.status_filter != "All" or bool(self.search_query.strip())
         self.clear_btn.setVisible(has_filters)
 
+    def _update_stats(self):
+        shown = self.proxy.rowCount()
+        self.stats_label.setText(f"Showing {shown} of {len(self.users)} users")
+        if config.METRICS_ENABLED:
+            from app.services.metrics_server import metrics
+            metrics().set_rendered("accounts_rows", shown)
+
     def _clear_filters(self):
         self.search_edit.clear()
         self.role_combo.setCurrentIndex(0)
         self.status_combo.setCurrentIndex(0)
         self._apply_filters()
 
-    def _populate_table(self, users: list):
-        self.table.setRowCount(len(users))
-        for i, u in enumerate(users):
-            name = u.get("name") or u.get("username", "")
-            role_raw = u.get("role", "")
-            role_display = ROLE_DISPLAY.get(role_raw, role_raw)
-            is_active = u.get("is_active", False)
-            status = "Online" if is_active else "Offline"
-            last_active = _format_last_active(u.get("last_active"))
-
-            self.table.setCellWidget(i, 0, self._user_cell(name, is_active))
-            self.table.setCellWidget(i, 1, self._role_badge(role_display, role_raw))
-            self.table.setCellWidget(i, 2, self._status_badge(status, is_active))
-            last_item = QTableWidgetItem(last_active)
-            last_item.setForeground(QColor(COLORS['gray_800']))
-            last_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(i, 3, last_item)
-            self.table.setCellWidget(i, 4, self._actions_cell(u))
-            self.table.setRowHeight(i, 56)
-
-    def _user_cell(self, name: str, is_active: bool) -> QWidget:
-        cell = QWidget()
-        layout = QHBoxLayout(cell)
-        layout.setContentsMargins(20, 6, 16, 6)
-        layout.setSpacing(12)
-        layout.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        initials = _get_initials(name)
-        color = _get_avatar_color(name)
-        avatar_container = QWidget()
-        avatar_container.setFixedSize(36, 36)
-        avatar_container.setStyleSheet(f"background-color: {color}; border-radius: 18px;")
-        avatar_layout = QVBoxLayout(avatar_container)
-        avatar_layout.setContentsMargins(0, 0, 0, 0)
-        avatar_layout.setAlignment(Qt.AlignCenter)
-        init_label = QLabel(initials)
-        init_label.setStyleSheet("color: #1F2937; font-weight: 700; font-size: 13px; background: transparent;")
-        init_label.setAlignment(Qt.AlignCenter)
-        avatar_layout.addWidget(init_label)
-        dot = QLabel()
-        dot.setFixedSize(14, 14)
-        dot.setStyleSheet(f"""
-            background-color: {'#10B981' if is_active else COLORS['gray_400']};
-            border-radius: 7px;
-            border: 2px solid {color};
-        """)
-        dot.setParent(avatar_container)
-        dot.setGeometry(22, 22, 14, 14)
-        dot.raise_()
-        layout.addWidget(avatar_container)
-        name_label = QLabel(name)
-        name_label.setStyleSheet(f"font-weight: {FONT_WEIGHTS['medium']}; font-size: {FONT_SIZES['base']}px; color: {COLORS['gray_800']};")
-        layout.addWidget(name_label)
-        return cell
-
-    def _role_badge(self, text: str, role_raw: str) -> QWidget:
-        cell = QWidget()
-        cell_layout = QHBoxLayout(cell)
-        cell_layout.setContentsMargins(0, 0, 0, 0)
-        cell_layout.setAlignment(Qt.AlignCenter)
-        badge = QFrame()
-        badge.setMaximumWidth(180)
-        layout = QHBoxLayout(badge)
-        layout.setContentsMargins(6, 4, 6, 4)
-        layout.setSpacing(6)
-        layout.setAlignment(Qt.AlignCenter)
-        style = _get_role_style(role_raw)
-        badge.setStyleSheet(f"""
-            QFrame {{ {style} border-radius: 8px; min-height: 16px; max-height: 36px; }}
-            QFrame QLabel {{ background: transparent; border: none; }}
-        """)
-        import os
-        from app.ui.components.icon_utils import asset_path
-        _ROLE_ICONS = {"cashier": "cashier.png", "operator_a": "operator_b.png", "operator_b": "operator_a.png"}
-        icon_file = _ROLE_ICONS.get(role_raw, f"{role_raw}.png")
-        icon_path = f"icons/role/{icon_file}"
-        full_path = asset_path(*icon_path.split("/"))
-        if os.path.exists(full_path):
-            try:
-                sz = 20
-                px = QPixmap(full_path)
-                if not px.isNull():
-                    px = px.scaled(sz, sz, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    icon_lbl = QLabel()
-                    icon_lbl.setFixedSize(sz, sz)
-                    icon_lbl.setAlignment(Qt.AlignCenter)
-                    icon_lbl.setPixmap(px)
-                    icon_lbl.setStyleSheet("background: transparent; border: none;")
-                    layout.addWidget(icon_lbl)
-            except Exception:
-                pass
-        lbl = QLabel(text)
-        lbl.setStyleSheet(f"font-size: {FONT_SIZES['xs']}px; font-weight: {FONT_WEIGHTS['medium']}; background: transparent; border: none;")
-        layout.addWidget(lbl, 0, Qt.AlignCenter)
-        cell_layout.addWidget(badge)
-        return cell
-
-    def _status_badge(self, text: str, is_active: bool) -> QWidget:
-        cell = QWidget()
-        cell_layout = QHBoxLayout(cell)
-        cell_layout.setContentsMargins(0, 0, 0, 0)
-        cell_layout.setAlignment(Qt.AlignCenter)
-        badge = QFrame()
-        layout = QHBoxLayout(badge)
-        layout.setContentsMargins(8, 4, 10, 4)
-        layout.setSpacing(4)
-        layout.setAlignment(Qt.AlignCenter)
-        style = _get_status_style(is_active)
-        badge.setStyleSheet(f"""
-            QFrame {{ {style} border-radius: 8px; min-height: 12px; max-height: 28px; }}
-            QFrame QLabel {{ background: transparent; border: none; }}
-        """)
-        dot = QFrame()
-        dot.setFixedSize(8, 8)
-        dot.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        dot.setStyleSheet(f"""
-            QFrame {{
-                background-color: {'#10B981' if is_active else COLORS['gray_500']};
-                border-radius: 4px;
-                border: none;
-                min-width: 8px; max-width: 8px; min-height: 8px; max-height: 8px;
-            }}
-        """)
-        layout.addWidget(dot)
-        lbl = QLabel(text)
-        lbl.setStyleSheet(f"font-size: {FONT_SIZES['xs']}px; font-weight: {FONT_WEIGHTS['medium']}; background: transparent;")
-        layout.addWidget(lbl)
-        cell_layout.addWidget(badge)
-        return cell
-
-    def _actions_cell(self, user: dict) -> QWidget:
-        """Actions: Edit and Delete icon buttons."""
-        cell = QWidget()
-        layout = QHBoxLayout(cell)
-        layout.setContentsMargins(8, 0, 8, 0)
-        layout.setSpacing(8)
-        layout.setAlignment(Qt.AlignCenter)
-
-        # Edit button
-        edit_btn = QToolButton()
-        edit_btn.setFixedSize(32, 32)
-        edit_btn.setCursor(Qt.PointingHandCursor)
-        edit_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        edit_btn.setToolTip("Edit")
-        edit_btn.setStyleSheet(f"""
-            QToolButton {{ background: #EFF6FF; border-radius: {RADIUS['lg']}px; border: none; }}
-            QToolButton:hover {{ background: #DBEAFE; }}
-        """)
-        set_icon(edit_btn, "icons/actions/edit.png", DIMENSIONS['icon_md'])
-        edit_btn.clicked.connect(lambda checked, u=user: self._on_edit(u))
-
-        # Delete button
-        del_btn = QToolButton()
-        del_btn.setFixedSize(32, 32)
-        del_btn.setCursor(Qt.PointingHandCursor)
-        del_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        del_btn.setToolTip("Delete")
-        del_btn.setStyleSheet(f"""
-            QToolButton {{ background: #FEF2F2; border-radius: {RADIUS['lg']}px; border: none; }}
-            QToolButton:hover {{ background: #FEE2E2; }}
-        """)
-        set_icon(del_btn, "icons/actions/trash_bin.png", 24)
-        del_btn.clicked.connect(lambda checked, u=user: self._on_delete(u))
-
-        layout.addWidget(edit_btn)
-        layout.addWidget(del_btn)
-        return cell
+    def eventFilter(self, obj, event):
+        """Hover feedback and pointer cursor over the painted Edit/Delete buttons."""
+        if obj is self.table.viewport() and event.type() in (QEvent.MouseMove, QEvent.Leave):
+            hover = (None, None)
+            if event.type() == QEvent.MouseMove:
+                pos = event.position().toPoint()
+                index = self.table.indexAt(pos)
+                if index.isValid() and index.column() == _COL_ACTIONS:
+                    hover = (index.row(), self.delegate.button_at(self.table.visualRect(index), pos))
+            if hover != self.delegate.hover:
+                self.delegate.hover = hover
+                obj.setCursor(Qt.PointingHandCursor if hover[1] else Qt.ArrowCursor)
+                obj.update()
+        return super().eventFilter(obj, event)
 
     def _on_create(self):
         """Open create account modal."""
@@ -907,6 +1164,73 @@ class AccountsOverview(QWidget):
         if dlg.exec() == QDialog.DialogCode.Accepted:
             self._load_users()
 
+    def _on_import(self):
+        """Bulk-create accounts from a CSV file (username,password,role,name)."""
+        parent = self.window()
+        path, _ = QFileDialog.getOpenFileName(parent, "Import accounts", "", "CSV files (*.csv);;All files (*)")
+        if not path:
+            return
+        rows = accounts_import.read_csv(path)
+        if rows is None:
+            QMessageBox.critical(parent, "Import failed",
+                                 "Could not read the file. It needs a header row with\n"
+                                 "username,password,role,name columns.")
+            return
+        if not rows:
+            QMessageBox.information(parent, "Import", "The file has no accounts.")
+            return
+
+        confirm = QMessageBox(QMessageBox.Icon.Question, "Import accounts",
+                              f"Create {len(rows)} account{'s' if len(rows) != 1 else ''} from\n{path}?",
+                              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, parent)
+        confirm.setCheckBox(QCheckBox("Reset password, role and name of existing accounts"))
+        if confirm.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        # Username check on a query worker, hashing (process pool) on a CPU worker,
+        # then the one-transaction insert on a query worker. Owned by the button, so reloading
+        # or hiding the page (cancel_owner(self)) never drops an import half-way.
+        reset_existing = confirm.checkBox().isChecked()
+        self.import_btn.setEnabled(False)
+        self.import_btn.setText("Importing...")
+        future = query_service().submit(accounts_import.prepare, rows, reset_existing, owner=self.import_btn)
+        future.succeeded.connect(lambda prepared: self._hash_import(rows, prepared, reset_existing))
+        future.failed.connect(lambda err: self._on_import_done(None, err))
+
+    def _hash_import(self, rows: list, prepared: tuple, reset_existing: bool):
+        report, accounts = prepared
+        if not accounts:
+            self._insert_import(rows, report, accounts, [], reset_existing)
+            return
+        future = cpu_service().submit(accounts_import.hash_passwords, [r["password"] for r in accounts],
+                                      owner=self.import_btn)
+        future.succeeded.connect(lambda hashes: self._insert_import(rows, report, accounts, hashes, reset_existing))
+        future.failed.connect(lambda err: self._on_import_done(None, err))
+
+    def _insert_import(self, rows: list, report: dict, accounts: list, hashes: list, reset_existing: bool):
+        future = query_service().submit(accounts_import.insert, rows, report, accounts, hashes, reset_existing,
+                                        owner=self.import_btn)
+        future.succeeded.connect(self._on_import_done)
+        future.failed.connect(lambda err: self._on_import_done(None, err))
+
+    def _on_import_done(self, report, error: str = None):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("Import CSV")
+        parent = self.window()
+        if report is None:
+            QMessageBox.critical(parent, "Import failed", f"Failed to import accounts.\n\n{error}")
+            return
+        failed = accounts_import.format_errors(report)
+        box = QMessageBox(QMessageBox.Icon.Warning if failed else QMessageBox.Icon.Information,
+                          "Import finished", accounts_import.summarize(report) + ".",
+                          QMessageBox.StandardButton.Ok, parent)
+        if failed:
+            box.setInformativeText("Rows that were not imported are listed under Show Details.")
+            box.setDetailedText(failed)
+        box.exec()
+        if any(r["status"] != "error" for r in report):
+            self._load_users()
+
     def _on_edit(self, user: dict):
         """Open edit account modal with user data pre-filled."""
         print(f"[DEBUG] _on_edit called with user_id={user.get('user_id')}, username={user.get('username')}")
@@ -932,10 +1256,15 @@ class AccountsOverview(QWidget):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            ok = db.delete_user_account(user_id)
-            if ok:
-                QMessageBox.information(parent, "Success", "User deleted successfully.")
-                self._load_users()
-            else:
-                err = db.get_last_error() or "Unknown error"
-                QMessageBox.critical(parent, "Error", f"Failed to delete user.\n\n{err}")
+            future = query_service().submit(_delete_account_job, user_id)
+            future.succeeded.connect(self._on_delete_done)
+            future.failed.connect(lambda err: self._on_delete_done((False, err)))
+
+    def _on_delete_done(self, outcome):
+        ok, err = outcome
+        parent = self.window()
+        if ok:
+            QMessageBox.information(parent, "Success", "User deleted successfully.")
+            self._load_users()
+        else:
+            QMessageBox.critical(parent, "Error", f"Failed to delete user.\n\n{err}")
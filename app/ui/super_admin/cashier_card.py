@@ -14,7 +14,7 @@ from app.ui.components.styles import (
     COLORS, FONT_SIZES, FONT_WEIGHTS, SPACING, RADIUS, DIMENSIONS,
     get_card_stylesheet
 )
-from app.ui.components.icon_utils import set_icon
+from app.ui.components.icon_utils import set_icon, set_pixmap
 
 
 def format_currency(amount: float) -> str:
@@ -46,16 +46,30 @@ def _value_label(text: str) -> QLabel:
     return w
 
 
+def _clear_layout(layout):
+    """Remove and delete all widgets and nested layouts from a layout"""
+    while layout.count():
+        item = layout.takeAt(0)
+        if item.widget():
+            item.widget().deleteLater()
+        elif item.layout():
+            _clear_layout(item.layout())
+            item.layout().deleteLater()
+
+
 class CashierCard(QFrame):
     """Cashier card with collapsed/expanded views"""
     
     def __init__(self, cashier_data: dict, is_expanded: bool, show_unclaimed: bool, 
-                 toggle_callback=None, parent=None):
+                 toggle_callback=None, parent=None, print_callback=None):
         super().__init__(parent)
         self.cashier_data = cashier_data
         self.is_expanded = is_expanded
         self.show_unclaimed = show_unclaimed
         self.toggle_callback = toggle_callback
+        self.print_callback = print_callback
+        # Metric value labels of the expanded view, updated in place by set_data
+        self._value_labels = {}
         
         self.setObjectName("cashier-card")
         self.setStyleSheet(get_card_stylesheet())
@@ -93,11 +107,11 @@ class CashierCard(QFrame):
     def _render(self):
         """Render card based on expanded state"""
         self._update_card_size_policy()
-        # Clear existing widgets
-        while self.layout.count():
-            item = self.layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        # Clear existing widgets (nested layouts included)
+        self._value_labels = {}
+        _clear_layout(self.layout)
+        pad = SPACING['3'] if not self.is_expanded else SPACING['4']
+        self.layout.setContentsMargins(pad, pad, pad, pad)
         
         if self.is_expanded:
             self._render_expanded()
@@ -171,6 +185,8 @@ class CashierCard(QFrame):
         """)
         set_icon(btn_print, "icons/card/printer.png", DIMENSIONS['icon_lg'])
         btn_print.setToolTip("Print transaction card")
+        if self.print_callback:
+            btn_print.clicked.connect(lambda: self.print_callback(self.cashier_data['id']))
         icons_group.addWidget(btn_print)
         
         btn_battery = QToolButton()
@@ -201,21 +217,11 @@ class CashierCard(QFrame):
         badge_layout.setSpacing(SPACING['1'])
         
         # Status icon
-        from PySide6.QtGui import QPixmap
-        import os
         status_icon_label = QLabel()
         status_icon_label.setFixedSize(12, 12)
         status_icon_label.setScaledContents(True)
         icon_name = "dot_online.png" if self.cashier_data['is_online'] else "dot_offline.png"
-        icon_path = os.path.join("app", "assets", "icons", "status", icon_name)
-        if os.path.exists(icon_path):
-            pixmap = QPixmap(icon_path)
-            if not pixmap.isNull():
-                status_icon_label.setPixmap(pixmap.scaled(
-                    12, 12,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                ))
+        set_pixmap(status_icon_label, f"icons/status/{icon_name}", 12)
         badge_layout.addWidget(status_icon_label)
         
         # Status text
@@ -266,23 +272,19 @@ class CashierCard(QFrame):
         grid.setVerticalSpacing(SPACING['2'])
         grid.setHorizontalSpacing(SPACING['4'])
         
-        def add_row(r, left_label, left_val, right_label, right_val):
+        def add_row(r, left_label, left_key, right_label, right_key):
             grid.addWidget(_muted_label(left_label), r, 0)
-            grid.addWidget(_value_label(left_val), r, 1)
+            grid.addWidget(self._metric_label(left_key), r, 1)
             grid.addWidget(_muted_label(right_label), r, 2)
-            grid.addWidget(_value_label(right_val), r, 3)
+            grid.addWidget(self._metric_label(right_key), r, 3)
         
-        add_row(0, "Total Bets", format_currency(self.cashier_data['total_bets']),
-                "Cash In", format_currency(self.cashier_data['cash_in']))
-        add_row(1, "Cash Out", format_currency(self.cashier_data['cash_out']),
-                "Draw Bets", format_currency(self.cashier_data['draw_bets']))
+        add_row(0, "Total Bets", 'total_bets', "Cash In", 'cash_in')
+        add_row(1, "Cash Out", 'cash_out', "Draw Bets", 'draw_bets')
         if self.show_unclaimed:
-            add_row(2, "Cancel Bets", format_currency(self.cashier_data['cancel_bets']),
-                    "Unclaimed", format_currency(self.cashier_data['unclaimed']))
-            add_row(3, "Withdraw", format_currency(self.cashier_data['withdraw']), "", "")
+            add_row(2, "Cancel Bets", 'cancel_bets', "Unclaimed", 'unclaimed')
+            add_row(3, "Withdraw", 'withdraw', "", None)
         else:
-            add_row(2, "Cancel Bets", format_currency(self.cashier_data['cancel_bets']),
-                    "Withdraw", format_currency(self.cashier_data['withdraw']))
+            add_row(2, "Cancel Bets", 'cancel_bets', "Withdraw", 'withdraw')
         
         # Ensure columns 2 and 3 have min width so values align
         grid.setColumnStretch(1, 1)
@@ -304,6 +306,7 @@ class CashierCard(QFrame):
         self.layout.addWidget(coh_label)
         coh_value = QLabel(format_currency(self.cashier_data['coh']))
         coh_value.setObjectName("coh-value")
+        self._value_labels['coh'] = coh_value
         coh_value.setAlignment(Qt.AlignmentFlag.AlignHCenter)
         coh_row = QHBoxLayout()
         coh_row.addStretch()
@@ -319,9 +322,37 @@ class CashierCard(QFrame):
         btn_records.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         self.layout.addWidget(btn_records)
     
+    def _metric_label(self, key):
+        """Value label for a metric, registered for in-place updates"""
+        if key is None:
+            return _value_label("")
+        label = _value_label(format_currency(self.cashier_data[key]))
+        self._value_labels[key] = label
+        return label
+    
+    def set_data(self, cashier_data: dict):
+        """
+        Replace card values. Metric-only changes update the value labels in place;
+        name/status/battery changes re-render this card.
+        """
+        if cashier_data == self.cashier_data:
+            return
+        old = self.cashier_data
+        self.cashier_data = cashier_data
+        structural = ('name', 'is_online', 'battery_percentage')
+        if any(old.get(k) != cashier_data.get(k) for k in structural):
+            self._render()
+            return
+        for key, label in self._value_labels.items():
+            label.setText(format_currency(cashier_data[key]))
+    
     def update_state(self, is_expanded: bool, show_unclaimed: bool):
-        """Update card state (used when reusing widget; normally overview recreates cards)."""
-        if self.is_expanded != is_expanded or self.show_unclaimed != show_unclaimed:
-            self.is_expanded = is_expanded
-            self.show_unclaimed = show_unclaimed
+        """Update card state in place; re-renders only when the visible layout changes."""
+        if self.is_expanded == is_expanded and self.show_unclaimed == show_unclaimed:
+            return
+        needs_render = self.is_expanded != is_expanded or is_expanded
+        self.is_expanded = is_expanded
+        self.show_unclaimed = show_unclaimed
+        # Collapsed cards do not show unclaimed amounts: just remember the flag
+        if needs_render:
             self._render()
@@ -0,0 +1,384 @@
+# app/ui/super_admin/cashier_grid_view.py
+"""
+Virtualized cashier grid - model/view alternative to the CashierCard widget grid.
+A QAbstractListModel over CashierData and a QStyledItemDelegate that paints collapsed
+and expanded cards; QListView only paints visible items, so memory and layout cost do
+not grow with a widget tree per cashier. Clicks are hit-tested against the painted
+expand/collapse, print and View Records areas.
+Selected in CashierOverview with config.CASHIER_GRID_MODE = "virtual".
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, Signal
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView
+
+from app.ui.components.styles import COLORS, FONT_SIZES, FONT_WEIGHTS, SPACING, RADIUS, DIMENSIONS
+from app.ui.components.icon_utils import pixmap
+from .cashier_card import format_currency, get_battery_icon_path
+
+CashierRole = Qt.UserRole + 1
+ExpandedRole = Qt.UserRole + 2
+
+# Card geometry (px), matching CashierCard
+_COLLAPSED_HEIGHT = 52
+_HEADER_H = 40
+_NAME_H = 28
+_METRIC_ROW_H = 20
+_BUTTON_H = 36
+
+# Hit-test actions
+ACTION_TOGGLE = "toggle"
+ACTION_PRINT = "print"
+ACTION_RECORDS = "records"
+
+
+class CashierListModel(QAbstractListModel):
+    """List model over CashierData with per-cashier expanded state."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List = []
+        self._row_of: Dict[int, int] = {}
+        self._expanded: Dict[int, bool] = {}
+        self.show_unclaimed = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        cashier = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return cashier.name
+        if role == CashierRole:
+            return cashier
+        if role == ExpandedRole:
+            return self._expanded.get(cashier.id, True)
+        return None
+
+    def set_cashiers(self, cashiers: List, expanded: Dict[int, bool]):
+        """Replace rows. Same ids in the same order only emit dataChanged (no reset)."""
+        self._expanded = expanded
+        if [c.id for c in cashiers] == [c.id for c in self._rows]:
+            self._rows = list(cashiers)
+            if self._rows:
+                self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1))
+            return
+        self.beginResetModel()
+        self._rows = list(cashiers)
+        self._row_of = {c.id: i for i, c in enumerate(self._rows)}
+        self.endResetModel()
+
+    def set_expanded(self, cashier_id: int, expanded: bool):
+        self._expanded[cashier_id] = expanded
+        row = self._row_of.get(cashier_id)
+        if row is not None:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [ExpandedRole, Qt.SizeHintRole])
+
+    def set_show_unclaimed(self, show: bool):
+        if show != self.show_unclaimed:
+            self.show_unclaimed = show
+            # Expanded card height depends on the number of metric rows
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+
+    def row_of(self, cashier_id: int) -> Optional[int]:
+        return self._row_of.get(cashier_id)
+
+
+def _font(base: QFont, size_key: str, weight_key: str = 'normal') -> QFont:
+    f = QFont(base)
+    f.setPixelSize(FONT_SIZES[size_key])
+    f.setWeight(QFont.Weight(FONT_WEIGHTS[weight_key]))
+    return f
+
+
+class CashierCardDelegate(QStyledItemDelegate):
+    """Paints collapsed/expanded cashier cards and hit-tests their actions."""
+
+    def __init__(self, model: CashierListModel, parent=None):
+        super().__init__(parent)
+        self._model = model
+        self.card_width = DIMENSIONS['card_min_width']
+        # (row, action) under the mouse, set by the view for hover feedback
+        self.hover = (None, None)
+
+    # ---------- geometry ----------
+
+    def _metric_rows(self) -> int:
+        return 4 if self._model.show_unclaimed else 3
+
+    def _expanded_height(self) -> int:
+        p = SPACING['4']
+        rows = self._metric_rows()
+        grid_h = rows * _METRIC_ROW_H + (rows - 1) * SPACING['2']
+        return (p + _HEADER_H + SPACING['4'] + _NAME_H + SPACING['4'] + grid_h
+                + SPACING['4'] + 1 + SPACING['3'] + 18 + 28 + SPACING['3'] + _BUTTON_H + p)
+
+    def sizeHint(self, option, index):
+        expanded = index.data(ExpandedRole)
+        return QSize(self.card_width, self._expanded_height() if expanded else _COLLAPSED_HEIGHT)
+
+    def _layout(self, rect: QRect, expanded: bool) -> Dict[str, QRect]:
+        """Rects of the card parts (shared by paint and hit_test)."""
+        r = rect.adjusted(0, 0, -1, -1)
+        if not expanded:
+            p = SPACING['3']
+            mid = r.top() + r.height() // 2
+            return {
+                'card': r,
+                'dot': QRect(r.left() + p, mid - 4, 8, 8),
+                'name': QRect(r.left() + p + 16, r.top(), r.width() - 2 * p - 48, r.height()),
+                ACTION_TOGGLE: QRect(r.right() - p - 28, mid - 14, 28, 28),
+            }
+        p = SPACING['4']
+        x, y, w = r.left() + p, r.top() + p, r.width() - 2 * p
+        parts = {
+            'card': r,
+            ACTION_PRINT: QRect(x, y, 40, 40),
+            'battery': QRect(x + 48, y, 40, 40),
+            'badge': QRect(x + 100, y + 8, 84, 24),
+            ACTION_TOGGLE: QRect(x + w - 36, y + 2, 36, 36),
+        }
+        y += _HEADER_H + SPACING['4']
+        parts['name'] = QRect(x, y, w, _NAME_H)
+        y += _NAME_H + SPACING['4']
+        rows = self._metric_rows()
+        parts['grid'] = QRect(x, y, w, rows * _METRIC_ROW_H + (rows - 1) * SPACING['2'])
+        y += parts['grid'].height() + SPACING['4']
+        parts['separator'] = QRect(x, y, w, 1)
+        y += 1 + SPACING['3']
+        parts['coh_label'] = QRect(x, y, w, 18)
+        y += 18
+        parts['coh_value'] = QRect(x, y, w, 28)
+        y += 28 + SPACING['3']
+        parts[ACTION_RECORDS] = QRect(x, y, w, _BUTTON_H)
+        return parts
+
+    def hit_test(self, rect: QRect, index, pos) -> Optional[str]:
+        """Return the action under pos (view coordinates) for the card painted in rect."""
+        parts = self._layout(rect, bool(index.data(ExpandedRole)))
+        for action in (ACTION_TOGGLE, ACTION_PRINT, ACTION_RECORDS):
+            if action in parts and parts[action].contains(pos):
+                return action
+        return None
+
+    # ---------- painting ----------
+
+    def _draw_icon(self, painter: QPainter, rect: QRect, rel_path: str, size: int):
+        painter.drawPixmap(rect.center().x() - size // 2 + 1, rect.center().y() - size // 2 + 1,
+                           pixmap(rel_path, size))
+
+    def paint(self, painter: QPainter, option, index):
+        cashier = index.data(CashierRole)
+        if cashier is None:
+            return
+        expanded = bool(index.data(ExpandedRole))
+        parts = self._layout(option.rect, expanded)
+        hover_action = self.hover[1] if self.hover[0] == index.row() else None
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Card: soft shadow + white rounded rect with border
+        card = parts['card']
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 14))
+        painter.drawRoundedRect(card.translated(0, 2), RADIUS['xl'], RADIUS['xl'])
+        painter.setPen(QPen(QColor(COLORS['gray_200']), 1))
+        painter.setBrush(QColor(COLORS['white']))
+        painter.drawRoundedRect(card, RADIUS['xl'], RADIUS['xl'])
+
+        base = option.font
+        if not expanded:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(COLORS['green_500'] if cashier.is_online else COLORS['red_500']))
+            painter.drawEllipse(parts['dot'])
+            painter.setPen(QColor(COLORS['gray_800']))
+            painter.setFont(_font(base, 'base', 'medium'))
+            painter.drawText(parts['name'], Qt.AlignCenter, cashier.name)
+            self._paint_action_bg(painter, parts[ACTION_TOGGLE], hover_action == ACTION_TOGGLE, None)
+            self._draw_icon(painter, parts[ACTION_TOGGLE], "icons/topbar/eye.png", DIMENSIONS['icon_md'])
+            painter.restore()
+            return
+
+        # Header: print, battery, status badge, collapse
+        self._paint_action_bg(painter, parts[ACTION_PRINT], hover_action == ACTION_PRINT,
+                              COLORS['blue_200'] if hover_action == ACTION_PRINT else COLORS['blue_100'])
+        self._draw_icon(painter, parts[ACTION_PRINT], "icons/card/printer.png", DIMENSIONS['icon_lg'])
+        self._paint_action_bg(painter, parts['battery'], False, COLORS['gray_100'])
+        self._draw_icon(painter, parts['battery'], get_battery_icon_path(cashier.battery_percentage),
+                        DIMENSIONS['icon_lg'])
+
+        badge = parts['badge']
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(COLORS['green_100'] if cashier.is_online else COLORS['red_100']))
+        painter.drawRoundedRect(badge, badge.height() / 2, badge.height() / 2)
+        self._draw_icon(painter, QRect(badge.left() + 8, badge.top() + 6, 12, 12),
+                        "icons/status/dot_online.png" if cashier.is_online else "icons/status/dot_offline.png", 12)
+        painter.setPen(QColor(COLORS['green_600'] if cashier.is_online else COLORS['red_600']))
+        painter.setFont(_font(base, 'xs', 'medium'))
+        painter.drawText(badge.adjusted(24, 0, -8, 0), Qt.AlignVCenter | Qt.AlignLeft,
+                         "Online" if cashier.is_online else "Offline")
+
+        self._paint_action_bg(painter, parts[ACTION_TOGGLE], hover_action == ACTION_TOGGLE, None)
+        self._draw_icon(painter, parts[ACTION_TOGGLE], "icons/topbar/eye-off.png", DIMENSIONS['icon_md'])
+
+        # Cashier: name
+        name_rect = parts['name']
+        prefix_font = _font(base, 'sm')
+        painter.setFont(prefix_font)
+        painter.setPen(QColor(COLORS['gray_500']))
+        prefix = "Cashier: "
+        painter.drawText(name_rect, Qt.AlignVCenter | Qt.AlignLeft, prefix)
+        prefix_w = painter.fontMetrics().horizontalAdvance(prefix)
+        painter.setFont(_font(base, 'xl', 'bold'))
+        painter.setPen(QColor(COLORS['gray_800']))
+        painter.drawText(name_rect.adjusted(prefix_w, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft,
+                         painter.fontMetrics().elidedText(cashier.name, Qt.ElideRight, name_rect.width() - prefix_w))
+
+        # Metrics: label/value pairs in two columns
+        if self._model.show_unclaimed:
+            cells = [("Total Bets", cashier.total_bets), ("Cash In", cashier.cash_in),
+                     ("Cash Out", cashier.cash_out), ("Draw Bets", cashier.draw_bets),
+                     ("Cancel Bets", cashier.cancel_bets), ("Unclaimed", cashier.unclaimed),
+                     ("Withdraw", cashier.withdraw)]
+        else:
+            cells = [("Total Bets", cashier.total_bets), ("Cash In", cashier.cash_in),
+                     ("Cash Out", cashier.cash_out), ("Draw Bets", cashier.draw_bets),
+                     ("Cancel Bets", cashier.cancel_bets), ("Withdraw", cashier.withdraw)]
+        grid = parts['grid']
+        half = grid.width() // 2
+        label_font, value_font = _font(base, 'xs'), _font(base, 'sm', 'bold')
+        for i, (label, value) in enumerate(cells):
+            row, col = divmod(i, 2)
+            cell = QRect(grid.left() + col * half, grid.top() + row * (_METRIC_ROW_H + SPACING['2']),
+                         half - SPACING['2'], _METRIC_ROW_H)
+            painter.setFont(label_font)
+            painter.setPen(QColor(COLORS['gray_500']))
+            painter.drawText(cell, Qt.AlignVCenter | Qt.AlignLeft, label)
+            painter.setFont(value_font)
+            painter.setPen(QColor(COLORS['gray_800']))
+            painter.drawText(cell, Qt.AlignVCenter | Qt.AlignRight, format_currency(value))
+
+        # Separator + COH
+        painter.setPen(QPen(QColor(COLORS['gray_200']), 1))
+        sep = parts['separator']
+        painter.drawLine(sep.left(), sep.top(), sep.right(), sep.top())
+        painter.setFont(label_font)
+        painter.setPen(QColor(COLORS['gray_500']))
+        painter.drawText(parts['coh_label'], Qt.AlignVCenter | Qt.AlignLeft, "Cash on Hand (COH)")
+        painter.setFont(_font(base, 'xl', 'bold'))
+        painter.setPen(QColor(COLORS['blue_600']))
+        painter.drawText(parts['coh_value'], Qt.AlignCenter, format_currency(cashier.coh))
+
+        # View Records button
+        btn = parts[ACTION_RECORDS]
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(COLORS['blue_700'] if hover_action == ACTION_RECORDS else COLORS['blue_600']))
+        painter.drawRoundedRect(btn, RADIUS['lg'], RADIUS['lg'])
+        painter.setFont(_font(base, 'sm', 'medium'))
+        painter.setPen(QColor(COLORS['white']))
+        painter.drawText(btn, Qt.AlignCenter, "View Records")
+
+        painter.restore()
+
+    def _paint_action_bg(self, painter: QPainter, rect: QRect, hovered: bool, color: Optional[str]):
+        if hovered and color is None:
+            color = COLORS['gray_100']
+        if color:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(rect, RADIUS['lg'], RADIUS['lg'])
+
+
+class CashierGridView(QListView):
+    """Wrapping icon-mode list of painted cashier cards (4 columns, like the widget grid)."""
+
+    toggle_requested = Signal(int)  # cashier id
+    print_requested = Signal(int)
+    records_requested = Signal(int)
+
+    COLUMNS = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cashier_model = CashierListModel(self)
+        self.card_delegate = CashierCardDelegate(self.cashier_model, self)
+        self.setModel(self.cashier_model)
+        self.setItemDelegate(self.card_delegate)
+
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setUniformItemSizes(False)
+        self.setSpacing(SPACING['2'])
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.setFrameShape(QListView.NoFrame)
+        self.setStyleSheet(f"QListView {{ background-color: {COLORS['gray_50']}; border: none; }}")
+
+    def resizeEvent(self, event):
+        width = self.viewport().width()
+        spacing = self.spacing()
+        card_w = max(DIMENSIONS['card_min_width'], (width - spacing) // self.COLUMNS - 2 * spacing)
+        if card_w != self.card_delegate.card_width:
+            self.card_delegate.card_width = card_w
+            self.scheduleDelayedItemsLayout()
+        super().resizeEvent(event)
+
+    def dataChanged(self, top_left, bottom_right, roles=()):
+        super().dataChanged(top_left, bottom_right, roles)
+        # Expanding/collapsing changes item height: re-run the (cheap, size-hint only) layout
+        if not roles or ExpandedRole in roles:
+            self.scheduleDelayedItemsLayout()
+
+    def _action_at(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return index, None
+        return index, self.card_delegate.hit_test(self.visualRect(index), index, pos)
+
+    def mouseMoveEvent(self, event):
+        index, action = self._action_at(event.position().toPoint())
+        hover = (index.row() if index.isValid() else None, action)
+        if hover != self.card_delegate.hover:
+            old_row = self.card_delegate.hover[0]
+            self.card_delegate.hover = hover
+            self.viewport().setCursor(Qt.PointingHandCursor if action else Qt.ArrowCursor)
+            for row in {old_row, hover[0]} - {None}:
+                self.update(self.cashier_model.index(row))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        old_row = self.card_delegate.hover[0]
+        self.card_delegate.hover = (None, None)
+        if old_row is not None:
+            self.update(self.cashier_model.index(old_row))
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            index, action = self._action_at(event.position().toPoint())
+            if action:
+                cashier_id = index.data(CashierRole).id
+                if action == ACTION_TOGGLE:
+                    self.toggle_requested.emit(cashier_id)
+                elif action == ACTION_PRINT:
+                    self.print_requested.emit(cashier_id)
+                elif action == ACTION_RECORDS:
+                    self.records_requested.emit(cashier_id)
+                event.accept()
+                return
+        super().mouseReleaseEvent(event)
@@ -5,23 +5,40 @@ From COMPLETE_SYSTEM_ALGORITHM.md section 4.2 and CASHIER_OVERVIEW_ALGORITHM.md
 """
 
 from __future__ import annotations
+import html
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
-from PySide6.QtCore import Qt, QTimer, Signal, QSize
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QTextDocument
+from PySide6.QtPrintSupport import QPrinter, QPrintDialog
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
-    QPushButton, QToolButton, QScrollArea, QFrame, QGridLayout
+    QPushButton, QToolButton, QScrollArea, QFrame, QGridLayout, QDialog, QMessageBox
 )
 
 from app.ui.components.styles import (
     COLORS, FONT_SIZES, FONT_WEIGHTS, SPACING, DIMENSIONS, RADIUS,
     get_page_stylesheet
 )
-from .cashier_card import CashierCard
+from .cashier_card import CashierCard, format_currency
+from .cashier_grid_view import CashierGridView
 from app.ui.components.toggle_switch import ToggleSwitch
-from app.ui.components.icon_utils import set_icon
+from app.ui.components.icon_utils import set_icon, set_pixmap
+from app.services.query_service import query_service
+from app.services.prefetch import prefetch_cache
+from app.services.ui_watchdog import traced
+import config
 import db
+from ticket_numbers import ticket_allocator
+
+# Printed transaction cards are numbered from this terminal's leased block of this series
+_CARD_SERIES = "card"
+_CARD_LINES = (
+    ("Total Bets", "total_bets"), ("Cash In", "cash_in"), ("Cash Out", "cash_out"),
+    ("Draw Bets", "draw_bets"), ("Cancel Bets", "cancel_bets"), ("Unclaimed", "unclaimed"),
+    ("Withdraw", "withdraw"),
+)
 
 
 @dataclass
@@ -67,10 +84,13 @@ class CashierOverview(QWidget):
     
     refresh_requested = Signal()
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, grid_mode: Optional[str] = None):
         super().__init__(parent)
         self.setObjectName("page-container")
         
+        # "widgets": one CashierCard per cashier; "virtual": painted model/view grid
+        self.grid_mode = grid_mode or getattr(config, "CASHIER_GRID_MODE", "widgets")
+        
         # State management
         self.cashiers: List[CashierData] = []
         self.global_view_all: bool = True
@@ -79,37 +99,114 @@ class CashierOverview(QWidget):
         self.search_query: str = ""
         self.sort_option: str = "name-asc"
         self.show_tooltip: bool = False
+        self.summary_date = None  # date for card metrics; None = today (server date)
         
         # Debounce timer for search
         self.search_timer: Optional[QTimer] = None
         
-        # Load cashier data from database
-        self._load_cashiers()
+        # True while a cashier query is running on the worker pool
+        self._loading: bool = False
+        # A load was dropped by hideEvent: reload when the page is shown again
+        self._load_cancelled: bool = False
+        
+        # Card widgets by cashier id, reused across renders; ids currently placed in the grid
+        self._cards: Dict[int, CashierCard] = {}
+        self._placed_ids: List[int] = []
         
         self._build_ui()
         self._render_cards()
+        
+        # Load cashier data from database (async; cards render when it arrives)
+        self._load_cashiers()
     
     def _load_cashiers(self):
-        """Load cashier data from database"""
+        """Load cashier data from database on a worker thread"""
+        query_service().cancel_owner(self)
+        self._loading = True
+        self._load_cancelled = False
+        # First load right after login: adopt the query started while the password was verified
+        if prefetch_cache().take(self, self._on_cashiers_loaded, db.fetch_cashier_overview, self.summary_date,
+                                 on_error=self._on_cashiers_failed):
+            return
+        # One round trip: all cashiers with every card metric aggregated server-side
+        future = query_service().submit(db.fetch_cashier_overview, self.summary_date, owner=self)
+        future.succeeded.connect(self._on_cashiers_loaded)
+        future.failed.connect(self._on_cashiers_failed)
+    
+    def _on_cashiers_loaded(self, rows: list):
+        """Build cashier models from fetched rows and re-render (GUI thread)"""
+        self._loading = False
         self.cashiers = []
-        
-        rows = db.fetch_cashiers()
         for row in rows:
             cashier = CashierData(
                 id=row["user_id"],
                 name=row["name"] or row["username"],
                 is_online=row["is_active"],
-                battery_percentage=100,
-                total_bets=0.0,
-                cash_in=0.0,
-                cash_out=0.0,
-                draw_bets=0.0,
-                cancel_bets=0.0,
-                unclaimed=0.0,
-                withdraw=0.0
+                battery_percentage=row["battery_percentage"],
+                total_bets=row["total_bets"],
+                cash_in=row["cash_in"],
+                cash_out=row["cash_out"],
+                draw_bets=row["draw_bets"],
+                cancel_bets=row["cancel_bets"],
+                unclaimed=row["unclaimed"],
+                withdraw=row["withdraw"]
             )
             self.cashiers.append(cashier)
             self.individual_views[cashier.id] = True
+        self._render_cards()
+    
+    def _on_cashiers_failed(self, error: str):
+        """Keep showing the last loaded data if the query fails"""
+        self._loading = False
+        self._render_cards()
+    
+    def apply_user_change(self, change: dict):
+        """
+        Patch one cashier from a db.USER_CHANGES_CHANNEL notification without re-querying.
+        The keyed renderer then touches only that card (plus grid placement if order changed).
+        """
+        user_id = change.get("user_id")
+        existing = next((c for c in self.cashiers if c.id == user_id), None)
+        is_cashier = change.get("op") != "delete" and change.get("role") == "cashier"
+        if existing is None and not is_cashier:
+            return
+        
+        if not is_cashier:
+            # Deleted, or role changed away from cashier
+            self.cashiers.remove(existing)
+            self.individual_views.pop(user_id, None)
+            self._render_cards()
+            return
+        
+        name = change.get("name") or change.get("username") or ""
+        is_online = bool(change.get("is_active"))
+        if existing is None:
+            self.cashiers.append(CashierData(
+                id=user_id, name=name, is_online=is_online, battery_percentage=100,
+                total_bets=0.0, cash_in=0.0, cash_out=0.0, draw_bets=0.0,
+                cancel_bets=0.0, unclaimed=0.0, withdraw=0.0
+            ))
+            self.individual_views[user_id] = True
+            self._render_cards()
+            return
+        
+        existing.name = name
+        existing.is_online = is_online
+        self._render_cards()
+    
+    def showEvent(self, event):
+        """Reload if hiding the page dropped the last load"""
+        super().showEvent(event)
+        if self._load_cancelled:
+            self._load_cashiers()
+    
+    def hideEvent(self, event):
+        """Drop in-flight queries when the page is hidden"""
+        super().hideEvent(event)
+        if self._loading:
+            query_service().cancel_owner(self)
+            self._loading = False
+            self._load_cancelled = True
     
     def _build_ui(self):
         """Build the UI layout"""
@@ -125,6 +222,28 @@ class CashierOverview(QWidget):
         filters = self._build_filters()
         layout.addLayout(filters)
         
+        # Empty state (persistent; shown when no card is visible)
+        self._empty_label = QLabel()
+        self._empty_label.setStyleSheet(f"""
+            QLabel {{
+                font-size: {FONT_SIZES['lg']}px;
+                color: {COLORS['gray_500']};
+                padding: {SPACING['12']}px;
+            }}
+        """)
+        self._empty_label.setAlignment(Qt.AlignCenter)
+        self._empty_label.hide()
+        
+        if self.grid_mode == "virtual":
+            # Painted cards: only visible items cost anything
+            self.grid_view = CashierGridView()
+            self.grid_view.toggle_requested.connect(self._on_individual_toggle)
+            self.grid_view.print_requested.connect(self._on_print_requested)
+            layout.addWidget(self._empty_label)
+            layout.addWidget(self.grid_view, 1)
+            self.setStyleSheet(get_page_stylesheet())
+            return
+        
         # Cards Grid (scrollable)
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -139,6 +258,9 @@ class CashierOverview(QWidget):
         self.cards_layout = QGridLayout(self.cards_container)
         self.cards_layout.setSpacing(SPACING['4'])
         self.cards_layout.setAlignment(Qt.AlignTop)
+        for c in range(4):
+            self.cards_layout.setColumnStretch(c, 1)
+        self.cards_layout.addWidget(self._empty_label, 0, 0, 1, 4)
         
         scroll_area.setWidget(self.cards_container)
         layout.addWidget(scroll_area)
@@ -196,24 +318,7 @@ class CashierOverview(QWidget):
                 background-color: {COLORS['gray_200']};
             }}
         """)
-        # Load refresh icon from assets
-        from PySide6.QtGui import QPixmap, QIcon
-        import os
-        refresh_path = os.path.join("app", "assets", "icons", "topbar", "refresh.png")
-        if os.path.exists(refresh_path):
-            refresh_pixmap = QPixmap(refresh_path)
-            if not refresh_pixmap.isNull():
-                scaled_pixmap = refresh_pixmap.scaled(
-                    DIMENSIONS['icon_lg'], 
-                    DIMENSIONS['icon_lg'],
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                btn_refresh.setIcon(QIcon(scaled_pixmap))
-                btn_refresh.setIconSize(QSize(DIMENSIONS['icon_lg'], DIMENSIONS['icon_lg']))
-        else:
-            # Fallback to icon_utils if file doesn't exist
-            set_icon(btn_refresh, "icons/topbar/refresh.png", DIMENSIONS['icon_lg'])
+        set_icon(btn_refresh, "icons/topbar/refresh.png", DIMENSIONS['icon_lg'])
         btn_refresh.setToolTip("Refresh page")
         btn_refresh.clicked.connect(self._on_refresh)
         controls.addWidget(btn_refresh)
@@ -298,17 +403,7 @@ class CashierOverview(QWidget):
         search_icon_label = QLabel()
         search_icon_label.setFixedSize(20, 20)
         search_icon_label.setScaledContents(True)
-        from PySide6.QtGui import QPixmap
-        import os
-        search_icon_path = os.path.join("app", "assets", "icons", "topbar", "search.png")
-        if os.path.exists(search_icon_path):
-            search_pixmap = QPixmap(search_icon_path)
-            if not search_pixmap.isNull():
-                search_icon_label.setPixmap(search_pixmap.scaled(
-                    20, 20,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                ))
+        set_pixmap(search_icon_label, "icons/topbar/search.png", 20)
         search_layout.addWidget(search_icon_label)
         
         # Search input
@@ -349,7 +444,6 @@ class CashierOverview(QWidget):
         """Handle refresh button click"""
         self.refresh_requested.emit()
         self._load_cashiers()
-        self._render_cards()
     
     def _on_unclaimed_toggle(self, checked: bool):
         """Handle unclaimed toggle switch"""
@@ -395,10 +489,47 @@ class CashierOverview(QWidget):
         self._render_cards()
     
     def _on_individual_toggle(self, cashier_id: int):
-        """Handle individual card toggle"""
+        """Handle individual card toggle (only that card is touched)"""
         self.individual_views[cashier_id] = not self.individual_views[cashier_id]
-        self._render_cards()
+        if self.grid_mode == "virtual":
+            self.grid_view.cashier_model.set_expanded(cashier_id, self.individual_views[cashier_id])
+            return
+        card = self._cards.get(cashier_id)
+        if card is not None:
+            card.update_state(self.individual_views[cashier_id], self.show_unclaimed)
     
+    def _on_print_requested(self, cashier_id: int):
+        """Number the transaction card (leased block; a worker call in case a lease is due), then print"""
+        cashier = next((c for c in self.cashiers if c.id == cashier_id), None)
+        if cashier is None:
+            return
+        future = query_service().submit(ticket_allocator(_CARD_SERIES).next_number)
+        future.succeeded.connect(lambda number: self._print_card(cashier, number))
+        future.failed.connect(lambda err: self._print_card(cashier, None))
+
+    def _print_card(self, cashier: CashierData, number: Optional[str]):
+        if number is None:
+            QMessageBox.warning(self, "Print", "No card number available: the database cannot be reached.")
+            return
+        printer = QPrinter()
+        dialog = QPrintDialog(printer, self)
+        dialog.setWindowTitle(f"Print card {number}")
+        if dialog.exec() != QDialog.Accepted:
+            ticket_allocator(_CARD_SERIES).void(number)
+            return
+        data = cashier.to_dict()
+        rows = "".join(
+            f"<tr><td>{label}</td><td align='right'>{format_currency(data[key])}</td></tr>"
+            for label, key in _CARD_LINES if key != "unclaimed" or self.show_unclaimed
+        )
+        doc = QTextDocument()
+        doc.setHtml(
+            f"<h3>Cashier: {html.escape(cashier.name)}</h3><p>Card No. {number}</p>"
+            f"<table width='100%'>{rows}</table>"
+            f"<p><b>Cash on Hand (COH): {format_currency(cashier.coh)}</b></p>"
+        )
+        doc.print_(printer)
+
     def _get_filtered_sorted_cashiers(self) -> List[CashierData]:
         """Apply filters and sorting to cashier data"""
         # Filter by search
@@ -429,53 +560,98 @@ class CashierOverview(QWidget):
         
         return filtered
     
+    def _empty_text(self) -> str:
+        if self._loading and not self.cashiers:
+            return "Loading cashiers..."
+        return f'No cashiers found matching "{self.search_query}"'
+    
+    def _render_virtual(self, cashiers: List[CashierData]):
+        """Hand the filtered/sorted rows to the model; the view paints only what is visible."""
+        model = self.grid_view.cashier_model
+        model.set_show_unclaimed(self.show_unclaimed)
+        model.set_cashiers(cashiers, self.individual_views)
+        if config.METRICS_ENABLED:
+            from app.services.metrics_server import metrics
+            metrics().set_rendered("cashier_grid", len(cashiers))
+        if not cashiers:
+            self._empty_label.setText(self._empty_text())
+            self._empty_label.show()
+            self.grid_view.hide()
+        else:
+            self._empty_label.hide()
+            self.grid_view.show()
+    
+    @traced("card_render")
     def _render_cards(self):
-        """Render cashier cards in grid"""
-        # Clear existing cards
-        while self.cards_layout.count():
-            item = self.cards_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # Get filtered and sorted cashiers
+        """
+        Reconcile the card grid with the filtered/sorted cashiers (keyed by cashier id).
+        Existing cards are reused and updated in place; widgets are only re-placed in the
+        grid when the visible order changes, and only removed cashiers lose their card.
+        """
         cashiers = self._get_filtered_sorted_cashiers()
+        if self.grid_mode == "virtual":
+            self._render_virtual(cashiers)
+            return
+        
+        # Drop cards of cashiers that no longer exist (filtered-out ones are kept hidden for reuse)
+        known_ids = {c.id for c in self.cashiers}
+        for cashier_id in [i for i in self._cards if i not in known_ids]:
+            card = self._cards.pop(cashier_id)
+            self.cards_layout.removeWidget(card)
+            card.deleteLater()
         
         if not cashiers:
             # Empty state
-            empty_label = QLabel(f'No cashiers found matching "{self.search_query}"')
-            empty_label.setStyleSheet(f"""
-                QLabel {{
-                    font-size: {FONT_SIZES['lg']}px;
-                    color: {COLORS['gray_500']};
-                    padding: {SPACING['12']}px;
-                }}
-            """)
-            empty_label.setAlignment(Qt.AlignCenter)
-            self.cards_layout.addWidget(empty_label, 0, 0, 1, 4)
+            self._empty_label.setText(self._empty_text())
+            self._place_cards([])
+            self._empty_label.show()
             return
+        self._empty_label.hide()
         
-        # Render cards in responsive grid (4 columns max); equal width per column
-        cols = 4
-        for c in range(cols):
-            self.cards_layout.setColumnStretch(c, 1)
-        
-        row = col = 0
+        # Create missing cards, update existing ones in place (no-ops when unchanged)
         for cashier in cashiers:
             is_expanded = self.individual_views.get(cashier.id, self.global_view_all)
-            
-            card = CashierCard(
-                cashier.to_dict(),
-                is_expanded,
-                self.show_unclaimed,
-                self._on_individual_toggle
-            )
+            card = self._cards.get(cashier.id)
+            if card is None:
+                card = CashierCard(
+                    cashier.to_dict(),
+                    is_expanded,
+                    self.show_unclaimed,
+                    self._on_individual_toggle,
+                    print_callback=self._on_print_requested
+                )
+                self._cards[cashier.id] = card
+            else:
+                card.set_data(cashier.to_dict())
+                card.update_state(is_expanded, self.show_unclaimed)
+        
+        self._place_cards([c.id for c in cashiers])
+    
+    def _place_cards(self, ordered_ids: List[int]):
+        """Lay out cards in grid order; skipped entirely when the order is unchanged."""
+        if ordered_ids == self._placed_ids:
+            return
+        visible = set(ordered_ids)
+        for cashier_id in self._placed_ids:
+            card = self._cards.get(cashier_id)
+            if card is not None:
+                self.cards_layout.removeWidget(card)
+                if cashier_id not in visible:
+                    card.hide()
+        
+        # Render cards in responsive grid (4 columns max); equal width per column
+        cols = 4
+        for i, cashier_id in enumerate(ordered_ids):
+            card = self._cards[cashier_id]
             # Align cards to top and center horizontally so collapsed cards stay small and don't stretch with row
-            self.cards_layout.addWidget(card, row, col, Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
-            
-            col += 1
-            if col >= cols:
-                col = 0
-                row += 1
+            self.cards_layout.addWidget(
+                card, i // cols, i % cols, Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter
+            )
+            card.show()
+        self._placed_ids = list(ordered_ids)
+        if config.METRICS_ENABLED:
+            from app.services.metrics_server import metrics
+            metrics().set_rendered("cashier_cards", len(ordered_ids))
     
     def update_cashiers(self, cashiers: List[CashierData]):
         """Update cashier data from database"""
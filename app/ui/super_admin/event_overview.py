@@ -0,0 +1,279 @@
+# app/ui/super_admin/event_overview.py
+"""
+Event Overview page - today's fights and their betting state (fight_state.py).
+Status changes from any terminal arrive through LISTEN/NOTIFY and patch the table at once.
+"""
+
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QMessageBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+
+import db
+import fight_state
+from app.ui.components.styles import COLORS, FONT_SIZES, FONT_WEIGHTS, RADIUS
+from app.services.query_service import query_service
+from app.services.db_health import connection_monitor
+from app.services.notify_listener import notification_listener
+from app.services.ui_watchdog import traced
+
+_COLUMNS = ("Fight", "Status", "Result", "Min bet", "Max bet", "Closed at", "Close wait")
+
+_STATUS_DISPLAY = {
+    "pending": ("Pending", COLORS['gray_500']),
+    "open": ("Open", COLORS['green_600']),
+    "last_call": ("Last call", COLORS['yellow_600']),
+    "closed": ("Closed", COLORS['red_600']),
+    "settled": ("Settled", COLORS['blue_600']),
+    "cancelled": ("Cancelled", COLORS['gray_400']),
+}
+
+# Toolbar actions: (label, target status); enabled per selected fight by FIGHT_TRANSITIONS
+_ACTIONS = (("Open betting", "open"), ("Last call", "last_call"), ("Close betting", "closed"), ("Cancel fight", "cancelled"))
+
+
+# ---------- Worker-thread jobs (run via query_service, never on the GUI thread) ----------
+
+def _fetch_event_job():
+    """Returns (event or None, fights), or None if the database is unreachable."""
+    if not db.is_online():
+        return None
+    event = fight_state.fetch_event()
+    fights = fight_state.fetch_event_fights()
+    return (event, fights) if db.is_online() else None
+
+
+def _transition_job(fight_id: int, status: str, user_id: Optional[int]):
+    """Returns (fight dict, None) or (None, error)."""
+    fight = fight_state.transition(fight_id, status, user_id)
+    return fight, None if fight is not None else (db.get_last_error() or "Unknown error")
+
+
+def _create_fight_job():
+    """Returns (fight_id, None) or (None, error)."""
+    fight_id = fight_state.create_fight()
+    return fight_id, None if fight_id is not None else (db.get_last_error() or "Unknown error")
+
+
+class EventOverview(QWidget):
+    """Today's fights with open / last call / close controls."""
+
+    def __init__(self, user: Optional[dict] = None, parent=None):
+        super().__init__(parent)
+        self.setObjectName("page-container")
+        self.user = user or {}
+        self.fights: list = []
+        self._loading = False
+        self._busy = False
+        self._build_ui()
+        listener = notification_listener()
+        listener.fight_state_changed.connect(self.apply_fight_change)
+        listener.reconnected.connect(self._load_fights)
+        # Fights load in showEvent (also on the first show)
+
+    def _build_ui(self):
+        GAP = 12
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(32, 24, 32, 24)
+        layout.setSpacing(GAP)
+
+        header = QHBoxLayout()
+        header.setSpacing(GAP)
+        title_col = QVBoxLayout()
+        title_col.setSpacing(4)
+        title = QLabel("Event Overview")
+        title.setStyleSheet(f"font-size: {FONT_SIZES['2xl']}px; font-weight: {FONT_WEIGHTS['bold']}; color: {COLORS['gray_800']};")
+        self.subtitle = QLabel("No event today")
+        self.subtitle.setStyleSheet(f"font-size: {FONT_SIZES['sm']}px; color: {COLORS['gray_500']};")
+        title_col.addWidget(title)
+        title_col.addWidget(self.subtitle)
+        header.addLayout(title_col)
+        header.addStretch()
+
+        self.new_fight_btn = QPushButton("New fight")
+        self.new_fight_btn.setFixedHeight(40)
+        self.new_fight_btn.setStyleSheet(f"""
+            QPushButton {{ background-color: #FBBF24; color: #111827; border-radius: {RADIUS['lg']}px;
+            padding: 8px 16px; font-weight: 600; }}
+            QPushButton:hover {{ background-color: #F59E0B; }}
+            QPushButton:disabled {{ color: {COLORS['gray_400']}; }}
+        """)
+        self.new_fight_btn.setCursor(Qt.PointingHandCursor)
+        self.new_fight_btn.clicked.connect(self._on_new_fight)
+        header.addWidget(self.new_fight_btn)
+        layout.addLayout(header)
+
+        actions = QHBoxLayout()
+        actions.setSpacing(GAP)
+        self.action_btns = {}
+        for label, status in _ACTIONS:
+            btn = QPushButton(label)
+            btn.setFixedHeight(40)
+            btn.setStyleSheet(f"""
+                QPushButton {{ background-color: {COLORS['white']}; color: {COLORS['gray_800']};
+                border: 1px solid {COLORS['gray_300']}; border-radius: {RADIUS['lg']}px;
+                padding: 8px 16px; font-weight: 600; }}
+                QPushButton:hover {{ background-color: {COLORS['gray_100']}; }}
+                QPushButton:disabled {{ color: {COLORS['gray_400']}; }}
+            """)
+            btn.setCursor(Qt.PointingHandCursor)
+            btn.clicked.connect(lambda _=False, s=status: self._on_transition(s))
+            actions.addWidget(btn)
+            self.action_btns[status] = btn
+        actions.addStretch()
+        layout.addLayout(actions)
+
+        self.db_error_banner = QLabel("Database connection unavailable.")
+        self.db_error_banner.setStyleSheet(f"""
+            padding: 12px 16px; background-color: #FEF2F2; color: #B91C1C;
+            border-radius: {RADIUS['md']}px; font-size: {FONT_SIZES['sm']}px;
+        """)
+        self.db_error_banner.setWordWrap(True)
+        self.db_error_banner.setVisible(not db.is_online())
+        layout.addWidget(self.db_error_banner)
+        connection_monitor().status_changed.connect(self._on_db_status)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setStyleSheet(f"""
+            QTableWidget {{ background-color: {COLORS['white']}; border: 1px solid {COLORS['gray_200']};
+            border-radius: {RADIUS['lg']}px; font-size: {FONT_SIZES['sm']}px; }}
+        """)
+        self.table.itemSelectionChanged.connect(self._update_actions)
+        layout.addWidget(self.table, 1)
+        self._update_actions()
+
+    # ---------- data ----------
+
+    def _load_fights(self):
+        """Fetch today's event and fights on a worker thread."""
+        query_service().cancel_owner(self)
+        self._loading = True
+        future = query_service().submit(_fetch_event_job, owner=self)
+        future.succeeded.connect(self._on_fights_loaded)
+        future.failed.connect(lambda err: self._on_fights_loaded(None))
+
+    @traced("table_populate")
+    def _on_fights_loaded(self, result):
+        self._loading = False
+        if result is None:
+            self.db_error_banner.setVisible(True)
+            return
+        self.db_error_banner.setVisible(False)
+        event, self.fights = result
+        if event is None:
+            self.subtitle.setText("No event today")
+        else:
+            self.subtitle.setText(f"{event['name'] or event['event_date']} - {event['status']}")
+        selected = self._selected_fight()
+        self.table.setRowCount(len(self.fights))
+        for row, fight in enumerate(self.fights):
+            self._set_row(row, fight)
+            if selected is not None and fight["fight_id"] == selected["fight_id"]:
+                self.table.selectRow(row)
+        self._update_actions()
+
+    def _set_row(self, row: int, fight: dict):
+        label, color = _STATUS_DISPLAY.get(fight["status"], (fight["status"], COLORS['gray_500']))
+        closed_at = fight.get("closed_at")
+        wait = fight.get("close_wait_ms")
+        values = (
+            str(fight["fight_number"]),
+            label,
+            (fight.get("result") or "").capitalize(),
+            f"{fight['min_bet']:,.2f}" if fight.get("min_bet") is not None else "",
+            f"{fight['max_bet']:,.2f}" if fight.get("max_bet") is not None else "No limit",
+            closed_at.strftime("%H:%M:%S.%f")[:-3] if closed_at is not None else "",
+            f"{wait:.1f} ms" if wait is not None else "",
+        )
+        for col, text in enumerate(values):
+            item = QTableWidgetItem(text)
+            if col == 1:
+                item.setForeground(QColor(color))
+            self.table.setItem(row, col, item)
+
+    @traced("table_populate")
+    def apply_fight_change(self, change: dict):
+        """
+        Patch the status of a fight from a fight_state.FIGHT_STATE_CHANNEL notification at once,
+        then reload for the fields the payload does not carry (closed_at, new fights, event).
+        """
+        if change.get("kind") == "fight":
+            for row, fight in enumerate(self.fights):
+                if fight["fight_id"] == change.get("fight_id"):
+                    fight["status"] = change.get("status")
+                    fight["result"] = change.get("result")
+                    self._set_row(row, fight)
+                    self._update_actions()
+                    break
+        if self.isVisible():
+            self._load_fights()
+
+    # ---------- actions ----------
+
+    def _selected_fight(self) -> Optional[dict]:
+        rows = self.table.selectionModel().selectedRows() if self.table.selectionModel() else []
+        if not rows or rows[0].row() >= len(self.fights):
+            return None
+        return self.fights[rows[0].row()]
+
+    def _update_actions(self):
+        fight = self._selected_fight()
+        for status, btn in self.action_btns.items():
+            btn.setEnabled(not self._busy and fight is not None
+                           and fight_state.can_transition(fight["status"], status))
+        self.new_fight_btn.setEnabled(not self._busy)
+
+    def _set_busy(self, busy: bool):
+        self._busy = busy
+        self._update_actions()
+
+    def _on_transition(self, status: str):
+        fight = self._selected_fight()
+        if fight is None or self._busy:
+            return
+        self._set_busy(True)
+        future = query_service().submit(_transition_job, fight["fight_id"], status, self.user.get("user_id"))
+        future.succeeded.connect(self._on_action_done)
+        future.failed.connect(lambda err: self._on_action_done((None, err)))
+
+    def _on_new_fight(self):
+        if self._busy:
+            return
+        self._set_busy(True)
+        future = query_service().submit(_create_fight_job)
+        future.succeeded.connect(self._on_action_done)
+        future.failed.connect(lambda err: self._on_action_done((None, err)))
+
+    def _on_action_done(self, result):
+        self._set_busy(False)
+        value, err = result
+        if value is None:
+            QMessageBox.critical(self, "Error", f"Failed to update the fight.\n\n{err}")
+        # The notification patches the row; reload in case this terminal's listener is down
+        self._load_fights()
+
+    # ---------- page events ----------
+
+    def _on_db_status(self, online: bool):
+        if not online:
+            self.db_error_banner.setVisible(True)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._load_fights()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self._loading:
+            query_service().cancel_owner(self)
+            self._loading = False
@@ -13,6 +13,7 @@ from app.ui.components.styles import (
     COLORS, FONT_SIZES, FONT_WEIGHTS, SPACING, DIMENSIONS,
     get_sidebar_stylesheet
 )
+from app.ui.components.icon_utils import set_icon, set_pixmap
 
 
 class NavButton(QToolButton):
@@ -39,26 +40,7 @@ class NavButton(QToolButton):
     
     def _set_icon(self, icon_path: str):
         """Set icon with proper size (0.4 inch minimum)"""
-        from PySide6.QtGui import QPixmap, QIcon
-        from PySide6.QtCore import QSize
-        import os
-        
-        icon_file = os.path.join("app", "assets", *icon_path.split("/"))
-        if os.path.exists(icon_file):
-            pixmap = QPixmap(icon_file)
-            if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    self.ICON_SIZE,
-                    self.ICON_SIZE,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                self.setIcon(QIcon(scaled_pixmap))
-                self.setIconSize(QSize(self.ICON_SIZE, self.ICON_SIZE))
-        else:
-            # Fallback to icon_utils
-            from app.ui.components.icon_utils import set_icon
-            set_icon(self, icon_path, self.ICON_SIZE)
+        set_icon(self, icon_path, self.ICON_SIZE)
 
 
 class Sidebar(QWidget):
@@ -105,18 +87,7 @@ class Sidebar(QWidget):
         self.dashboard_icon = QLabel()
         self.dashboard_icon.setFixedSize(dashboard_icon_size, dashboard_icon_size)
         self.dashboard_icon.setScaledContents(True)
-        from PySide6.QtGui import QPixmap
-        import os
-        dashboard_path = os.path.join("app", "assets", "icons", "sidebar", "dashboard.png")
-        if os.path.exists(dashboard_path):
-            dashboard_pixmap = QPixmap(dashboard_path)
-            if not dashboard_pixmap.isNull():
-                self.dashboard_icon.setPixmap(dashboard_pixmap.scaled(
-                    dashboard_icon_size, 
-                    dashboard_icon_size,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                ))
+        set_pixmap(self.dashboard_icon, "icons/sidebar/dashboard.png", dashboard_icon_size)
         header_layout.addWidget(self.dashboard_icon)
         
         # Dashboard text (only when expanded)
@@ -132,22 +103,8 @@ class Sidebar(QWidget):
         self.toggle_btn.setObjectName("toggle-button")
         self.toggle_btn.clicked.connect(self._on_toggle_clicked)
         # Set icon with 0.4 inch size (38px)
-        from PySide6.QtGui import QPixmap, QIcon
-        from PySide6.QtCore import QSize
-        import os
         toggle_icon_size = 38  # 0.4 inch
-        chevron_path = os.path.join("app", "assets", "icons", "sidebar", "chevron_left.png")
-        if os.path.exists(chevron_path):
-            pixmap = QPixmap(chevron_path)
-            if not pixmap.isNull():
-                scaled = pixmap.scaled(toggle_icon_size, toggle_icon_size, 
-                                      Qt.AspectRatioMode.KeepAspectRatio,
-                                      Qt.TransformationMode.SmoothTransformation)
-                self.toggle_btn.setIcon(QIcon(scaled))
-                self.toggle_btn.setIconSize(QSize(toggle_icon_size, toggle_icon_size))
-        else:
-            from app.ui.components.icon_utils import set_icon
-            set_icon(self.toggle_btn, "icons/sidebar/chevron_left.png", toggle_icon_size)
+        set_icon(self.toggle_btn, "icons/sidebar/chevron_left.png", toggle_icon_size)
         header_layout.addWidget(self.toggle_btn)
         
         layout.addWidget(header)
@@ -316,23 +273,9 @@ class Sidebar(QWidget):
             btn.setToolButtonStyle(button_style)
         
         # Update toggle button icon with proper size (0.4 inch)
-        from PySide6.QtGui import QPixmap, QIcon
-        from PySide6.QtCore import QSize
-        import os
         toggle_icon_size = 38  # 0.4 inch
         chevron_file = "chevron_left.png" if self._is_expanded else "chevron_right.png"
-        chevron_path = os.path.join("app", "assets", "icons", "sidebar", chevron_file)
-        if os.path.exists(chevron_path):
-            pixmap = QPixmap(chevron_path)
-            if not pixmap.isNull():
-                scaled = pixmap.scaled(toggle_icon_size, toggle_icon_size,
-                                      Qt.AspectRatioMode.KeepAspectRatio,
-                                      Qt.TransformationMode.SmoothTransformation)
-                self.toggle_btn.setIcon(QIcon(scaled))
-                self.toggle_btn.setIconSize(QSize(toggle_icon_size, toggle_icon_size))
-        else:
-            from app.ui.components.icon_utils import set_icon
-            set_icon(self.toggle_btn, f"icons/sidebar/{chevron_file}", toggle_icon_size)
+        set_icon(self.toggle_btn, f"icons/sidebar/{chevron_file}", toggle_icon_size)
         
         # Update stylesheet
         self.setStyleSheet(get_sidebar_stylesheet(self._is_expanded))
@@ -10,38 +10,27 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget, QLabel,
     QPushButton, QFrame
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QImage, QPixmap, QResizeEvent
+from typing import Callable, Dict
+
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QResizeEvent
 from PySide6.QtWidgets import QGraphicsDropShadowEffect
 
 from app.ui.components.styles import COLORS, FONT_SIZES, FONT_WEIGHTS, SPACING, RADIUS
 from .sidebar import Sidebar
 from .cashier_overview import CashierOverview
 from .accounts_overview import AccountsOverview
+from .event_overview import EventOverview
+from app.services.notify_listener import notification_listener
+from app.services.db_health import connection_monitor
+from app.services.background_images import background_service
+from app.services.ui_watchdog import ui_watchdog
 
-_LOGOUT_BG_PATH = Path(__file__).resolve().parent.parent.parent / "assets" / "backgrounds" / "rooster.png"
-
+# Pages built during idle time after the first frame (likely next navigations)
+_PREFETCH_PAGES = ('accounts', 'logout')
+_PREFETCH_DELAY_MS = 300
 
-def _load_logout_background_pixmap(label: QLabel, w: int, h: int) -> None:
-    """Load rooster.png background (same approach as login page / test.py)."""
-    path = _LOGOUT_BG_PATH
-    if not path.exists():
-        return
-    with open(path, "rb") as f:
-        data = f.read()
-    img = QImage()
-    img.loadFromData(data)
-    if img.isNull():
-        try:
-            from PIL import Image
-            import io
-            pil_img = Image.open(io.BytesIO(data)).convert("RGBA")
-            img = QImage(pil_img.tobytes(), pil_img.width, pil_img.height, QImage.Format.Format_RGBA8888)
-        except (ImportError, ValueError, OSError, RuntimeError):
-            return
-    pix = QPixmap.fromImage(img)
-    if not pix.isNull():
-        label.setPixmap(pix)
+_LOGOUT_BG_PATH = Path(__file__).resolve().parent.parent.parent / "assets" / "backgrounds" / "rooster.png"
 
 
 class LogoutPage(QWidget):
@@ -134,13 +123,13 @@ class LogoutPage(QWidget):
         super().resizeEvent(event)
         s = self.size()
         self._bg_label.setGeometry(0, 0, s.width(), s.height())
-        _load_logout_background_pixmap(self._bg_label, s.width(), s.height())
+        background_service().apply(self._bg_label, _LOGOUT_BG_PATH, s)
 
     def showEvent(self, event):
         super().showEvent(event)
         s = self.size()
         self._bg_label.setGeometry(0, 0, s.width(), s.height())
-        _load_logout_background_pixmap(self._bg_label, s.width(), s.height())
+        background_service().apply(self._bg_label, _LOGOUT_BG_PATH, s)
 
 
 class SuperAdminWindow(QMainWindow):
@@ -189,105 +178,114 @@ class SuperAdminWindow(QMainWindow):
         
         main_layout.addWidget(self.content_area, 1)  # Stretch factor
         
-        # Initialize pages
+        # Pages are built on first navigation (see _page); only the default page is built now
         self._setup_pages()
         
         # Set default page
         self.sidebar.set_active_item('cashier-overview')
+        
+        # Live user/cashier status changes (LISTEN/NOTIFY) patch pages in place
+        listener = notification_listener()
+        listener.user_changed.connect(self._on_user_changed)
+        listener.reconnected.connect(self._reload_pages)
+        listener.start()
+        # Server back after an outage (db circuit breaker closed)
+        connection_monitor().came_online.connect(self._reload_pages)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._prefetch_queue:
+            QTimer.singleShot(_PREFETCH_DELAY_MS, self._prefetch_next_page)
+    
+    def closeEvent(self, event):
+        notification_listener().stop()
+        super().closeEvent(event)
+    
+    def _on_user_changed(self, change: dict):
+        """Forward a user change to the pages built so far (others load fresh when created)"""
+        for key in ('cashier-overview', 'accounts'):
+            page = self._pages.get(key)
+            if page is not None:
+                page.apply_user_change(change)
+    
+    def _reload_pages(self):
+        """Notifications may have been missed while disconnected: reload page data"""
+        if 'cashier-overview' in self._pages:
+            self._pages['cashier-overview']._load_cashiers()
+        if 'accounts' in self._pages:
+            self._pages['accounts']._load_users()
+        if 'event-overview' in self._pages:
+            self._pages['event-overview']._load_fights()
     
     def _setup_pages(self):
-        """Setup all dashboard pages"""
+        """Register page factories by sidebar key; pages are created by _page() on first use"""
+        self._pages: Dict[str, QWidget] = {}
+        self._page_factories: Dict[str, Callable[[], QWidget]] = {
+            'cashier-overview': self._create_cashier_overview,
+            'event-overview': lambda: EventOverview(self.user),
+            'accounts': AccountsOverview,
+            'reports': lambda: self._create_placeholder_page("Reports and Database"),
+            'operator-a': lambda: self._create_placeholder_page("Operator A"),
+            'operator-b': lambda: self._create_placeholder_page("Operator B"),
+            'settings': lambda: self._create_placeholder_page("Settings"),
+            'utility': lambda: self._create_placeholder_page("Utility"),
+            'logout': self._create_logout_page,
+        }
+        self._prefetch_queue = list(_PREFETCH_PAGES)
+        # Key of a page created by the current navigation (it already loads its own data)
+        self._new_page_key = None
+    
+    def _page(self, key: str) -> QWidget:
+        """Return the page for a sidebar key, creating and adding it to the stack on first use"""
+        page = self._pages.get(key)
+        if page is None:
+            with ui_watchdog().span(f"page_load:{key}"):
+                page = self._page_factories[key]()
+            self._pages[key] = page
+            self.stacked_widget.addWidget(page)
+        return page
+    
+    def _prefetch_next_page(self):
+        """Build one likely-next page per idle slot so input stays responsive"""
+        while self._prefetch_queue:
+            key = self._prefetch_queue.pop(0)
+            if key not in self._pages:
+                self._page(key)
+                break
+        if self._prefetch_queue:
+            QTimer.singleShot(_PREFETCH_DELAY_MS, self._prefetch_next_page)
+    
+    def _create_cashier_overview(self) -> QWidget:
         # Cashier Overview (main page)
-        self.cashier_overview = CashierOverview()
-        self.cashier_overview.refresh_requested.connect(self._on_refresh_requested)
-        self.stacked_widget.addWidget(self.cashier_overview)
-        
+        page = CashierOverview()
+        page.refresh_requested.connect(self._on_refresh_requested)
+        return page
+    
+    def _create_placeholder_page(self, title: str) -> QWidget:
         # Placeholder pages (to be implemented later)
-        self.event_overview = QLabel("Event Overview\n(Coming soon)")
-        self.event_overview.setAlignment(Qt.AlignCenter)
-        self.event_overview.setStyleSheet(f"""
-            QLabel {{
-                font-size: 24px;
-                color: {COLORS['gray_500']};
-            }}
-        """)
-        self.stacked_widget.addWidget(self.event_overview)
-        
-        self.accounts_page = AccountsOverview()
-        self.stacked_widget.addWidget(self.accounts_page)
-        
-        self.reports_page = QLabel("Reports and Database\n(Coming soon)")
-        self.reports_page.setAlignment(Qt.AlignCenter)
-        self.reports_page.setStyleSheet(f"""
-            QLabel {{
-                font-size: 24px;
-                color: {COLORS['gray_500']};
-            }}
-        """)
-        self.stacked_widget.addWidget(self.reports_page)
-        
-        self.operator_a_page = QLabel("Operator A\n(Coming soon)")
-        self.operator_a_page.setAlignment(Qt.AlignCenter)
-        self.operator_a_page.setStyleSheet(f"""
-            QLabel {{
-                font-size: 24px;
-                color: {COLORS['gray_500']};
-            }}
-        """)
-        self.stacked_widget.addWidget(self.operator_a_page)
-        
-        self.operator_b_page = QLabel("Operator B\n(Coming soon)")
-        self.operator_b_page.setAlignment(Qt.AlignCenter)
-        self.operator_b_page.setStyleSheet(f"""
-            QLabel {{
-                font-size: 24px;
-                color: {COLORS['gray_500']};
-            }}
-        """)
-        self.stacked_widget.addWidget(self.operator_b_page)
-        
-        self.settings_page = QLabel("Settings\n(Coming soon)")
-        self.settings_page.setAlignment(Qt.AlignCenter)
-        self.settings_page.setStyleSheet(f"""
+        page = QLabel(f"{title}\n(Coming soon)")
+        page.setAlignment(Qt.AlignCenter)
+        page.setStyleSheet(f"""
             QLabel {{
                 font-size: 24px;
                 color: {COLORS['gray_500']};
             }}
         """)
-        self.stacked_widget.addWidget(self.settings_page)
-        
-        self.utility_page = QLabel("Utility\n(Coming soon)")
-        self.utility_page.setAlignment(Qt.AlignCenter)
-        self.utility_page.setStyleSheet(f"""
-            QLabel {{
-                font-size: 24px;
-                color: {COLORS['gray_500']};
-            }}
-        """)
-        self.stacked_widget.addWidget(self.utility_page)
-        
+        return page
+    
+    def _create_logout_page(self) -> QWidget:
         # Logout page (full-page with rooster.png background, same style as login)
-        self.logout_page = LogoutPage(self)
-        self.logout_page.confirmed.connect(self._do_logout)
-        self.logout_page.cancelled.connect(self._on_logout_cancelled)
-        self.stacked_widget.addWidget(self.logout_page)
+        page = LogoutPage(self)
+        page.confirmed.connect(self._do_logout)
+        page.cancelled.connect(self._on_logout_cancelled)
+        return page
     
     def _on_menu_changed(self, menu_id: str):
         """Handle sidebar menu item selection"""
-        page_map = {
-            'cashier-overview': 0,
-            'event-overview': 1,
-            'accounts': 2,
-            'reports': 3,
-            'operator-a': 4,
-            'operator-b': 5,
-            'settings': 6,
-            'utility': 7,
-            'logout': 8,
-        }
-        
-        if menu_id in page_map:
-            self.stacked_widget.setCurrentIndex(page_map[menu_id])
+        if menu_id in self._page_factories:
+            self._new_page_key = None if menu_id in self._pages else menu_id
+            with ui_watchdog().span(f"page_show:{menu_id}"):
+                self.stacked_widget.setCurrentWidget(self._page(menu_id))
             
             # Handle logout
             if menu_id == 'logout':
@@ -300,19 +298,21 @@ class SuperAdminWindow(QMainWindow):
     
     def _on_sidebar_refresh_requested(self, menu_id: str):
         """Handle refresh request from sidebar main menu items - reload page data"""
+        if menu_id == self._new_page_key:
+            self._new_page_key = None
+            return  # just created: the page is already loading
         if menu_id == 'cashier-overview':
-            self.cashier_overview._load_cashiers()
-            self.cashier_overview._render_cards()
+            self._page(menu_id)._load_cashiers()
         elif menu_id == 'accounts':
-            self.accounts_page._load_users()
+            self._page(menu_id)._load_users()
         elif menu_id == 'event-overview':
-            pass  # TODO: Add refresh when event overview is implemented
+            self._page(menu_id)._load_fights()
         elif menu_id == 'reports':
             pass  # TODO: Add refresh when reports page is implemented
     
     def _handle_logout(self):
         """Handle logout menu: switch to logout page (background + confirmation card)."""
-        self.stacked_widget.setCurrentWidget(self.logout_page)
+        self.stacked_widget.setCurrentWidget(self._page('logout'))
 
     def _do_logout(self):
         """Perform logout: close window and call on_logout callback."""
@@ -322,5 +322,5 @@ class SuperAdminWindow(QMainWindow):
 
     def _on_logout_cancelled(self):
         """User clicked No on logout page: return to cashier overview."""
-        self.stacked_widget.setCurrentIndex(0)
+        self.stacked_widget.setCurrentWidget(self._page('cashier-overview'))
         self.sidebar.set_active_item('cashier-overview')
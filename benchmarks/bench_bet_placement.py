@@ -0,0 +1,248 @@
+# benchmarks/bench_bet_placement.py
+"""
+Last-call rush against a real PostgreSQL (schema.py applied): T terminals place bets on
+one fight as fast as they can through bet_engine.place_bet, each terminal with its own
+cashier account and pooled connection.
+
+    python benchmarks/bench_bet_placement.py [--terminals 50] [--seconds 20] [--dup-rate 0.02]
+                                             [--close-after SECONDS] [--ticket-blocks]
+
+A fraction of submissions (--dup-rate) resubmit an earlier reference, as a terminal retry
+would; they must come back "duplicate" without booking anything. Reports throughput,
+p50/p95/p99/max latency per outcome, and checks tickets == ledger rows == placed bets
+and the sharded pool totals (pool_totals.py) == the amount booked.
+
+--close-after closes betting mid-rush (fight_state.transition) while the terminals keep
+submitting, and reports how long the close waited for bets in flight, the gap between the
+last accepted bet and the close, the LISTEN delivery delay of the "closed" notification,
+and the tickets accepted after the close (must be 0).
+--ticket-blocks numbers every ticket from a leased block per terminal (ticket_numbers.py)
+and reports the leases and journal writes that took the place of per-ticket round trips.
+The bench cashiers, fight, tickets, ledger rows and ticket blocks are deleted afterwards.
+"""
+
+import argparse
+import json
+import os
+import random
+import select
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+_PREFIX = "bench_teller_"
+_SERIES = "bench"
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _setup(db, fight_state, terminals):
+    created = db.execute(
+        """
+        INSERT INTO public.users (username, password_hash, role, is_active, name, created_at)
+        SELECT %s || n, 'x', 'cashier', FALSE, 'Bench Teller ' || n, NOW()
+        FROM generate_series(1, %s) AS n
+        WHERE NOT EXISTS (SELECT 1 FROM public.users u WHERE u.username = %s || n);
+        """,
+        (_PREFIX, terminals, _PREFIX)
+    )
+    if not created:
+        sys.exit(f"Setup failed: {db.get_last_error()}")
+    rows = db.fetch_all(
+        "SELECT user_id FROM public.users WHERE username = ANY(%s) ORDER BY user_id;",
+        ([f"{_PREFIX}{n}" for n in range(1, terminals + 1)],)
+    )
+    number = 900000 + random.randrange(99999)
+    fight_id = fight_state.create_fight(number, min_bet=10, max_bet=100000)
+    if fight_id is None or fight_state.transition(fight_id, "open") is None:
+        sys.exit(f"Setup failed: {db.get_last_error()}")
+    return [r[0] for r in rows], fight_id
+
+
+def _cleanup(db, fight_id):
+    # Tickets and ledger rows (and the summary rows) go with the cashiers (ON DELETE CASCADE)
+    db.execute("DELETE FROM public.users WHERE username LIKE %s AND role = 'cashier';", (_PREFIX + "%",))
+    db.execute("DELETE FROM public.fights WHERE fight_id = %s;", (fight_id,))
+    db.execute("DELETE FROM public.ticket_blocks WHERE series = %s;", (_SERIES,))
+    db.execute("DELETE FROM public.ticket_number_series WHERE series = %s;", (_SERIES,))
+
+
+def _terminal(bet_engine, index, cashier_id, fight_id, deadline, dup_rate, results, lock, allocator=None):
+    rng = random.Random(index)
+    terminal = f"bench-{index:02d}"
+    placed = []
+    latencies = {}
+    outcomes = Counter()
+    while time.perf_counter() < deadline:
+        if placed and rng.random() < dup_rate:
+            ref, side, amount, number = rng.choice(placed)
+        else:
+            ref, side, amount = bet_engine.new_reference(terminal), rng.choice(("meron", "wala")), rng.choice((50, 100, 200, 500, 1000))
+            number = None
+        start = time.perf_counter()
+        if allocator is not None and number is None:
+            number = allocator.next_number()
+        result = bet_engine.place_bet(fight_id, cashier_id, side, amount, ref, terminal=terminal, ticket_number=number)
+        ms = (time.perf_counter() - start) * 1000
+        outcome = result["outcome"] if result else "error"
+        outcomes[outcome] += 1
+        latencies.setdefault(outcome, []).append(ms)
+        if outcome == "placed":
+            placed.append((ref, side, amount, number))
+        elif allocator is not None and outcome != "duplicate":
+            allocator.void(number)
+    with lock:
+        results["outcomes"].update(outcomes)
+        for outcome, values in latencies.items():
+            results["latencies"].setdefault(outcome, []).extend(values)
+        results["placed"] += len(placed)
+        results["amount"] += sum(a for _, _, a, _ in placed)
+
+
+def _close_mid_rush(db, fight_state, fight_id, delay):
+    """Close betting after delay seconds; returns (close call ms, notification delivery ms) or None."""
+    conn = db.get_connection()
+    if conn is None:
+        return None
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{fight_state.FIGHT_STATE_CHANNEL}";')
+        time.sleep(delay)
+        start = time.perf_counter()
+        if fight_state.transition(fight_id, "closed") is None:
+            print(f"Close failed: {db.get_last_error()}")
+            return None
+        call_ms = (time.perf_counter() - start) * 1000
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if select.select([conn], [], [], 0.1)[0]:
+                conn.poll()
+                received = time.time()
+                for n in conn.notifies:
+                    data = json.loads(n.payload)
+                    if data.get("fight_id") == fight_id and data.get("status") == "closed":
+                        return call_ms, (received - data["at"]) * 1000
+                conn.notifies.clear()
+        return call_ms, None
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--terminals", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--dup-rate", type=float, default=0.02)
+    parser.add_argument("--close-after", type=float, default=None,
+                        help="close betting this many seconds into the run")
+    parser.add_argument("--ticket-blocks", action="store_true",
+                        help="number tickets from leased blocks (ticket_numbers.py)")
+    args = parser.parse_args()
+
+    # One pooled connection per terminal thread (set before db creates the pool)
+    config.DB_POOL_MAX = args.terminals
+    config.DB_POOL_WAIT_TIMEOUT = 30
+    config.DB_SLOW_QUERY_LOG = ""
+    import db
+    import bet_engine
+    import fight_state
+    import pool_totals
+    import ticket_numbers
+
+    if not db.connection_ok():
+        sys.exit("Cannot connect to the database (see config.py).")
+    cashier_ids, fight_id = _setup(db, fight_state, args.terminals)
+    db.get_pool().warm_up(args.terminals)
+    results = {"outcomes": Counter(), "latencies": {}, "placed": 0, "amount": 0}
+    lock = threading.Lock()
+    journal_dir = tempfile.mkdtemp(prefix="bench-tickets-")
+    allocators = [
+        ticket_numbers.TicketAllocator(_SERIES, f"bench-{i:02d}", journal_path=os.path.join(journal_dir, f"{i:02d}.json"))
+        if args.ticket_blocks else None
+        for i in range(len(cashier_ids))
+    ]
+    try:
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        threads = [
+            threading.Thread(target=_terminal, args=(bet_engine, i, cashier_id, fight_id, deadline,
+                                                     args.dup_rate, results, lock, allocators[i]))
+            for i, cashier_id in enumerate(cashier_ids)
+        ]
+        for t in threads:
+            t.start()
+        closed = _close_mid_rush(db, fight_state, fight_id, args.close_after) if args.close_after is not None else None
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        total = sum(results["outcomes"].values())
+        print(f"{args.terminals} terminals, {elapsed:.1f} s: {total} submissions, "
+              f"{results['placed'] / elapsed:.0f} bets/s booked")
+        print(f"{'outcome':<10} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for outcome, values in sorted(results["latencies"].items()):
+            print(f"{outcome:<10} {len(values):>8} {_percentile(values, 0.5):>8.1f} {_percentile(values, 0.95):>8.1f} "
+                  f"{_percentile(values, 0.99):>8.1f} {max(values):>8.1f}")
+        every = [v for values in results["latencies"].values() for v in values]
+        print(f"{'all':<10} {len(every):>8} {_percentile(every, 0.5):>8.1f} {_percentile(every, 0.95):>8.1f} "
+              f"{_percentile(every, 0.99):>8.1f} {max(every, default=0):>8.1f}")
+
+        row = db.fetch_one(
+            """
+            SELECT (SELECT COUNT(*) FROM public.bet_tickets WHERE fight_id = %s),
+                   (SELECT COUNT(*) FROM public.transactions t
+                    JOIN public.bet_tickets b ON b.reference_number = t.reference_number
+                    WHERE b.fight_id = %s AND t.transaction_type = 'bet'),
+                   (SELECT COALESCE(SUM(amount), 0) FROM public.bet_tickets WHERE fight_id = %s);
+            """,
+            (fight_id, fight_id, fight_id)
+        )
+        pools = pool_totals.fetch_pool_totals(fight_id)
+        pooled = sum(pools[side]["total"] for side in pool_totals.SIDES) if pools else None
+        ok = (row is not None and row[0] == row[1] == results["placed"] and float(row[2]) == results["amount"]
+              and pooled == results["amount"])
+        print(f"Consistency: tickets={row and row[0]} ledger={row and row[1]} placed={results['placed']} "
+              f"pools={pooled} ({pools and pools['rows']} slot rows) -> {'OK' if ok else 'MISMATCH'}")
+
+        if args.ticket_blocks:
+            alloc = [a.snapshot() for a in allocators]
+            issued = sum(a["issued"] for a in alloc)
+            numbers = db.fetch_one(
+                "SELECT COUNT(*), COUNT(DISTINCT ticket_number) FROM public.bet_tickets WHERE fight_id = %s;",
+                (fight_id,)
+            )
+            print(f"Ticket blocks: {issued} numbers issued, {sum(a['leases'] for a in alloc)} leases "
+                  f"({sum(a['sync_waits'] for a in alloc)} waited on), {sum(a['journal_writes'] for a in alloc)} "
+                  f"journal writes; {numbers and numbers[1]} distinct numbers on {numbers and numbers[0]} tickets "
+                  f"-> {'OK' if numbers and numbers[0] == numbers[1] else 'DUPLICATE NUMBERS'}")
+
+        if closed is not None:
+            stats = fight_state.close_stats(fight_id)
+            call_ms, delivery_ms = closed
+            delivered = f"{delivery_ms:.1f} ms" if delivery_ms is not None else "not received"
+            print(f"Close: call {call_ms:.1f} ms, notification delivered {delivered}")
+            for s in stats:
+                gap = f"{s['last_bet_gap_ms']:.1f} ms" if s["last_bet_gap_ms"] is not None else "-"
+                print(f"  waited {s['close_wait_ms']:.1f} ms for bets in flight, last bet {gap} before close, "
+                      f"late tickets {s['late_tickets']} -> {'OK' if s['late_tickets'] == 0 else 'LATE BETS'}")
+    finally:
+        _cleanup(db, fight_id)
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
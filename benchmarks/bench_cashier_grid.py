@@ -0,0 +1,79 @@
+# benchmarks/bench_cashier_grid.py
+"""
+Compare the Cashier Overview grid modes ("widgets" vs "virtual") on synthetic cashiers.
+No database needed: the page's load query is cancelled and rows are injected directly.
+
+    python benchmarks/bench_cashier_grid.py [N ...]        (default: 50 500 2000)
+
+Reports wall time for first render, a search filter, sort change, one card toggle
+and Hide All, plus the number of live QWidgets under the page.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QWidget
+
+from app.ui.super_admin.cashier_overview import CashierOverview
+from app.services.query_service import query_service
+
+
+def _rows(n):
+    return [
+        {
+            "user_id": i, "username": f"cashier{i}", "name": f"Cashier {i:05d}",
+            "is_active": i % 3 != 0, "battery_percentage": (i * 7) % 101,
+            "total_bets": float(i * 10), "cash_in": float(i * 20), "cash_out": float(i * 5),
+            "draw_bets": 0.0, "cancel_bets": 0.0, "unclaimed": float(i % 50), "withdraw": 1.0,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def _timed(app, fn):
+    start = time.perf_counter()
+    fn()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(app, mode, n):
+    page = CashierOverview(grid_mode=mode)
+    query_service().cancel_owner(page)
+    page.resize(1400, 900)
+    page.show()
+    app.processEvents()
+
+    results = {}
+    results["render"] = _timed(app, lambda: page._on_cashiers_loaded(_rows(n)))
+    results["search"] = _timed(app, lambda: page._apply_search("cashier 00"))
+    results["clear"] = _timed(app, lambda: page._apply_search(""))
+    results["sort"] = _timed(app, lambda: (setattr(page, "sort_option", "coh-high"), page._render_cards()))
+    results["toggle"] = _timed(app, lambda: page._on_individual_toggle(1))
+    results["hide_all"] = _timed(app, page._on_global_toggle)
+    results["widgets"] = len(page.findChildren(QWidget))
+
+    page.close()
+    page.deleteLater()
+    app.processEvents()
+    return results
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [50, 500, 2000]
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'mode':<8} {'N':>6} {'render':>9} {'search':>9} {'clear':>9} {'sort':>9} "
+          f"{'toggle':>9} {'hide_all':>9} {'widgets':>8}")
+    for n in sizes:
+        for mode in ("widgets", "virtual"):
+            r = bench(app, mode, n)
+            print(f"{mode:<8} {n:>6} {r['render']:>8.1f}ms {r['search']:>8.1f}ms {r['clear']:>8.1f}ms "
+                  f"{r['sort']:>8.1f}ms {r['toggle']:>8.1f}ms {r['hide_all']:>8.1f}ms {r['widgets']:>8}")
+    query_service().wait_for_done(2000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_settlement.py
+"""
+Settlement of large fights against a real PostgreSQL (schema.py applied).
+
+    python benchmarks/bench_settlement.py [--tickets 100000] [--cashiers 50]
+
+Books N tickets on one fight (set-based setup, not timed), closes it, then times:
+settle (meron), re-run of the same settlement (no-op), correction to wala (reverse +
+settle), reversal, and a draw settlement. After each step the ledger is checked against
+the settlement figures and the cashier summaries with rollup.check().
+The bench cashiers, fight, tickets and ledger rows are deleted afterwards.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+_PREFIX = "bench_settle_"
+
+
+def _setup(db, fight_state, tickets, cashiers):
+    ok = db.execute(
+        """
+        INSERT INTO public.users (username, password_hash, role, is_active, name, created_at)
+        SELECT %s || n, 'x', 'cashier', FALSE, 'Bench Settle ' || n, NOW()
+        FROM generate_series(1, %s) AS n
+        WHERE NOT EXISTS (SELECT 1 FROM public.users u WHERE u.username = %s || n);
+        """,
+        (_PREFIX, cashiers, _PREFIX)
+    )
+    if not ok:
+        sys.exit(f"Setup failed: {db.get_last_error()}")
+    fight_id = fight_state.create_fight(900000 + random.randrange(99999))
+    if fight_id is None or fight_state.transition(fight_id, "open") is None:
+        sys.exit(f"Setup failed: {db.get_last_error()}")
+    # Tickets and their 'bet' ledger rows in two statements (place_bet is benchmarked separately)
+    ok = db.execute(
+        """
+        WITH c AS (
+            SELECT array_agg(user_id ORDER BY user_id) AS ids FROM public.users WHERE username LIKE %s
+        ), t AS (
+            INSERT INTO public.bet_tickets (reference_number, ticket_number, fight_id, cashier_id, terminal, side, amount)
+            SELECT 'bs' || %s || '-' || n, n::TEXT, %s, c.ids[1 + n %% array_length(c.ids, 1)], 'bench',
+                   (ARRAY['meron', 'meron', 'wala', 'wala', 'draw'])[1 + (n * 7) %% 5],
+                   (ARRAY[50, 100, 200, 500, 1000])[1 + (n * 13) %% 5]
+            FROM generate_series(1, %s) AS n, c
+            RETURNING reference_number, cashier_id, amount
+        )
+        INSERT INTO public.transactions (cashier_id, transaction_type, amount, reference_number)
+        SELECT cashier_id, 'bet', amount, reference_number FROM t;
+        """,
+        (_PREFIX + "%", fight_id, fight_id, tickets)
+    )
+    if not ok or fight_state.transition(fight_id, "closed") is None:
+        sys.exit(f"Setup failed: {db.get_last_error()}")
+    return fight_id
+
+
+def _cleanup(db, fight_id):
+    # Tickets, ledger rows and summaries go with the cashiers (ON DELETE CASCADE)
+    db.execute("DELETE FROM public.users WHERE username LIKE %s AND role = 'cashier';", (_PREFIX + "%",))
+    db.execute("DELETE FROM public.fights WHERE fight_id = %s;", (fight_id,))
+
+
+def _check(db, rollup, fight_id, settled):
+    """Ledger rows of the settlement in force == its payouts/refunds; summaries == ledger."""
+    row = db.fetch_one(
+        """
+        SELECT COALESCE(SUM(t.amount) FILTER (WHERE t.transaction_type = 'unclaimed'), 0),
+               COALESCE(SUM(t.amount) FILTER (WHERE t.transaction_type IN ('draw', 'cancel')), 0)
+        FROM public.transactions t
+        JOIN public.fight_settlements s ON s.settlement_id = t.settlement_id
+        WHERE s.fight_id = %s AND s.reversed_at IS NULL AND t.reference_number LIKE 's%%';
+        """,
+        (fight_id,)
+    )
+    expected = (settled["payouts"], settled["refunds"]) if settled else (0.0, 0.0)
+    ledger_ok = row is not None and (float(row[0]), float(row[1])) == expected
+    mismatches = rollup.check(time.strftime("%Y-%m-%d"))
+    return "OK" if ledger_ok and mismatches == [] else f"MISMATCH (ledger {row}, expected {expected}, {mismatches and len(mismatches)} summary diffs)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--cashiers", type=int, default=50)
+    args = parser.parse_args()
+
+    config.DB_SLOW_QUERY_LOG = ""
+    import db
+    import fight_state
+    import rollup
+    import settlement
+
+    if not db.connection_ok():
+        sys.exit("Cannot connect to the database (see config.py).")
+    start = time.perf_counter()
+    fight_id = _setup(db, fight_state, args.tickets, args.cashiers)
+    print(f"Fight {fight_id}: {args.tickets} tickets from {args.cashiers} cashiers booked in "
+          f"{time.perf_counter() - start:.1f} s")
+    try:
+        steps = [
+            ("settle meron", lambda: settlement.settle_fight(fight_id, "meron")),
+            ("re-run meron", lambda: settlement.settle_fight(fight_id, "meron")),
+            ("correct to wala", lambda: settlement.settle_fight(fight_id, "wala")),
+            ("reverse", lambda: settlement.reverse_settlement(fight_id, "bench")),
+            ("settle draw", lambda: settlement.settle_fight(fight_id, "draw")),
+        ]
+        print(f"{'step':<16} {'ms':>9}  {'winners':>8} {'payouts':>15} {'refunds':>15}  check")
+        for name, step in steps:
+            t0 = time.perf_counter()
+            result = step()
+            ms = (time.perf_counter() - t0) * 1000
+            if result is None:
+                print(f"{name:<16} failed: {db.get_last_error()}")
+                break
+            settled = result if isinstance(result, dict) else None
+            winners = settled["winners"] if settled else "-"
+            payouts = f"{settled['payouts']:,.2f}" if settled else "-"
+            refunds = f"{settled['refunds']:,.2f}" if settled else "-"
+            print(f"{name:<16} {ms:>9.1f}  {winners:>8} {payouts:>15} {refunds:>15}  "
+                  f"{_check(db, rollup, fight_id, settled)}")
+    finally:
+        _cleanup(db, fight_id)
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bet_engine.py
+"""
+Bet placement for teller terminals.
+
+Each bet is one call to public.place_bet (schema.py): in one short transaction it checks
+the fight is still taking bets and within its limits, then writes the bet_tickets row and
+the 'bet' ledger row (which the summary triggers fold into the cashier's card).
+
+Submissions are idempotent on reference_number, a key the terminal creates once per bet:
+
+    ref = bet_engine.new_reference()
+    number = bet_engine.new_ticket_number()    # printed number, from the terminal's leased block
+    result = bet_engine.place_bet(fight_id, cashier_id, "meron", 500, ref, ticket_number=number)
+    # None: the server could not be reached - resubmit later with the SAME ref and number
+
+Resubmitting a reference never books a second ticket; it returns the original one.
+Fights and their open/closed state live in fight_state.py.
+"""
+
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import db
+from ticket_numbers import ticket_allocator
+
+SIDES = ("meron", "wala", "draw")
+
+_REFERENCE_MAX = 50
+# Amounts are stored as NUMERIC(15, 2)
+_AMOUNT_LIMIT = Decimal(10) ** 13
+# Waits before resubmitting after a connection failure
+_RETRY_DELAYS = (0.05, 0.2, 0.5)
+_TRANSIENT_MARKERS = ("cannot connect", "connection", "timeout", "deadlock", "could not serialize")
+
+
+def new_reference(terminal: str = None) -> str:
+    """Idempotency key for one bet: create it once, reuse it on every retry of that bet."""
+    prefix = (terminal or db.terminal_id())[:_REFERENCE_MAX - 33]
+    return f"{prefix}-{uuid.uuid4().hex}"
+
+
+def new_ticket_number():
+    """
+    Printed number for one bet from this terminal's leased block (ticket_numbers.py; no round
+    trip). Create it with the reference and reuse it on retries. None if no block could be
+    leased: place_bet then numbers the ticket with its ticket_id.
+    """
+    return ticket_allocator().next_number()
+
+
+def validate_bet(side: str, amount):
+    """Client-side checks before the round trip. Returns (Decimal amount, None) or (None, error)."""
+    if side not in SIDES:
+        return None, f"Unknown side: {side}"
+    try:
+        value = Decimal(str(amount))
+    except InvalidOperation:
+        return None, "Amount must be a number"
+    if not value.is_finite() or value <= 0:
+        return None, "Amount must be greater than zero"
+    # Before quantize, which raises InvalidOperation past the context precision
+    if value >= _AMOUNT_LIMIT:
+        return None, "Amount is too large"
+    if value != value.quantize(Decimal("0.01")):
+        return None, "Amount has more than two decimals"
+    return value, None
+
+
+def _is_transient(error) -> bool:
+    error = (error or "").lower()
+    return any(marker in error for marker in _TRANSIENT_MARKERS)
+
+
+def place_bet(fight_id: int, cashier_id: int, side: str, amount, reference_number: str,
+              terminal: str = None, ticket_number: str = None, retries: int = len(_RETRY_DELAYS)):
+    """
+    Book one bet. Returns {"outcome", "ticket_id", "ticket_number", "reason", "reference_number"}:
+      outcome "placed"    - booked now
+              "duplicate" - this reference was already booked; the original ticket is returned
+              "conflict"  - this reference was booked with different fight/side/amount
+              "rejected"  - not booked (reason: invalid input, unknown fight, betting closed, limits)
+    Returns None if the server could not be reached after retries; the bet may or may not be
+    booked, so resubmit with the same reference_number (see get_last_error()).
+    A ticket_number from new_ticket_number() that ends up on no ticket is recorded as void.
+    """
+    value, error = validate_bet(side, amount)
+    if error is None and not (0 < len(reference_number or "") <= _REFERENCE_MAX):
+        error = "Invalid reference number"
+    if error is not None:
+        ticket_allocator().void(ticket_number)
+        return {"outcome": "rejected", "ticket_id": None, "ticket_number": None, "reason": error,
+                "reference_number": reference_number}
+
+    params = (reference_number, fight_id, cashier_id, side, value, terminal or db.terminal_id(), ticket_number)
+    for attempt in range(retries + 1):
+        rows = db.execute_fetch(
+            "SELECT outcome, ticket_id, ticket_number, reason FROM public.place_bet(%s, %s, %s, %s, %s, %s, %s);",
+            params,
+        )
+        if rows:
+            outcome, ticket_id, number, reason = rows[0]
+            if ticket_number is not None and number != ticket_number:
+                # Not printed on any ticket (rejected, or a conflicting reference)
+                ticket_allocator().void(ticket_number)
+            return {"outcome": outcome, "ticket_id": ticket_id, "ticket_number": number, "reason": reason,
+                    "reference_number": reference_number}
+        if attempt == retries or not _is_transient(db.get_last_error()) or not db.is_online():
+            return None
+        time.sleep(_RETRY_DELAYS[min(attempt, len(_RETRY_DELAYS) - 1)])
+    return None
+
@@ -1,4 +1,8 @@
 # config.py
+import os
+
+# Log and journal files are kept next to the application, whatever the working directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # ON SERVER: Use "localhost"
 # ON CLIENT: Use "YOUR_COMPUTER_NAME.local" 
@@ -8,3 +12,73 @@ DB_NAME = "postgres"
 DB_USER = "postgres"
 DB_PASS = "1234"
 DB_PORT = "5432"
+
+# DB_HOST is looked up once and cached for DB_HOST_TTL seconds (see host_resolver.py).
+# DB_DISCOVERY: if the lookup fails, find the server with a LAN broadcast answered by
+# server_beacon.py on UDP port DB_DISCOVERY_PORT.
+DB_HOST_TTL = 300
+DB_DISCOVERY = False
+DB_DISCOVERY_PORT = 45454
+
+# Connection pool (db.py). Connections idle longer than DB_POOL_IDLE_TIMEOUT
+# seconds are closed, down to DB_POOL_MIN. Callers wait up to
+# DB_POOL_WAIT_TIMEOUT seconds for a free connection when DB_POOL_MAX is reached.
+DB_POOL_MIN = 1
+DB_POOL_MAX = 10
+DB_POOL_IDLE_TIMEOUT = 300
+DB_POOL_WAIT_TIMEOUT = 5
+
+# Query statistics (query_stats.py): per-query timing histograms, callers and errors.
+# Queries slower than DB_SLOW_QUERY_MS go to the rotating DB_SLOW_QUERY_LOG ("" = off).
+DB_QUERY_STATS = True
+DB_SLOW_QUERY_MS = 200
+DB_SLOW_QUERY_LOG = os.path.join(APP_DIR, "slow-queries.log")
+
+# Connection health (db.py). A failed connect (after DB_CONNECT_TIMEOUT seconds) marks the
+# server offline: further calls fail immediately while a background probe retries after
+# DB_PROBE_MIN seconds, doubling up to DB_PROBE_MAX, until the server answers again.
+DB_CONNECT_TIMEOUT = 5
+DB_PROBE_MIN = 1
+DB_PROBE_MAX = 30
+# TCP keepalives on every connection: a connection left half-open by a switch or server
+# reboot fails after about IDLE + INTERVAL * COUNT seconds instead of hanging.
+DB_KEEPALIVE_IDLE = 10
+DB_KEEPALIVE_INTERVAL = 5
+DB_KEEPALIVE_COUNT = 3
+
+# Cashier Overview grid: "widgets" (one CashierCard widget per cashier) or
+# "virtual" (painted model/view grid, for thousands of terminals).
+CASHIER_GRID_MODE = "widgets"
+
+# Name of this terminal in session and ticket records ("" = the computer's host name)
+TERMINAL_ID = ""
+
+# Prometheus-format metrics endpoint for LAN monitoring (app/services/metrics_server.py):
+# http://<terminal>:METRICS_PORT/metrics. Off by default.
+METRICS_ENABLED = False
+METRICS_BIND = "0.0.0.0"
+METRICS_PORT = 9464
+
+# UI event-loop watchdog (app/services/ui_watchdog.py): logs GUI stalls longer than
+# UI_STALL_MS with the GUI thread's stack to UI_STALL_LOG ("" = console only).
+# Also enabled with OFFLINE_LAN_UI_WATCHDOG=1 or toggled with Ctrl+Alt+Shift+W.
+UI_WATCHDOG = False
+UI_STALL_MS = 250
+UI_STALL_LOG = os.path.join(APP_DIR, "ui-stalls.log")
+
+# Fight pool totals (pool_totals.py): readers share one query per POOL_CACHE_MS; the
+# server-side compactor folds slot rows every POOL_COMPACT_INTERVAL seconds.
+POOL_CACHE_MS = 200
+POOL_COMPACT_INTERVAL = 2
+
+# Fight settlement (settlement.py): commission taken from the winnings of Meron/Wala
+# winners, and what a winning draw bet returns per peso staked.
+SETTLE_COMMISSION = 0.10
+SETTLE_DRAW_MULTIPLIER = 9
+
+# Ticket numbers (ticket_numbers.py): each terminal leases TICKET_BLOCK_SIZE numbers at a
+# time and issues them locally. TICKET_JOURNAL keeps the lease across restarts; a crash
+# voids at most TICKET_RESERVE_STEP numbers.
+TICKET_BLOCK_SIZE = 1000
+TICKET_RESERVE_STEP = 50
+TICKET_JOURNAL = os.path.join(APP_DIR, "ticket-blocks-{series}.json")
@@ -1,8 +1,16 @@
 # db.py
-import bcrypt
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2 import OperationalError
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2 import OperationalError, InterfaceError
 import config
+from host_resolver import host_resolver
+from query_stats import QueryStats
 
 
 def _password_bytes(password: str) -> bytes:
@@ -10,76 +18,523 @@ def _password_bytes(password: str) -> bytes:
     return password.encode("utf-8")[:72]
 
 
-def _hash_password(password_plain: str) -> str:
+def hash_password(password_plain: str) -> str:
+    """bcrypt hash (CPU-bound, ~0.1-0.3 s: run it off the GUI thread, see cpu_service())."""
+    import bcrypt  # deferred: not needed until the first login/account change
     return bcrypt.hashpw(_password_bytes(password_plain), bcrypt.gensalt()).decode("utf-8")
 
 
-def _verify_password(password_plain: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(_password_bytes(password_plain), password_hash.encode("utf-8"))
+def verify_password(password_plain: str, password_hash: str) -> bool:
+    """Check a password against a stored bcrypt hash (CPU-bound, like hash_password)."""
+    import bcrypt
+    try:
+        return bcrypt.checkpw(_password_bytes(password_plain), password_hash.encode("utf-8"))
+    except ValueError:
+        return False  # malformed stored hash
 
 
 def connection_ok() -> bool:
-    """Quick check if database is reachable."""
-    conn = get_connection()
+    """Quick check if database is reachable (borrows a pooled connection; instant while offline)."""
+    conn = _pool.getconn()
     if not conn:
         return False
-    conn.close()
+    _pool.putconn(conn)
     return True
 
 
-def get_connection():
-    """Returns a connection object to the PostgreSQL database."""
+def _open_connection():
+    """Connect to the PostgreSQL database. Returns (conn, None) or (None, error message)."""
+    resolver = host_resolver()
+    # Pre-resolved address as hostaddr: libpq skips the (mDNS) name lookup
+    address, port = resolver.endpoint()
     try:
         conn = psycopg2.connect(
             host=config.DB_HOST,
+            hostaddr=address,
             database=config.DB_NAME,
             user=config.DB_USER,
             password=config.DB_PASS,
-            port=config.DB_PORT,
-            connect_timeout=5,
+            port=port,
+            connect_timeout=config.DB_CONNECT_TIMEOUT,
+            keepalives=1,
+            keepalives_idle=config.DB_KEEPALIVE_IDLE,
+            keepalives_interval=config.DB_KEEPALIVE_INTERVAL,
+            keepalives_count=config.DB_KEEPALIVE_COUNT,
         )
-        return conn
     except OperationalError as e:
-        print(f"DB connection error:\n{e}")
+        if address is not None:
+            resolver.invalidate()  # the server may have a new address
+        return None, str(e).strip()
+    resolver.mark_good(address, port)
+    return conn, None
+
+
+def get_connection():
+    """
+    Returns a new (unpooled) connection object to the PostgreSQL database.
+    Returns None immediately (no connect attempt) while the server is known to be offline.
+    """
+    if not _health.allow():
+        return None
+    conn, error = _open_connection()
+    if conn is None:
+        print(f"DB connection error:\n{error}")
+        _health.record_failure(error)
         return None
+    _health.record_success()
+    return conn
+
+
+# ---------- CONNECTION HEALTH ----------
+
+class ConnectionHealth:
+    """
+    Circuit breaker in front of every connect.
+    - online: connects are attempted normally; a failed connect trips the breaker.
+    - offline: get_connection() (and so the pool) fails immediately, and idle pooled
+      connections are closed. One background thread probes the server with exponential
+      backoff (probe_min..probe_max seconds) and goes back online on the first success.
+    Listeners (add_listener) are called with True/False on each change, from whichever
+    thread observed it; app/services/db_health.py re-emits them as Qt signals.
+    """
+
+    def __init__(self, probe_min: float = 1.0, probe_max: float = 30.0, connect=None):
+        self.probe_min = probe_min
+        self.probe_max = probe_max
+        self._connect = connect or _open_connection
+        self._lock = threading.Lock()
+        self._online = True
+        self._changed_at = time.monotonic()
+        self._last_error = None
+        self._next_probe_at = None
+        self._listeners = []
+        self._probe_wake = threading.Event()
+        self._stats = {"trips": 0, "fast_fails": 0, "probes": 0}
+
+    def is_online(self) -> bool:
+        return self._online
+
+    def allow(self) -> bool:
+        """True if a connect may be attempted now; counts a fast fail otherwise."""
+        if self._online:
+            return True
+        with self._lock:
+            self._stats["fast_fails"] += 1
+        return False
+
+    def record_failure(self, error: str = None) -> None:
+        """A connect failed: go offline and start probing (no-op if already offline)."""
+        with self._lock:
+            self._last_error = error
+            if not self._online:
+                return
+            self._online = False
+            self._changed_at = time.monotonic()
+            self._stats["trips"] += 1
+            self._probe_wake.clear()
+            threading.Thread(target=self._probe_loop, name="db-health-probe", daemon=True).start()
+        self._notify(False)
+
+    def record_success(self) -> None:
+        """A connect succeeded: go back online (no-op if already online)."""
+        with self._lock:
+            if self._online:
+                return
+            self._online = True
+            self._changed_at = time.monotonic()
+            self._last_error = None
+            self._next_probe_at = None
+        self._probe_wake.set()  # ends the probe loop
+        self._notify(True)
+
+    def probe_now(self) -> None:
+        """Skip the current backoff wait (e.g. a Retry button); no-op while online."""
+        self._probe_wake.set()
+
+    def add_listener(self, callback) -> None:
+        """callback(online: bool) on every state change."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def state(self) -> dict:
+        """Snapshot: online, seconds in the current state, last error, seconds to next probe, counters."""
+        with self._lock:
+            now = time.monotonic()
+            next_probe = None
+            if self._next_probe_at is not None:
+                next_probe = round(max(0.0, self._next_probe_at - now), 1)
+            return {
+                "online": self._online,
+                "for_s": round(now - self._changed_at, 1),
+                "last_error": self._last_error,
+                "next_probe_in_s": next_probe,
+                **self._stats,
+            }
+
+    def _notify(self, online: bool) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(online)
+            except Exception as e:
+                print(f"DB health listener error:\n{e}")
+
+    def _probe_loop(self) -> None:
+        delay = self.probe_min
+        while not self._online:
+            with self._lock:
+                self._next_probe_at = time.monotonic() + delay
+            self._probe_wake.wait(delay)
+            self._probe_wake.clear()
+            if self._online:
+                return
+            with self._lock:
+                self._stats["probes"] += 1
+            conn, error = self._connect()
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                self.record_success()
+                return
+            with self._lock:
+                self._last_error = error
+            delay = min(delay * 2, self.probe_max)
+
+
+_health = ConnectionHealth(probe_min=config.DB_PROBE_MIN, probe_max=config.DB_PROBE_MAX)
+
+
+def connection_health() -> ConnectionHealth:
+    """Return the process-wide connection circuit breaker."""
+    return _health
+
+
+def is_online() -> bool:
+    """Cached connectivity state: False while the server is unreachable and being probed."""
+    return _health.is_online()
+
+
+# ---------- CONNECTION POOL ----------
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of psycopg2 connections.
+    - Keeps at least min_size connections open once warmed up, never more than max_size.
+    - Connections idle longer than idle_timeout are closed (down to min_size).
+    - Connections are checked on checkout: closed ones are dropped, and ones idle
+      longer than ping_after seconds are pinged with SELECT 1 before being handed out.
+    - Returned connections are rolled back so no transaction stays open in the pool.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 10, idle_timeout: float = 300,
+                 wait_timeout: float = 5, ping_after: float = 30, connect=None, health=None):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.ping_after = ping_after
+        self._connect = connect or get_connection
+        self._health = health  # ConnectionHealth: fail fast while offline, drop idle conns on a trip
+        if health is not None:
+            health.add_listener(lambda online: online or self.close_all())
+        self._cond = threading.Condition()
+        self._idle = []  # [(conn, returned_at)], most recently returned last
+        self._in_use = set()
+        self._pending = 0  # connections being opened outside the lock
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "evicted": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connect_failures": 0,
+        }
+
+    def getconn(self):
+        """Borrow a connection. Returns None if the database is unreachable or the pool is exhausted."""
+        if self._health is not None and not self._health.allow():
+            return None
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            candidate = None
+            with self._cond:
+                self._evict_idle_locked()
+                if self._idle:
+                    candidate, returned_at = self._idle.pop()
+                    self._in_use.add(candidate)
+                elif len(self._in_use) + self._pending < self.max_size:
+                    # Reserve the slot, then connect outside the lock
+                    self._pending += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        print(f"DB pool exhausted: {self.max_size} connections in use")
+                        return None
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+            if candidate is None:
+                break
+            # Validate outside the lock so a dead socket does not stall other threads
+            if self._is_usable(candidate, returned_at):
+                with self._cond:
+                    self._stats["reused"] += 1
+                return candidate
+            with self._cond:
+                self._in_use.discard(candidate)
+                self._discard(candidate)
+
+        conn = None
+        try:
+            conn = self._connect()
+        finally:
+            with self._cond:
+                self._pending -= 1
+                if conn is None:
+                    self._stats["connect_failures"] += 1
+                    self._cond.notify()
+                else:
+                    self._in_use.add(conn)
+                    self._stats["created"] += 1
+        return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Return a borrowed connection. Broken connections (or discard=True) are closed."""
+        if conn is None:
+            return
+        if not discard and not conn.closed:
+            try:
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use.discard(conn)
+            if discard or conn.closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._evict_idle_locked()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager: yields a pooled connection (or None) and always returns it."""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def warm_up(self, count: int = None) -> int:
+        """
+        Open connections until count (default min_size, at most max_size) are idle or in use.
+        Returns connections opened. Extra warm connections above min_size idle out as usual.
+        """
+        target = min(self.max_size, max(self.min_size, count or 0))
+        opened = 0
+        held = []
+        try:
+            while True:
+                with self._cond:
+                    if len(self._idle) + len(self._in_use) + self._pending >= target:
+                        return opened
+                # Hold each new connection until done so getconn() opens a fresh one
+                conn = self.getconn()
+                if conn is None:
+                    return opened
+                held.append(conn)
+                opened += 1
+        finally:
+            for conn in held:
+                self.putconn(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection. Borrowed connections are closed when returned."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+
+    def stats(self) -> dict:
+        """Snapshot of pool sizes and counters."""
+        with self._cond:
+            in_use = len(self._in_use)
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": in_use,
+                "size": len(self._idle) + in_use,
+                **self._stats,
+            }
+
+    def _is_usable(self, conn, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self) -> None:
+        now = time.monotonic()
+        # Oldest idle connections are at the front of the list
+        while self._idle and len(self._idle) + len(self._in_use) > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._discard(conn)
+            self._stats["evicted"] += 1
+
+    def _discard(self, conn) -> None:
+        self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool = ConnectionPool(
+    min_size=config.DB_POOL_MIN,
+    max_size=config.DB_POOL_MAX,
+    idle_timeout=config.DB_POOL_IDLE_TIMEOUT,
+    wait_timeout=config.DB_POOL_WAIT_TIMEOUT,
+    health=_health,
+)
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool used by fetch_all/fetch_one/execute."""
+    return _pool
+
+
+def pool_stats() -> dict:
+    """Return connection pool statistics (sizes, reuse and failure counters)."""
+    return _pool.stats()
+
+
+def close_pool() -> None:
+    """Close idle pooled connections (e.g. on application exit)."""
+    _pool.close_all()
+
+
+# ---------- QUERY INSTRUMENTATION ----------
+
+_stats = QueryStats(
+    enabled=config.DB_QUERY_STATS,
+    slow_ms=config.DB_SLOW_QUERY_MS,
+    slow_log_path=config.DB_SLOW_QUERY_LOG,
+)
+
+
+def query_stats() -> QueryStats:
+    """Return the process-wide query statistics (see query_stats.py)."""
+    return _stats
 
 
 def fetch_all(query: str, params=None):
-    conn = get_connection()
+    span = _stats.span(query)
+    conn = _pool.getconn()
+    span.connected()
     if not conn:
+        span.finish(error="no connection")
         return []
+    broken = False
     try:
         with conn.cursor() as cur:
             cur.execute(query, params)
-            return cur.fetchall()
+            rows = cur.fetchall()
+        span.finish(rows=len(rows))
+        return rows
     except Exception as e:
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        span.finish(error=str(e))
         print(f"DB fetch_all error:\n{e}")
         return []
     finally:
-        conn.close()
+        _pool.putconn(conn, discard=broken)
+
+
+def fetch_rows(query: str, params=None):
+    """
+    Like fetch_all, for callers that must tell a failed read from an empty one:
+    returns the rows, or None on error (see get_last_error()).
+    """
+    _local.last_execute_error = None
+    span = _stats.span(query)
+    conn = _pool.getconn()
+    span.connected()
+    if not conn:
+        _local.last_execute_error = "Cannot connect to database"
+        span.finish(error=_local.last_execute_error)
+        return None
+    broken = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+        span.finish(rows=len(rows))
+        return rows
+    except Exception as e:
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        _local.last_execute_error = str(e)
+        span.finish(error=str(e))
+        print(f"DB fetch_rows error:\n{e}")
+        return None
+    finally:
+        _pool.putconn(conn, discard=broken)
 
 
 def fetch_one(query: str, params=None):
-    conn = get_connection()
+    span = _stats.span(query)
+    conn = _pool.getconn()
+    span.connected()
     if not conn:
+        span.finish(error="no connection")
         return None
+    broken = False
     try:
         with conn.cursor() as cur:
             cur.execute(query, params)
-            return cur.fetchone()
+            row = cur.fetchone()
+        span.finish(rows=0 if row is None else 1)
+        return row
     except Exception as e:
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        span.finish(error=str(e))
         print(f"DB fetch_one error:\n{e}")
         return None
     finally:
-        conn.close()
+        _pool.putconn(conn, discard=broken)
 
 
-_last_execute_error = None
+# Per-thread so queries running on worker threads do not overwrite each other's errors
+_local = threading.local()
 
 
 def get_last_error() -> str | None:
-    """Return the last execute() error message, or None."""
-    return _last_execute_error
+    """Return the last execute() error message on the calling thread, or None."""
+    return getattr(_local, "last_execute_error", None)
 
 
 def execute(query: str, params=None, require_affected: bool = False):
@@ -87,32 +542,93 @@ def execute(query: str, params=None, require_affected: bool = False):
     Execute a query. Returns True on success, False on error.
     If require_affected=True, returns False if no rows were affected (useful for UPDATE/DELETE).
     """
-    global _last_execute_error
-    _last_execute_error = None
-    conn = get_connection()
+    _local.last_execute_error = None
+    span = _stats.span(query)
+    conn = _pool.getconn()
+    span.connected()
     if not conn:
-        _last_execute_error = "Cannot connect to database"
+        _local.last_execute_error = "Cannot connect to database"
+        span.finish(error=_local.last_execute_error)
         return False
+    broken = False
     try:
         with conn.cursor() as cur:
             cur.execute(query, params)
             rowcount = cur.rowcount
         conn.commit()
+        span.finish(rows=rowcount)
         if require_affected and rowcount == 0:
-            _last_execute_error = "No rows affected"
+            _local.last_execute_error = "No rows affected"
             return False
         return True
     except Exception as e:
-        conn.rollback()
-        _last_execute_error = str(e)
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        if not broken:
+            conn.rollback()
+        _local.last_execute_error = str(e)
+        span.finish(error=str(e))
         print(f"DB execute error:\n{e}")
         return False
     finally:
-        conn.close()
+        _pool.putconn(conn, discard=broken)
+
+
+def execute_fetch(query: str, params=None):
+    """
+    Execute a statement that returns rows (e.g. INSERT ... RETURNING, SELECT of a function
+    that writes) and commit. Returns the fetched rows, or None on error (see get_last_error()).
+    """
+    _local.last_execute_error = None
+    span = _stats.span(query)
+    conn = _pool.getconn()
+    span.connected()
+    if not conn:
+        _local.last_execute_error = "Cannot connect to database"
+        span.finish(error=_local.last_execute_error)
+        return None
+    broken = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+        conn.commit()
+        span.finish(rows=len(rows))
+        return rows
+    except Exception as e:
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        if not broken:
+            conn.rollback()
+        _local.last_execute_error = str(e)
+        span.finish(error=str(e))
+        print(f"DB execute error:\n{e}")
+        return None
+    finally:
+        _pool.putconn(conn, discard=broken)
 
 
 # ---------- AUTH / USERS ----------
 
+# LISTEN/NOTIFY channel for user changes (see app/services/notify_listener.py).
+# Payload: JSON {"op": "insert"|"update"|"delete"|"status", "user_id", "username",
+#                "name", "role", "is_active", "last_active"}
+USER_CHANGES_CHANNEL = "user_changes"
+
+
+def _notify_user_changes(op: str, returning: str = "") -> str:
+    """
+    SQL tail that NOTIFYs listeners about each row of the preceding 'changed' CTE.
+    Runs in the same statement as the change, so the notification is sent on commit.
+    returning: extra leading columns of 'changed' to return per row (e.g. "username, ").
+    """
+    return f"""
+        SELECT {returning}pg_notify('{USER_CHANGES_CHANNEL}', json_build_object(
+            'op', '{op}', 'user_id', user_id, 'username', username, 'name', name,
+            'role', role, 'is_active', is_active, 'last_active', last_active
+        )::text)
+        FROM changed;
+    """
+
+
 def super_admin_exists() -> bool:
     row = fetch_one(
         "SELECT 1 FROM public.users WHERE role = %s LIMIT 1;",
@@ -129,27 +645,32 @@ def username_exists(username: str) -> bool:
     return row is not None
 
 
-def create_user(username: str, password_plain: str, role: str, name: str) -> bool:
-    """Create a new user. All fields are required (name is NOT NULL in DB)."""
-    password_hash = _hash_password(password_plain)
+def create_user(username: str, password_plain: str, role: str, name: str, password_hash: str = None) -> bool:
+    """
+    Create a new user. All fields are required (name is NOT NULL in DB).
+    Pass password_hash (from hash_password) to skip hashing here; password_plain is then ignored.
+    """
+    password_hash = password_hash or hash_password(password_plain)
     role = role or "cashier"
     name = name or username  # fallback to username if name is empty
     return execute(
         """
-        INSERT INTO public.users (username, password_hash, role, is_active, name, created_at)
-        VALUES (%s, %s, %s, FALSE, %s, NOW());
-        """,
+        WITH changed AS (
+            INSERT INTO public.users (username, password_hash, role, is_active, name, created_at)
+            VALUES (%s, %s, %s, FALSE, %s, NOW())
+            RETURNING user_id, username, name, role, is_active, last_active
+        )
+        """ + _notify_user_changes("insert"),
         (username, password_hash, role, name)
     )
 
 
-def verify_login(username: str, password_plain: str):
+def fetch_login_user(username: str):
     """
-    Returns dict if valid login:
-      {"user_id":..., "username":..., "role":...}
-    Returns None if invalid (user not found or wrong password).
-    Note: is_active is not checked here—it tracks session state (login/logout).
-    Login fails only if user is deleted (not found) or password is wrong.
+    First half of a login: the user row with its stored hash, checked separately with
+    verify_password (off the DB worker). Returns
+      {"user_id", "username", "role", "password_hash"}
+    or None if the user does not exist.
     """
     row = fetch_one(
         """
@@ -162,35 +683,82 @@ def verify_login(username: str, password_plain: str):
     )
     if not row:
         return None
-
     user_id, uname, password_hash, role = row
+    return {"user_id": user_id, "username": uname, "role": role, "password_hash": password_hash}
 
-    if not _verify_password(password_plain, password_hash):
-        return None
 
-    return {"user_id": user_id, "username": uname, "role": role}
+def verify_login(username: str, password_plain: str):
+    """
+    Returns dict if valid login:
+      {"user_id":..., "username":..., "role":...}
+    Returns None if invalid (user not found or wrong password).
+    Note: is_active is not checked here—it tracks session state (login/logout).
+    Login fails only if user is deleted (not found) or password is wrong.
+    """
+    user = fetch_login_user(username)
+    if not user or not verify_password(password_plain, user.pop("password_hash")):
+        return None
+    return user
 
 
 def update_last_active(user_id) -> bool:
     """Update user's last_active time and set is_active (on login)."""
     return execute(
         """
-        UPDATE public.users
-        SET last_active = CURRENT_TIME, is_active = TRUE
-        WHERE user_id = %s;
-        """,
+        WITH changed AS (
+            UPDATE public.users
+            SET last_active = CURRENT_TIME, is_active = TRUE
+            WHERE user_id = %s
+            RETURNING user_id, username, name, role, is_active, last_active
+        )
+        """ + _notify_user_changes("status"),
         (user_id,)
     )
 
 
+def terminal_id() -> str:
+    """This terminal's name in session/ticket records: config.TERMINAL_ID, or the host name."""
+    return config.TERMINAL_ID or socket.gethostname()
+
+
+def start_session(user_id: int, password_hash: str, terminal: str = None):
+    """
+    Second half of a login, after verify_password() accepted the hash from fetch_login_user().
+    One call to public.app_login (schema.py), which atomically re-checks that the hash is
+    unchanged, marks the user active, opens a public.user_sessions row and notifies listeners.
+    Returns {"user_id", "username", "name", "role", "session_id"}, or None if the account was
+    deleted or its password changed meanwhile, or on error (see get_last_error()).
+    """
+    rows = execute_fetch(
+        "SELECT session_id, user_id, username, name, role FROM public.app_login(%s, %s, %s);",
+        (user_id, password_hash, terminal or terminal_id())
+    )
+    if not rows:
+        return None
+    session_id, uid, username, name, role = rows[0]
+    return {"user_id": uid, "username": username, "name": name, "role": role, "session_id": session_id}
+
+
+def end_session(user_id: int, session_id: int = None) -> bool:
+    """
+    Logout in one call to public.app_logout: closes the session (every open session of the
+    user if session_id is None), marks the user inactive and notifies listeners.
+    """
+    rows = execute_fetch("SELECT public.app_logout(%s, %s);", (user_id, session_id))
+    return bool(rows and rows[0][0])
+
+
 def deactivate_user(user_id) -> bool:
     """Set is_active to false and update last_active (on logout)."""
     return execute(
         """
-        UPDATE public.users
-        SET is_active = FALSE, last_active = CURRENT_TIME
-        WHERE user_id = %s;
-        """,
+        WITH changed AS (
+            UPDATE public.users
+            SET is_active = FALSE, last_active = CURRENT_TIME
+            WHERE user_id = %s
+            RETURNING user_id, username, name, role, is_active, last_active
+        )
+        """ + _notify_user_changes("status"),
         (user_id,)
     )
 
@@ -235,37 +803,136 @@ def fetch_users_excluding_super_admin():
     ]
 
 
-def update_user_account(user_id: int, username: str, name: str, role: str, password_plain: str = None) -> bool:
-    """Update user. Does not allow updating super_admin."""
+def update_user_account(user_id: int, username: str, name: str, role: str, password_plain: str = None,
+                        password_hash: str = None) -> bool:
+    """
+    Update user. Does not allow updating super_admin.
+    The password changes if password_plain or a precomputed password_hash is given.
+    """
     role = str(role or "cashier")
     if role not in ROLES_FOR_ACCOUNTS:
         return False
-    if password_plain:
-        password_hash = _hash_password(password_plain)
+    if password_plain or password_hash:
+        password_hash = password_hash or hash_password(password_plain)
         return execute(
             """
-            UPDATE public.users
-            SET username = %s, name = %s, role = %s, password_hash = %s
-            WHERE user_id = %s AND role != %s;
-            """,
+            WITH changed AS (
+                UPDATE public.users
+                SET username = %s, name = %s, role = %s, password_hash = %s
+                WHERE user_id = %s AND role != %s
+                RETURNING user_id, username, name, role, is_active, last_active
+            )
+            """ + _notify_user_changes("update"),
             (username, name, role, password_hash, user_id, "super_admin"),
             require_affected=True,
         )
     return execute(
         """
-        UPDATE public.users
-        SET username = %s, name = %s, role = %s
-        WHERE user_id = %s AND role != %s;
-        """,
+        WITH changed AS (
+            UPDATE public.users
+            SET username = %s, name = %s, role = %s
+            WHERE user_id = %s AND role != %s
+            RETURNING user_id, username, name, role, is_active, last_active
+        )
+        """ + _notify_user_changes("update"),
         (username, name, role, user_id, "super_admin"),
         require_affected=True,
     )
 
 
+def fetch_existing_usernames(usernames) -> dict | None:
+    """
+    One query for a whole batch: {username: role} for the usernames that already exist
+    (any role, super_admin included). None if the query failed (see get_last_error()).
+    """
+    usernames = list(usernames)
+    if not usernames:
+        return {}
+    rows = fetch_rows("SELECT username, role FROM public.users WHERE username = ANY(%s);", (usernames,))
+    return dict(rows) if rows is not None else None
+
+
+def bulk_create_users(accounts: list, reset_existing: bool = False) -> dict | None:
+    """
+    Insert many accounts in one transaction with one multi-row INSERT.
+    accounts: [{"username", "password_hash", "role", "name"}, ...] with unique usernames and
+    roles from ROLES_FOR_ACCOUNTS (hash with hash_password beforehand).
+    Existing usernames are skipped, or with reset_existing get the new password, role and
+    name (never a super_admin). Returns {username: "created" | "reset" | "exists"}, or None
+    on error (see get_last_error(); nothing is written).
+    """
+    _local.last_execute_error = None
+    if not accounts:
+        return {}
+    values = [(a["username"], a["password_hash"], a["role"], a["name"] or a["username"]) for a in accounts]
+    span = _stats.span("bulk_create_users")
+    conn = _pool.getconn()
+    span.connected()
+    if not conn:
+        _local.last_execute_error = "Cannot connect to database"
+        span.finish(error=_local.last_execute_error)
+        return None
+    broken = False
+    result = {}
+    try:
+        with conn.cursor() as cur:
+            # Serialize concurrent imports/creates of the same batch between check and insert
+            cur.execute("LOCK TABLE public.users IN SHARE ROW EXCLUSIVE MODE;")
+            if reset_existing:
+                updated = psycopg2.extras.execute_values(
+                    cur,
+                    """
+                    WITH changed AS (
+                        UPDATE public.users u
+                        SET password_hash = v.password_hash, role = v.role, name = v.name
+                        FROM (VALUES %s) AS v(username, password_hash, role, name)
+                        WHERE u.username = v.username AND u.role != 'super_admin'
+                        RETURNING u.user_id, u.username, u.name, u.role, u.is_active, u.last_active
+                    )
+                    """ + _notify_user_changes("update", returning="username, "),
+                    values, page_size=len(values), fetch=True,
+                )
+                result.update((row[0], "reset") for row in updated)
+            inserted = psycopg2.extras.execute_values(
+                cur,
+                """
+                WITH changed AS (
+                    INSERT INTO public.users (username, password_hash, role, is_active, name, created_at)
+                    SELECT v.username, v.password_hash, v.role, FALSE, v.name, NOW()
+                    FROM (VALUES %s) AS v(username, password_hash, role, name)
+                    WHERE NOT EXISTS (SELECT 1 FROM public.users u WHERE u.username = v.username)
+                    RETURNING user_id, username, name, role, is_active, last_active
+                )
+                """ + _notify_user_changes("insert", returning="username, "),
+                values, page_size=len(values), fetch=True,
+            )
+            result.update((row[0], "created") for row in inserted)
+        conn.commit()
+        span.finish(rows=len(result))
+    except Exception as e:
+        broken = isinstance(e, (OperationalError, InterfaceError))
+        if not broken:
+            conn.rollback()
+        _local.last_execute_error = str(e)
+        span.finish(error=str(e))
+        print(f"DB bulk_create_users error:\n{e}")
+        return None
+    finally:
+        _pool.putconn(conn, discard=broken)
+    for username, *_ in values:
+        result.setdefault(username, "exists")
+    return result
+
+
 def delete_user_account(user_id: int) -> bool:
     """Delete user. Does not allow deleting super_admin."""
     return execute(
-        "DELETE FROM public.users WHERE user_id = %s AND role != %s;",
+        """
+        WITH changed AS (
+            DELETE FROM public.users WHERE user_id = %s AND role != %s
+            RETURNING user_id, username, name, role, is_active, last_active
+        )
+        """ + _notify_user_changes("delete"),
         (user_id, "super_admin"),
         require_affected=True,
     )
@@ -295,3 +962,81 @@ def fetch_cashiers():
         }
         for r in rows
     ]
+
+
+# ---------- CASHIER OVERVIEW (ledger aggregates) ----------
+
+# Ledger transaction_type -> card metric
+LEDGER_METRICS = {
+    "bet": "total_bets",
+    "cashin": "cash_in",
+    "cashout": "cash_out",
+    "draw": "draw_bets",
+    "cancel": "cancel_bets",
+    "unclaimed": "unclaimed",
+    "withdraw": "withdraw",
+}
+
+
+def fetch_cashier_overview(summary_date=None):
+    """
+    Fetch every cashier with all card metrics for one day in a single round trip.
+    Reads one public.transaction_summary row per cashier (kept current by ledger
+    triggers, see schema.py), joined to users and cashier_status.
+    summary_date defaults to today (server date).
+    Returns list of dicts:
+    [{"user_id", "username", "name", "is_active", "last_active", "battery_percentage",
+      "total_bets", "cash_in", "cash_out", "draw_bets", "cancel_bets", "unclaimed", "withdraw"}, ...]
+    """
+    metrics = tuple(LEDGER_METRICS.values())
+    rows = fetch_all(
+        f"""
+        SELECT u.user_id, u.username, u.name, u.is_active, u.last_active,
+               COALESCE(cs.battery_percentage, 100),
+               {", ".join(f"COALESCE(ts.{m}, 0)" for m in metrics)}
+        FROM public.users u
+        LEFT JOIN public.cashier_status cs ON cs.cashier_id = u.user_id
+        LEFT JOIN public.transaction_summary ts
+            ON ts.cashier_id = u.user_id AND ts.summary_date = COALESCE(%s::date, CURRENT_DATE)
+        WHERE u.role = %s
+        ORDER BY COALESCE(u.name, u.username) ASC;
+        """,
+        (summary_date, "cashier")
+    )
+    return [
+        {
+            "user_id": r[0],
+            "username": r[1],
+            "name": r[2],
+            "is_active": r[3],
+            "last_active": r[4],
+            "battery_percentage": r[5],
+            **{m: float(v) for m, v in zip(metrics, r[6:])},
+        }
+        for r in rows
+    ]
+
+
+def fetch_summary_report(date_from, date_to):
+    """
+    Per-cashier totals over a date range (inclusive) from public.transaction_summary,
+    for reports. Returns list of dicts:
+    [{"user_id", "name", "total_bets", ..., "withdraw", "coh"}, ...]
+    """
+    metrics = tuple(LEDGER_METRICS.values()) + ("coh",)
+    rows = fetch_all(
+        f"""
+        SELECT u.user_id, COALESCE(u.name, u.username),
+               {", ".join(f"SUM(ts.{m})" for m in metrics)}
+        FROM public.transaction_summary ts
+        JOIN public.users u ON u.user_id = ts.cashier_id
+        WHERE ts.summary_date BETWEEN %s AND %s
+        GROUP BY u.user_id, COALESCE(u.name, u.username)
+        ORDER BY 2 ASC;
+        """,
+        (date_from, date_to)
+    )
+    return [
+        {"user_id": r[0], "name": r[1], **{m: float(v) for m, v in zip(metrics, r[2:])}}
+        for r in rows
+    ]
@@ -0,0 +1,224 @@
+# fight_state.py
+"""
+Event and fight state machine, persisted in PostgreSQL (schema.py "fight_state" step).
+
+    pending -> open -> last_call -> closed -> settled
+                  \\______________/    ^  \\__ (settlement.py only; so is the reversal back to closed)
+    pending -> cancelled              reopen: closed -> open
+
+Every fight status change is checked by a trigger against FIGHT_TRANSITIONS, logged in
+public.fight_state_log and pushed with NOTIFY on FIGHT_STATE_CHANNEL when it commits,
+so every terminal's notification listener hears it within milliseconds on the LAN.
+
+Closing is enforced in the database: a bet holds its fight row FOR SHARE while it is
+booked (public.place_bet), so the close waits for bets in flight and no bet is accepted
+once the close has committed. close_stats() reports, per closed fight, how long the close
+waited and how long before it the last bet was accepted.
+"""
+
+import json
+import threading
+import time
+
+import db
+from query_stats import LatencyHistogram
+
+FIGHT_STATE_CHANNEL = "fight_state"
+
+FIGHT_STATUSES = ("pending", "open", "last_call", "closed", "settled", "cancelled")
+BETTING_OPEN = ("open", "last_call")
+FIGHT_TRANSITIONS = {
+    "pending": ("open", "cancelled"),
+    "open": ("last_call", "closed"),
+    "last_call": ("closed",),
+    "closed": ("open",),
+    "settled": (),
+    "cancelled": (),
+}
+# Only public.settle_fight / public.reverse_settlement may make these (the guard trigger
+# checks a setting they raise for their own update), so tickets and settlement stay in step
+SETTLEMENT_TRANSITIONS = {"closed": ("settled",), "settled": ("closed",)}
+EVENT_STATUSES = ("scheduled", "live", "ended")
+EVENT_TRANSITIONS = {"scheduled": ("live",), "live": ("ended",), "ended": ()}
+
+_FIGHT_COLUMNS = ("fight_id", "event_id", "event_date", "fight_number", "status", "result", "min_bet", "max_bet",
+                  "closed_at", "close_wait_ms")
+
+
+def can_transition(from_status: str, to_status: str) -> bool:
+    """Whether transition() may move a fight between these statuses (never settlement moves)."""
+    return to_status in FIGHT_TRANSITIONS.get(from_status, ())
+
+
+def _fight_dict(r) -> dict:
+    d = dict(zip(_FIGHT_COLUMNS, r))
+    for key in ("min_bet", "max_bet", "close_wait_ms"):
+        if d[key] is not None:
+            d[key] = float(d[key])
+    return d
+
+
+_FIGHT_SELECT = f"SELECT {', '.join('f.' + c for c in _FIGHT_COLUMNS)} FROM public.fights f"
+
+
+# ---------- FIGHTS ----------
+
+def create_fight(fight_number: int = None, event_date=None, min_bet=20, max_bet=None):
+    """
+    Add a 'pending' fight to an event day (today by default; the event row is created on
+    first use). fight_number defaults to the next number of the day. Returns the fight_id,
+    or None on error.
+    """
+    rows = db.execute_fetch(
+        """
+        INSERT INTO public.fights (event_date, fight_number, min_bet, max_bet)
+        SELECT e.d, COALESCE(%s, (SELECT COALESCE(MAX(fight_number), 0) + 1 FROM public.fights WHERE event_date = e.d)),
+               %s, %s
+        FROM (SELECT COALESCE(%s::date, CURRENT_DATE) AS d) AS e
+        RETURNING fight_id;
+        """,
+        (fight_number, min_bet, max_bet, event_date)
+    )
+    return rows[0][0] if rows else None
+
+
+def transition(fight_id: int, status: str, user_id: int = None):
+    """
+    Move a fight to status (see FIGHT_TRANSITIONS; 'settled' only through settlement.py).
+    Returns the updated fight dict, or None if the transition was refused or failed
+    (see get_last_error()).
+    """
+    if status not in FIGHT_STATUSES or status == "settled":
+        return None
+    rows = db.execute_fetch(
+        f"SELECT {', '.join(_FIGHT_COLUMNS)} FROM public.fight_transition(%s, %s, %s);",
+        (fight_id, status, user_id)
+    )
+    return _fight_dict(rows[0]) if rows else None
+
+
+def fetch_fight(fight_id: int):
+    """One fight as a dict, or None if missing or on error."""
+    row = db.fetch_one(f"{_FIGHT_SELECT} WHERE f.fight_id = %s;", (fight_id,))
+    return _fight_dict(row) if row else None
+
+
+def fetch_current_fight(event_date=None):
+    """The fight taking bets on an event day (today by default), else the latest one; None if none."""
+    row = db.fetch_one(
+        f"""
+        {_FIGHT_SELECT}
+        WHERE f.event_date = COALESCE(%s::date, CURRENT_DATE)
+        ORDER BY f.status IN ('open', 'last_call') DESC, f.fight_number DESC
+        LIMIT 1;
+        """,
+        (event_date,)
+    )
+    return _fight_dict(row) if row else None
+
+
+def fetch_event_fights(event_date=None) -> list:
+    """Every fight of an event day (today by default), by fight number."""
+    rows = db.fetch_all(
+        f"{_FIGHT_SELECT} WHERE f.event_date = COALESCE(%s::date, CURRENT_DATE) ORDER BY f.fight_number;",
+        (event_date,)
+    )
+    return [_fight_dict(r) for r in rows]
+
+
+# ---------- EVENTS ----------
+
+def fetch_event(event_date=None):
+    """{"event_id", "event_date", "name", "status"} for a day (today by default), or None."""
+    row = db.fetch_one(
+        "SELECT event_id, event_date, name, status FROM public.events WHERE event_date = COALESCE(%s::date, CURRENT_DATE);",
+        (event_date,)
+    )
+    return dict(zip(("event_id", "event_date", "name", "status"), row)) if row else None
+
+
+def set_event_status(event_id: int, status: str) -> bool:
+    """Move an event along EVENT_TRANSITIONS (the trigger rejects anything else)."""
+    if status not in EVENT_STATUSES:
+        return False
+    return db.execute(
+        "UPDATE public.events SET status = %s WHERE event_id = %s;",
+        (status, event_id),
+        require_affected=True,
+    )
+
+
+# ---------- CLOSE LATENCY ----------
+
+def close_stats(fight_id: int = None, event_date=None) -> list:
+    """
+    Per closed fight (one fight, or every fight of an event day):
+    {"fight_id", "fight_number", "closed_at", "close_wait_ms", "last_bet_at",
+     "last_bet_gap_ms", "late_tickets"}
+    close_wait_ms: how long the close waited for bets in flight; last_bet_gap_ms: last
+    accepted bet to close; late_tickets: tickets accepted after the close (must be 0).
+    """
+    rows = db.fetch_all(
+        """
+        SELECT f.fight_id, f.fight_number, f.closed_at, f.close_wait_ms, b.last_bet_at,
+               EXTRACT(EPOCH FROM f.closed_at - b.last_bet_at) * 1000, COALESCE(b.late, 0)
+        FROM public.fights f
+        LEFT JOIN LATERAL (
+            SELECT MAX(accepted_at) FILTER (WHERE accepted_at <= f.closed_at) AS last_bet_at,
+                   COUNT(*) FILTER (WHERE accepted_at > f.closed_at) AS late
+            FROM public.bet_tickets t WHERE t.fight_id = f.fight_id
+        ) b ON TRUE
+        WHERE f.closed_at IS NOT NULL
+          AND (%s::bigint IS NULL OR f.fight_id = %s)
+          AND (%s::bigint IS NOT NULL OR f.event_date = COALESCE(%s::date, CURRENT_DATE))
+        ORDER BY f.fight_number;
+        """,
+        (fight_id, fight_id, fight_id, event_date)
+    )
+    return [
+        {
+            "fight_id": r[0],
+            "fight_number": r[1],
+            "closed_at": r[2],
+            "close_wait_ms": float(r[3]) if r[3] is not None else None,
+            "last_bet_at": r[4],
+            "last_bet_gap_ms": float(r[5]) if r[5] is not None else None,
+            "late_tickets": r[6],
+        }
+        for r in rows
+    ]
+
+
+class _DeliveryStats:
+    """Server-commit-to-client delay of FIGHT_STATE_CHANNEL notifications on this terminal."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist = LatencyHistogram()
+        self.last = None
+
+    def record(self, payload: str) -> None:
+        """Call on receipt (listener thread). Includes any clock offset between server and terminal."""
+        try:
+            sent = float(json.loads(payload)["at"])
+        except (ValueError, KeyError, TypeError):
+            return
+        ms = max(0.0, (time.time() - sent) * 1000)
+        with self._lock:
+            self._hist.add(ms)
+            self.last = ms
+
+    def histogram(self) -> LatencyHistogram:
+        with self._lock:
+            return self._hist.copy()
+
+    def snapshot(self) -> dict:
+        return dict(self.histogram().as_dict(), last_ms=self.last)
+
+
+_delivery = _DeliveryStats()
+
+
+def delivery_stats() -> _DeliveryStats:
+    """Return this process's notification delivery statistics."""
+    return _delivery
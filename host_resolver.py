@@ -0,0 +1,205 @@
+# host_resolver.py
+"""
+Resolves config.DB_HOST once for the data layer, so no connect pays for name lookup
+(mDNS ".local" names can take hundreds of milliseconds, or seconds, per lookup).
+
+- The address is cached for config.DB_HOST_TTL seconds. A stale address keeps being
+  used while one background thread refreshes it; only a cold start with nothing known
+  resolves inline.
+- The last address that connected is saved in QSettings and used on the next launch
+  until the fresh lookup finishes.
+- With config.DB_DISCOVERY enabled, a failed lookup asks the LAN with a UDP broadcast;
+  the arena server answers with server_beacon.py, announcing its database port.
+
+db.py passes endpoint() to libpq: the address as hostaddr (host stays the name, for
+SSL/logging) and the port, which is config.DB_PORT unless a discovered server announced
+another.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+
+import config
+
+_SETTINGS_KEY = "db/last_good_address"
+BEACON_QUERY = b"OFFLINE-LAN-DB?"
+BEACON_REPLY = b"OFFLINE-LAN-DB"
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def discover(port: int = None, timeout: float = 0.5):
+    """
+    Broadcast a beacon query on the LAN. Returns (address, db_port) of the first server
+    that answers, or None.
+    """
+    port = port or config.DB_DISCOVERY_PORT
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.settimeout(timeout)
+            sock.sendto(BEACON_QUERY, ("255.255.255.255", port))
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                data, (addr, _) = sock.recvfrom(256)
+                name, _, db_port = data.partition(b" ")
+                if name == BEACON_REPLY:
+                    return addr, int(db_port or config.DB_PORT)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class HostResolver:
+    """Thread-safe cached address for one host name."""
+
+    def __init__(self, host: str, port, ttl: float = 300, discovery: bool = False):
+        self.host = host
+        self.port = int(port)
+        self.ttl = ttl
+        self.discovery = discovery
+        self._lock = threading.Lock()
+        self._address = None
+        self._port = self.port  # a discovered server's announced port
+        self._resolved_at = 0.0
+        self._refreshing = False
+        self._saved = None  # last address written to QSettings
+        self._stats = {"lookups": 0, "lookup_failures": 0, "discovered": 0, "last_good_used": 0}
+        self._lookup_ms = None
+        if _is_ip(host):
+            self._address, self._resolved_at = host, float("inf")
+
+    def address(self):
+        """
+        Cached address for the host (None if nothing is known; libpq then resolves the name).
+        Never blocks once an address is known: a stale one triggers a background refresh.
+        """
+        with self._lock:
+            address = self._address
+            stale = time.monotonic() - self._resolved_at > self.ttl
+            if address is None:
+                saved = self._load_last_good()
+                if saved is not None:
+                    address, self._port = saved
+                    self._address = address
+                    self._stats["last_good_used"] += 1
+            if address is not None:
+                if stale:
+                    self._refresh_async_locked()
+                return address
+        # Cold start with no saved address: resolve inline, once
+        return self.refresh()
+
+    def refresh(self):
+        """Resolve now (name lookup, then beacon discovery). Returns the address in use."""
+        address, port = self._lookup(), self.port
+        if address is None and self.discovery:
+            found = discover()
+            if found is not None:
+                address, port = found
+                with self._lock:
+                    self._stats["discovered"] += 1
+        with self._lock:
+            self._refreshing = False
+            if address is not None:
+                self._address, self._port = address, port
+                self._resolved_at = time.monotonic()
+            elif self._address is None:
+                saved = self._load_last_good()
+                if saved is not None:
+                    self._address, self._port = saved
+            return self._address
+
+    def endpoint(self):
+        """(address(), port): the port a discovered server announced, else the configured one."""
+        address = self.address()
+        with self._lock:
+            return address, self._port
+
+    def refresh_async(self) -> None:
+        """Start a background refresh (e.g. at startup, before the first query)."""
+        with self._lock:
+            self._refresh_async_locked()
+
+    def invalidate(self) -> None:
+        """A connect to the cached address failed: look it up again in the background."""
+        with self._lock:
+            if self._resolved_at != float("inf"):
+                self._resolved_at = 0.0
+                self._refresh_async_locked()
+
+    def mark_good(self, address, port=None) -> None:
+        """A connect to address (and port) succeeded: persist it as the last known good address."""
+        port = int(port or self.port)
+        if address is None or (address, port) == self._saved or _is_ip(self.host):
+            return
+        self._saved = (address, port)
+        try:
+            from PySide6.QtCore import QSettings
+            QSettings("Offline-LAN", "Offline-LAN").setValue(_SETTINGS_KEY, f"{self.host}={address}:{port}")
+        except Exception as e:
+            print(f"Host resolver settings error:\n{e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, host=self.host, address=self._address, port=self._port, lookup_ms=self._lookup_ms,
+                        age_s=round(time.monotonic() - self._resolved_at, 1)
+                        if self._resolved_at not in (0.0, float("inf")) else None)
+
+    def _refresh_async_locked(self) -> None:
+        if self._refreshing:
+            return
+        self._refreshing = True
+        threading.Thread(target=self.refresh, name="db-host-resolve", daemon=True).start()
+
+    def _lookup(self):
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self.host, self.port, socket.AF_INET, socket.SOCK_STREAM)
+            address = infos[0][4][0] if infos else None
+        except OSError as e:
+            print(f"Host resolver: cannot resolve {self.host}:\n{e}")
+            address = None
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._lookup_ms = round((time.perf_counter() - start) * 1000, 1)
+            if address is None:
+                self._stats["lookup_failures"] += 1
+        return address
+
+    def _load_last_good(self):
+        """(address, port) saved by mark_good(), or None."""
+        try:
+            from PySide6.QtCore import QSettings
+            value = QSettings("Offline-LAN", "Offline-LAN").value(_SETTINGS_KEY, "")
+        except Exception:
+            return None
+        host, _, address = str(value or "").partition("=")
+        # IPv4 only (AF_INET), so a colon separates the port; older values have none
+        address, _, port = address.partition(":")
+        if host == self.host and address:
+            self._saved = (address, int(port) if port.isdigit() else self.port)
+            return self._saved
+        return None
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def host_resolver() -> HostResolver:
+    """Return the process-wide resolver for config.DB_HOST."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = HostResolver(config.DB_HOST, config.DB_PORT, ttl=config.DB_HOST_TTL,
+                                     discovery=config.DB_DISCOVERY)
+        return _resolver
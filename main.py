@@ -1,40 +1,90 @@
 # main.py
-from PySide6.QtCore import QCoreApplication
-from PySide6.QtWidgets import QApplication
-import db
+import importlib
+import sys
 
-from app.ui.login import LoginWindow
-from app.ui.register_super_admin import RegisterSuperAdminWindow
+from app.services.startup_trace import startup_trace
 
-from app.ui.super_admin.super_admin_window import SuperAdminWindow
-from app.ui.admin.admin_window import AdminWindow
-from app.ui.teller.teller_window import TellerWindow
-from app.ui.monitor.monitor_window import MonitorWindow
+# Only cheap, Qt-free work at import time: process-pool workers (accounts_import) start
+# with spawn and re-import this module as __mp_main__; everything else runs in main()
+trace = startup_trace()
+
+# Role windows are imported on first use: only one is ever opened per session
+_ROLE_WINDOWS = {
+    "super_admin": ("app.ui.super_admin.super_admin_window", "SuperAdminWindow"),
+    "admin": ("app.ui.admin.admin_window", "AdminWindow"),
+    "teller": ("app.ui.teller.teller_window", "TellerWindow"),
+    "monitor": ("app.ui.monitor.monitor_window", "MonitorWindow"),
+}
+
+
+def _role_window_class(role: str):
+    # fallback: unknown role
+    module_name, class_name = _ROLE_WINDOWS.get(role, _ROLE_WINDOWS["admin"])
+    with trace.phase(f"import_{module_name.rsplit('.', 1)[-1]}"):
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+def set_metrics_session(user):
+    """Report the logged-in user on the metrics endpoint (only imported when enabled)."""
+    import config
+    if config.METRICS_ENABLED:
+        from app.services.metrics_server import metrics
+        metrics().set_session(user)
+
+
+def close_ticket_allocators():
+    """On exit: keep leased ticket numbers for the next start without voiding any."""
+    from ticket_numbers import close_allocators
+    close_allocators()
 
 
 def open_role_window(user, on_logout=None):
+    from app.services.ui_watchdog import ui_watchdog
     role = user["role"]
+    window_class = _role_window_class(role)
 
     if role == "super_admin":
-        win = SuperAdminWindow(user, on_logout=on_logout)
-    elif role == "admin":
-        win = AdminWindow(user)
-    elif role == "teller":
-        win = TellerWindow(user)
-    elif role == "monitor":
-        win = MonitorWindow(user)
+        win = window_class(user, on_logout=on_logout)
     else:
-        # fallback: unknown role
-        win = AdminWindow(user)
+        win = window_class(user)
 
+    ui_watchdog().install_hotkey(win)
     win.show()
     return win
 
 
-if __name__ == "__main__":
+def main():
+    trace.configure(sys.argv)
+    with trace.phase("import_qt"):
+        from PySide6.QtCore import QCoreApplication
+        from PySide6.QtWidgets import QApplication
+    with trace.phase("import_db"):
+        import config
+        import db
+        from host_resolver import host_resolver
+    # Resolve DB_HOST (or refresh the saved address) while the UI modules load
+    host_resolver().refresh_async()
+    with trace.phase("import_login"):
+        from app.ui.login import LoginWindow
+        from app.ui.components.icon_utils import warm_up as warm_up_icons
+        from app.services.ui_watchdog import ui_watchdog
+        from app.services.query_service import query_service
+
     QCoreApplication.setApplicationName("Offline-LAN")
     QCoreApplication.setOrganizationName("Offline-LAN")
-    app = QApplication([])
+    with trace.phase("qapplication"):
+        app = QApplication([])
+    # Let queued database calls (e.g. a logout) finish before the pool closes
+    app.aboutToQuit.connect(lambda: query_service().wait_for_done(5000))
+    app.aboutToQuit.connect(db.close_pool)
+    app.aboutToQuit.connect(ui_watchdog().stop)
+    app.aboutToQuit.connect(close_ticket_allocators)
+    ui_watchdog().configure()
+    # Decode icon assets in the background while the first window is built
+    warm_up_icons()
+    if config.METRICS_ENABLED:
+        from app.services.metrics_server import metrics
+        metrics().start()
 
     windows = []
 
@@ -42,20 +92,35 @@ if __name__ == "__main__":
         def on_login_success(u):
             def do_logout(u=u):
                 from app.ui.login import save_remembered_username
-                db.deactivate_user(u["user_id"])
+                # Close the session on a worker: the login window opens without waiting
+                query_service().submit(db.end_session, u["user_id"], u.get("session_id"))
                 save_remembered_username(u["username"])
+                set_metrics_session(None)
                 start_login()
+            set_metrics_session(u)
             windows.append(open_role_window(u, on_logout=do_logout))
 
-        login = LoginWindow(on_login_success=on_login_success)
+        with trace.phase("login_window"):
+            login = LoginWindow(on_login_success=on_login_success)
+        trace.watch_first_paint(login)
+        ui_watchdog().install_hotkey(login)
         login.show()
         windows.append(login)
 
-    if not db.super_admin_exists():
+    with trace.phase("db_super_admin_check"):
+        has_super_admin = db.super_admin_exists()
+
+    if not has_super_admin:
+        from app.ui.register_super_admin import RegisterSuperAdminWindow
         setup = RegisterSuperAdminWindow(on_success=start_login)
+        trace.watch_first_paint(setup)
         setup.show()
         windows.append(setup)
     else:
         start_login()
 
     app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# pool_totals.py
+"""
+Running Meron/Wala/Draw pool totals per fight, for live odds on the Operator pages.
+
+public.place_bet adds every bet to one of POOL_SLOTS slot rows per fight and side (the
+slot of its database connection) instead of a single totals row, so terminals never
+queue on one row lock during the last-call rush. A read sums the slots in one statement,
+which is always a consistent total.
+
+The compactor folds the slots into one row per side (slot -1) in the background, so reads
+stay a handful of rows however many connections have bet. Run it on the server:
+
+    python pool_totals.py compact [--interval SECONDS]
+    python pool_totals.py show FIGHT_ID
+
+Readers that poll many times per second share one query per POOL_CACHE_MS through
+pool_cache().totals(fight_id).
+"""
+
+import argparse
+import threading
+import time
+
+import config
+import db
+
+# Slot rows per fight and side (changing it needs `python schema.py` to update place_bet)
+POOL_SLOTS = 16
+SIDES = ("meron", "wala", "draw")
+
+
+def fetch_pool_totals(fight_id: int):
+    """
+    Consistent totals for one fight: {"meron": {"total", "bets"}, "wala": ..., "draw": ...,
+    "rows": slot rows summed}. Sides without bets are zero. None on error (see get_last_error()).
+    """
+    rows = db.fetch_rows(
+        """
+        SELECT side, SUM(total), SUM(bets), COUNT(*)
+        FROM public.fight_pool_slots
+        WHERE fight_id = %s
+        GROUP BY side;
+        """,
+        (fight_id,)
+    )
+    if rows is None:
+        return None
+    totals = {side: {"total": 0.0, "bets": 0} for side in SIDES}
+    totals["rows"] = 0
+    for side, total, bets, count in rows:
+        totals[side] = {"total": float(total), "bets": int(bets)}
+        totals["rows"] += count
+    return totals
+
+
+def compact(fight_id: int = None):
+    """Fold slot rows into the per-side totals (all fights by default). Returns rows folded, or None."""
+    rows = db.execute_fetch("SELECT public.compact_fight_pools(%s);", (fight_id,))
+    return rows[0][0] if rows else None
+
+
+class PoolTotalsCache:
+    """Thread-safe: one query per fight per max_age, shared by every caller."""
+
+    def __init__(self, max_age_ms: float = 200):
+        self.max_age = max_age_ms / 1000
+        self._lock = threading.Lock()
+        self._entries = {}  # fight_id -> (fetched_at, totals)
+        self._stats = {"hits": 0, "queries": 0}
+
+    def totals(self, fight_id: int, max_age_ms: float = None):
+        """fetch_pool_totals(fight_id), at most max_age_ms old. None on error."""
+        max_age = self.max_age if max_age_ms is None else max_age_ms / 1000
+        with self._lock:
+            entry = self._entries.get(fight_id)
+            if entry is not None and time.monotonic() - entry[0] <= max_age:
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["queries"] += 1
+        totals = fetch_pool_totals(fight_id)
+        if totals is not None:
+            with self._lock:
+                self._entries[fight_id] = (time.monotonic(), totals)
+        return totals
+
+    def invalidate(self, fight_id: int = None) -> None:
+        with self._lock:
+            if fight_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(fight_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, fights=len(self._entries))
+
+
+class PoolCompactor:
+    """Background thread calling compact() every interval seconds."""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.passes = 0
+        self.folded = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="pool-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not db.is_online():
+                continue  # the circuit breaker probes for us
+            folded = compact()
+            if folded:
+                self.passes += 1
+                self.folded += folded
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def pool_cache() -> PoolTotalsCache:
+    """Return the process-wide PoolTotalsCache (config.POOL_CACHE_MS)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PoolTotalsCache(config.POOL_CACHE_MS)
+        return _cache
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Fight pool totals (sharded slots).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("compact", help="fold slot rows continuously (Ctrl+C to stop)")
+    run.add_argument("--interval", type=float, default=config.POOL_COMPACT_INTERVAL)
+    show = sub.add_parser("show", help="print one fight's totals")
+    show.add_argument("fight_id", type=int)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        totals = fetch_pool_totals(args.fight_id)
+        if totals is None:
+            print(f"Error: {db.get_last_error() or 'cannot read pool totals'}")
+            return
+        for side in SIDES:
+            print(f"{side:<6} {totals[side]['total']:>14,.2f}  ({totals[side]['bets']} bets)")
+        print(f"({totals['rows']} slot rows)")
+        return
+
+    compactor = PoolCompactor(args.interval)
+    compactor.start()
+    print(f"Compacting fight pools every {args.interval:g} s (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"{compactor.passes} passes, {compactor.folded} slot rows folded")
+    except KeyboardInterrupt:
+        compactor.stop()
+
+
+if __name__ == "__main__":
+    _main()
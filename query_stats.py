@@ -0,0 +1,302 @@
+# query_stats.py
+"""
+Query instrumentation for db.py: every fetch_all/fetch_one/execute (and the other pooled
+calls) is recorded under its query fingerprint with
+
+  - the calling function outside the data layer ("app.ui.login:_on_login_user:231"),
+  - connect time (pool checkout, including waits and new connections) vs execute time,
+  - rows returned/affected and errors,
+  - a latency histogram (LATENCY_BUCKETS_MS).
+
+Queries slower than config.DB_SLOW_QUERY_MS are also written to a rotating JSON-lines log
+(config.DB_SLOW_QUERY_LOG). Parameters are never logged (they include password hashes).
+
+    db.query_stats().snapshot()          # dict: per-fingerprint stats, hottest first
+    db.query_stats().dump("stats.json")  # same, as a file
+    db.query_stats().add_observer(fn)    # fn(record) for every query (metrics exporters)
+"""
+
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Distinct SQL texts whose fingerprint is memoized
+_MAX_TEXTS = 2000
+
+# Frames in these files are part of the data layer, not the caller
+_INTERNAL_FILES = {"db.py", "query_stats.py", "query_service.py", "prefetch.py", "threading.py"}
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str):
+    """(id, normalized text): comments, whitespace and inline literals folded away."""
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _LITERAL_RE.sub("?", text)
+    text = _SPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], text
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)  # skip _caller and QueryStats.span
+    while frame is not None and os.path.basename(frame.f_code.co_filename) in _INTERNAL_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+class LatencyHistogram:
+    """Millisecond latencies counted in LATENCY_BUCKETS_MS buckets (not thread-safe: lock around it)."""
+
+    __slots__ = ("buckets", "count", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        i = 0
+        while i < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def copy(self) -> "LatencyHistogram":
+        h = LatencyHistogram()
+        h.buckets, h.count, h.sum_ms, h.max_ms = list(self.buckets), self.count, self.sum_ms, self.max_ms
+        return h
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket bound holding the q-quantile (max_ms for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+class _QueryEntry:
+    __slots__ = ("text", "total", "connect", "execute", "rows", "errors", "last_error", "callers")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.total = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.execute = LatencyHistogram()
+        self.rows = 0
+        self.errors = 0
+        self.last_error = None
+        self.callers = Counter()
+
+
+class QuerySpan:
+    """One query in flight: db.py calls connected() after the pool checkout and finish() once."""
+
+    __slots__ = ("_stats", "sql", "caller", "_start", "_connected")
+
+    def __init__(self, stats, sql: str, caller: str):
+        self._stats = stats
+        self.sql = sql
+        self.caller = caller
+        self._start = time.perf_counter()
+        self._connected = None
+
+    def connected(self) -> None:
+        self._connected = time.perf_counter()
+
+    def finish(self, rows: int = None, error: str = None) -> None:
+        end = time.perf_counter()
+        connected = self._connected or end
+        self._stats._record(self, (connected - self._start) * 1000, (end - connected) * 1000, rows, error)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def connected(self) -> None:
+        pass
+
+    def finish(self, rows: int = None, error: str = None) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class QueryStats:
+    """Thread-safe in-memory query statistics plus the slow-query log."""
+
+    def __init__(self, enabled: bool = True, slow_ms: float = 200, slow_log_path: str = None,
+                 slow_log_bytes: int = 1_000_000, slow_log_backups: int = 3):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._entries = {}  # fingerprint id -> _QueryEntry
+        self._fingerprints = {}  # sql text -> (id, normalized text), so each text is parsed once
+        self._observers = []
+        self._started = time.time()
+        self._slow_log = None
+        self._slow_log_args = (slow_log_path, slow_log_bytes, slow_log_backups)
+
+    def span(self, sql: str):
+        """Start timing a query (a no-op span when disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return QuerySpan(self, sql, _caller())
+
+    def add_observer(self, callback) -> None:
+        """callback(record dict) after every query, on the thread that ran it. Keep it cheap."""
+        with self._lock:
+            self._observers.append(callback)
+
+    def remove_observer(self, callback) -> None:
+        with self._lock:
+            if callback in self._observers:
+                self._observers.remove(callback)
+
+    def _record(self, span: QuerySpan, connect_ms: float, execute_ms: float, rows, error) -> None:
+        fp = self._fingerprints.get(span.sql)
+        if fp is None:
+            if len(self._fingerprints) > _MAX_TEXTS:
+                self._fingerprints.clear()  # queries built with inline values; keep memory bounded
+            fp = self._fingerprints.setdefault(span.sql, fingerprint(span.sql))
+        fp_id, text = fp
+        total_ms = connect_ms + execute_ms
+        with self._lock:
+            entry = self._entries.get(fp_id)
+            if entry is None:
+                entry = self._entries[fp_id] = _QueryEntry(text)
+            entry.total.add(total_ms)
+            entry.connect.add(connect_ms)
+            entry.execute.add(execute_ms)
+            entry.callers[span.caller] += 1
+            if rows is not None and rows > 0:
+                entry.rows += rows
+            if error is not None:
+                entry.errors += 1
+                entry.last_error = error
+            observers = list(self._observers)
+        record = None
+        if observers or total_ms >= self.slow_ms:
+            record = {
+                "fingerprint": fp_id, "query": text, "caller": span.caller,
+                "total_ms": round(total_ms, 2), "connect_ms": round(connect_ms, 2),
+                "execute_ms": round(execute_ms, 2), "rows": rows, "error": error,
+            }
+        if total_ms >= self.slow_ms:
+            self._log_slow(record)
+        for callback in observers:
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"Query stats observer error:\n{e}")
+
+    def _log_slow(self, record: dict) -> None:
+        logger = self._slow_logger()
+        if logger is not None:
+            logger.info(json.dumps(dict(record, ts=time.strftime("%Y-%m-%dT%H:%M:%S"), thread=threading.current_thread().name)))
+
+    def _slow_logger(self):
+        path, max_bytes, backups = self._slow_log_args
+        if self._slow_log is None and path:
+            with self._lock:
+                if self._slow_log is None:
+                    logger = logging.getLogger("offline_lan.slow_queries")
+                    logger.propagate = False
+                    logger.setLevel(logging.INFO)
+                    try:
+                        handler = logging.handlers.RotatingFileHandler(
+                            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+                    except OSError as e:
+                        print(f"Slow query log error:\n{e}")
+                        self._slow_log_args = (None, max_bytes, backups)
+                        return None
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                    self._slow_log = logger
+        return self._slow_log
+
+    def snapshot(self) -> dict:
+        """Per-fingerprint stats, most total time first."""
+        with self._lock:
+            queries = [
+                {
+                    "fingerprint": fp_id,
+                    "query": e.text,
+                    "calls": e.total.count,
+                    "errors": e.errors,
+                    "last_error": e.last_error,
+                    "rows": e.rows,
+                    "total": e.total.as_dict(),
+                    "connect": e.connect.as_dict(),
+                    "execute": e.execute.as_dict(),
+                    "callers": dict(e.callers.most_common(10)),
+                }
+                for fp_id, e in self._entries.items()
+            ]
+        queries.sort(key=lambda q: q["total"]["sum_ms"], reverse=True)
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "calls": sum(q["calls"] for q in queries),
+            "errors": sum(q["errors"] for q in queries),
+            "queries": queries,
+        }
+
+    def histograms(self) -> list:
+        """[(fingerprint, query, total LatencyHistogram copy, errors)] for exporters."""
+        with self._lock:
+            result = []
+            for fp_id, e in self._entries.items():
+                result.append((fp_id, e.text, e.total.copy(), e.errors))
+            return result
+
+    def dump(self, path: str) -> bool:
+        """Write snapshot() as JSON. Returns False (and prints the error) on failure."""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2, default=str)
+            return True
+        except OSError as e:
+            print(f"Query stats dump error:\n{e}")
+            return False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._started = time.time()
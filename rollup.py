@@ -0,0 +1,128 @@
+# rollup.py
+"""
+Consistency check and rebuild for public.transaction_summary, the per-cashier/per-day
+rollup kept current by the statement-level triggers in schema.py.
+
+    python rollup.py check [YYYY-MM-DD [YYYY-MM-DD]]
+    python rollup.py rebuild [YYYY-MM-DD [YYYY-MM-DD]]
+
+Without dates every day is checked/rebuilt; with one date only that day.
+"""
+
+import sys
+
+import db
+
+_METRICS = tuple(db.LEDGER_METRICS.values())
+
+
+def _date_filter(column: str) -> str:
+    # %s placeholders: date_from, date_from, date_to, date_to (NULL = open-ended).
+    # Half-open on the raw column (date or timestamp), so its index stays usable.
+    return f"(%s::date IS NULL OR {column} >= %s::date) AND (%s::date IS NULL OR {column} < %s::date + 1)"
+
+
+def _ledger_totals_sql() -> str:
+    sums = ",\n".join(
+        f"COALESCE(SUM(amount) FILTER (WHERE transaction_type = '{t}'), 0) AS {m}"
+        for t, m in db.LEDGER_METRICS.items()
+    )
+    return f"""
+        SELECT cashier_id, transaction_date::date AS summary_date,
+        {sums}
+        FROM public.transactions
+        WHERE {_date_filter("transaction_date")}
+        GROUP BY cashier_id, transaction_date::date
+    """
+
+
+def check(date_from=None, date_to=None) -> list | None:
+    """
+    Compare summary rows with totals recomputed from the ledger.
+    Returns a list of mismatches [{"cashier_id", "summary_date", "metric", "summary", "ledger"}, ...]
+    (empty when consistent), or None if the query failed.
+    """
+    if date_from is not None and date_to is None:
+        date_to = date_from
+    diff = " OR ".join(f"COALESCE(s.{m}, 0) <> COALESCE(l.{m}, 0)" for m in _METRICS)
+    cols = ", ".join(f"COALESCE(s.{m}, 0), COALESCE(l.{m}, 0)" for m in _METRICS)
+    params = (date_from, date_from, date_to, date_to)
+    conn = db.get_pool().getconn()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                WITH l AS ({_ledger_totals_sql()}),
+                s AS (
+                    SELECT * FROM public.transaction_summary
+                    WHERE {_date_filter("summary_date")}
+                )
+                SELECT COALESCE(s.cashier_id, l.cashier_id), COALESCE(s.summary_date, l.summary_date), {cols}
+                FROM s FULL JOIN l ON l.cashier_id = s.cashier_id AND l.summary_date = s.summary_date
+                WHERE {diff}
+                ORDER BY 2, 1;
+                """,
+                params + params,
+            )
+            rows = cur.fetchall()
+    except Exception as e:
+        print(f"Rollup check error:\n{e}")
+        return None
+    finally:
+        db.get_pool().putconn(conn)
+
+    mismatches = []
+    for r in rows:
+        for i, m in enumerate(_METRICS):
+            summary, ledger = r[2 + 2 * i], r[3 + 2 * i]
+            if summary != ledger:
+                mismatches.append({
+                    "cashier_id": r[0],
+                    "summary_date": r[1],
+                    "metric": m,
+                    "summary": summary,
+                    "ledger": ledger,
+                })
+    return mismatches
+
+
+def rebuild(date_from=None, date_to=None) -> bool:
+    """
+    Recompute summary rows from the ledger in one transaction. Ledger writers are
+    blocked (SHARE lock) for the duration so no delta is lost.
+    """
+    if date_from is not None and date_to is None:
+        date_to = date_from
+    params = (date_from, date_from, date_to, date_to)
+    metrics = ", ".join(_METRICS)
+    return db.execute(
+        f"""
+        LOCK TABLE public.transactions IN SHARE MODE;
+        DELETE FROM public.transaction_summary WHERE {_date_filter("summary_date")};
+        INSERT INTO public.transaction_summary (cashier_id, summary_date, {metrics})
+        SELECT cashier_id, summary_date, {metrics} FROM ({_ledger_totals_sql()}) l;
+        """,
+        params + params,
+    )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] not in ("check", "rebuild"):
+        print(__doc__)
+        sys.exit(2)
+    dates = (args[1:] + [None, None])[:2]
+    if args[0] == "check":
+        result = check(*dates)
+        if result is None:
+            sys.exit(1)
+        for m in result:
+            print(f"{m['summary_date']} cashier {m['cashier_id']} {m['metric']}: "
+                  f"summary={m['summary']} ledger={m['ledger']}")
+        print("Summary is consistent." if not result else f"{len(result)} mismatches.")
+        sys.exit(0 if not result else 1)
+    ok = rebuild(*dates)
+    print("Summary rebuilt." if ok else f"Rebuild failed: {db.get_last_error()}")
+    sys.exit(0 if ok else 1)
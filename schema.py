@@ -0,0 +1,830 @@
+# schema.py
+"""
+Database schema for the ledger and related tables (adapted from
+PYSIDE6_POSTGRESQL_MIGRATION_GUIDE.md: cashiers are rows in public.users).
+
+Run once on the server (safe to re-run; every step is idempotent):
+    python schema.py
+"""
+
+import db
+from fight_state import BETTING_OPEN, EVENT_TRANSITIONS, FIGHT_STATE_CHANNEL, FIGHT_TRANSITIONS, SETTLEMENT_TRANSITIONS
+from pool_totals import POOL_SLOTS
+
+def _summary_upsert(delta_source: str, on_conflict: str = None) -> str:
+    """
+    SQL folding ledger rows (cashier_id, transaction_date, transaction_type, amount) from
+    delta_source into public.transaction_summary, adding to existing per-cashier/per-day rows.
+    """
+    metrics = list(db.LEDGER_METRICS.values())
+    sums = ",\n".join(
+        f"COALESCE(SUM(amount) FILTER (WHERE transaction_type = '{t}'), 0)"
+        for t in db.LEDGER_METRICS
+    )
+    if on_conflict is None:
+        on_conflict = "DO UPDATE SET " + ", ".join(
+            f"{m} = ts.{m} + EXCLUDED.{m}" for m in metrics
+        ) + ", updated_at = CURRENT_TIMESTAMP"
+    return f"""
+        INSERT INTO public.transaction_summary AS ts (cashier_id, summary_date, {", ".join(metrics)})
+        SELECT cashier_id, transaction_date::date, {sums}
+        FROM ({delta_source}) AS d (cashier_id, transaction_date, transaction_type, amount)
+        GROUP BY cashier_id, transaction_date::date
+        -- Fixed lock order so concurrent statements cannot deadlock on summary rows
+        ORDER BY cashier_id, transaction_date::date
+        ON CONFLICT (cashier_id, summary_date) {on_conflict};
+    """
+
+
+def _notify_user_status(row: str) -> str:
+    """PL/pgSQL statement sending the same 'status' payload as db._notify_user_changes for a users row variable."""
+    return f"""
+        PERFORM pg_notify('{db.USER_CHANGES_CHANNEL}', json_build_object(
+            'op', 'status', 'user_id', {row}.user_id, 'username', {row}.username, 'name', {row}.name,
+            'role', {row}.role, 'is_active', {row}.is_active, 'last_active', {row}.last_active
+        )::text);
+    """
+
+
+def _sql_list(values) -> str:
+    """SQL list literal: ('a', 'b')."""
+    return "(" + ", ".join(f"'{v}'" for v in values) + ")"
+
+
+def _transition_pairs(transitions: dict) -> str:
+    """Allowed (from, to) status pairs of a transition table, as SQL row literals."""
+    return ", ".join(f"('{a}', '{b}')" for a, targets in transitions.items() for b in targets)
+
+
+# Ordered (name, sql) steps. Each runs in its own transaction.
+SCHEMA_STEPS = [
+    ("cashier_status", """
+        CREATE TABLE IF NOT EXISTS public.cashier_status (
+            cashier_id INTEGER PRIMARY KEY REFERENCES public.users(user_id) ON DELETE CASCADE,
+            battery_percentage INTEGER CHECK (battery_percentage >= 0 AND battery_percentage <= 100),
+            last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """),
+    ("transactions", """
+        CREATE TABLE IF NOT EXISTS public.transactions (
+            id BIGSERIAL PRIMARY KEY,
+            cashier_id INTEGER NOT NULL REFERENCES public.users(user_id) ON DELETE CASCADE,
+            transaction_type VARCHAR(20) NOT NULL CHECK (transaction_type IN
+                ('bet', 'cashin', 'cashout', 'draw', 'cancel', 'unclaimed', 'withdraw')),
+            amount NUMERIC(15, 2) NOT NULL,
+            transaction_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            reference_number VARCHAR(50) UNIQUE,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        -- Covering index for per-day ledger aggregates (rollup.py check/rebuild): index-only scan
+        CREATE INDEX IF NOT EXISTS idx_transactions_date_cashier
+            ON public.transactions (transaction_date, cashier_id) INCLUDE (transaction_type, amount);
+        CREATE INDEX IF NOT EXISTS idx_transactions_cashier_id ON public.transactions (cashier_id);
+    """),
+    ("transaction_summary", """
+        CREATE TABLE IF NOT EXISTS public.transaction_summary (
+            cashier_id INTEGER NOT NULL REFERENCES public.users(user_id) ON DELETE CASCADE,
+            summary_date DATE NOT NULL,
+            total_bets NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            cash_in NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            cash_out NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            draw_bets NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            cancel_bets NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            unclaimed NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            withdraw NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            coh NUMERIC(15, 2) GENERATED ALWAYS AS (cash_in - cash_out - withdraw) STORED,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (cashier_id, summary_date)
+        );
+        CREATE INDEX IF NOT EXISTS idx_transaction_summary_date ON public.transaction_summary (summary_date);
+    """),
+    ("transaction_summary_rollup", """
+        CREATE OR REPLACE FUNCTION public.transaction_summary_rollup()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                """ + _summary_upsert("SELECT cashier_id, transaction_date, transaction_type, amount FROM new_rows") + """
+            ELSIF TG_OP = 'DELETE' THEN
+                """ + _summary_upsert("SELECT cashier_id, transaction_date, transaction_type, -amount FROM old_rows") + """
+            ELSE
+                """ + _summary_upsert(
+                    "SELECT cashier_id, transaction_date, transaction_type, amount FROM new_rows"
+                    " UNION ALL "
+                    "SELECT cashier_id, transaction_date, transaction_type, -amount FROM old_rows"
+                ) + """
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Transition tables allow only one event per trigger, hence three triggers
+        DROP TRIGGER IF EXISTS transaction_summary_ins ON public.transactions;
+        DROP TRIGGER IF EXISTS transaction_summary_upd ON public.transactions;
+        DROP TRIGGER IF EXISTS transaction_summary_del ON public.transactions;
+        CREATE TRIGGER transaction_summary_ins AFTER INSERT ON public.transactions
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION public.transaction_summary_rollup();
+        CREATE TRIGGER transaction_summary_upd AFTER UPDATE ON public.transactions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION public.transaction_summary_rollup();
+        CREATE TRIGGER transaction_summary_del AFTER DELETE ON public.transactions
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION public.transaction_summary_rollup();
+
+        -- Backfill on first install (the trigger lock above keeps writers out until commit)
+        """ + _summary_upsert(
+            "SELECT cashier_id, transaction_date, transaction_type, amount FROM public.transactions",
+            on_conflict="DO NOTHING",
+        ) + """
+    """),
+    ("user_sessions", """
+        CREATE TABLE IF NOT EXISTS public.user_sessions (
+            session_id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES public.users(user_id) ON DELETE CASCADE,
+            terminal VARCHAR(100),
+            login_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            logout_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_user_sessions_open
+            ON public.user_sessions (user_id) WHERE logout_at IS NULL;
+    """),
+    ("app_login", """
+        -- Login/logout in one round trip each (db.start_session / db.end_session).
+        -- The bcrypt check stays in the client; app_login only proceeds if the hash the
+        -- client verified is still the stored one.
+        CREATE OR REPLACE FUNCTION public.app_login(p_user_id INTEGER, p_password_hash TEXT, p_terminal TEXT)
+        RETURNS TABLE (session_id BIGINT, user_id INTEGER, username TEXT, name TEXT, role TEXT) AS $$
+        #variable_conflict use_column
+        DECLARE
+            u public.users%ROWTYPE;
+            new_session BIGINT;
+        BEGIN
+            UPDATE public.users AS x
+            SET last_active = CURRENT_TIME, is_active = TRUE
+            WHERE x.user_id = p_user_id AND x.password_hash = p_password_hash
+            RETURNING x.* INTO u;
+            IF NOT FOUND THEN
+                RETURN;
+            END IF;
+            -- Sessions left open by a crash or power loss end at the next login
+            UPDATE public.user_sessions AS s SET logout_at = CURRENT_TIMESTAMP
+            WHERE s.user_id = p_user_id AND s.logout_at IS NULL;
+            INSERT INTO public.user_sessions (user_id, terminal)
+            VALUES (p_user_id, p_terminal)
+            RETURNING user_sessions.session_id INTO new_session;
+            """ + _notify_user_status("u") + """
+            RETURN QUERY SELECT new_session, u.user_id, u.username::TEXT, u.name::TEXT, u.role::TEXT;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION public.app_logout(p_user_id INTEGER, p_session_id BIGINT)
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            u public.users%ROWTYPE;
+        BEGIN
+            UPDATE public.users AS x
+            SET is_active = FALSE, last_active = CURRENT_TIME
+            WHERE x.user_id = p_user_id
+            RETURNING x.* INTO u;
+            IF NOT FOUND THEN
+                RETURN FALSE;
+            END IF;
+            UPDATE public.user_sessions AS s SET logout_at = CURRENT_TIMESTAMP
+            WHERE s.user_id = p_user_id AND s.logout_at IS NULL
+              AND (p_session_id IS NULL OR s.session_id = p_session_id);
+            """ + _notify_user_status("u") + """
+            RETURN TRUE;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+    ("fights", """
+        -- Betting is accepted while a fight is 'open' or 'last_call' (fight_state.BETTING_OPEN)
+        CREATE TABLE IF NOT EXISTS public.fights (
+            fight_id BIGSERIAL PRIMARY KEY,
+            event_date DATE NOT NULL DEFAULT CURRENT_DATE,
+            fight_number INTEGER NOT NULL,
+            status VARCHAR(12) NOT NULL DEFAULT 'pending' CHECK (status IN
+                ('pending', 'open', 'last_call', 'closed', 'settled', 'cancelled')),
+            min_bet NUMERIC(15, 2) NOT NULL DEFAULT 20,
+            max_bet NUMERIC(15, 2),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (event_date, fight_number)
+        );
+    """),
+    ("bet_tickets", """
+        CREATE TABLE IF NOT EXISTS public.bet_tickets (
+            ticket_id BIGSERIAL PRIMARY KEY,
+            -- Client-generated idempotency key (bet_engine.new_reference); also the ledger row's reference
+            reference_number VARCHAR(50) NOT NULL UNIQUE,
+            ticket_number VARCHAR(50) NOT NULL,
+            fight_id BIGINT NOT NULL REFERENCES public.fights(fight_id),
+            cashier_id INTEGER NOT NULL REFERENCES public.users(user_id) ON DELETE CASCADE,
+            terminal VARCHAR(100),
+            side VARCHAR(5) NOT NULL CHECK (side IN ('meron', 'wala', 'draw')),
+            amount NUMERIC(15, 2) NOT NULL CHECK (amount > 0),
+            status VARCHAR(10) NOT NULL DEFAULT 'open' CHECK (status IN
+                ('open', 'won', 'lost', 'refunded', 'cancelled')),
+            placed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        -- Per-fight pool totals and settlement scan one fight's tickets by side
+        CREATE INDEX IF NOT EXISTS idx_bet_tickets_fight
+            ON public.bet_tickets (fight_id, side) INCLUDE (amount, status);
+        CREATE INDEX IF NOT EXISTS idx_bet_tickets_cashier ON public.bet_tickets (cashier_id);
+    """),
+    ("fight_pool_slots", """
+        -- Running pool totals per fight and side, sharded over POOL_SLOTS rows (pool_totals.py):
+        -- each connection adds its bets to its own slot, so terminals do not queue on one
+        -- row lock at last call. Slot -1 holds what the compactor has folded in.
+        CREATE TABLE IF NOT EXISTS public.fight_pool_slots (
+            fight_id BIGINT NOT NULL REFERENCES public.fights(fight_id) ON DELETE CASCADE,
+            side VARCHAR(5) NOT NULL,
+            slot SMALLINT NOT NULL,
+            total NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            bets INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (fight_id, side, slot)
+        );
+
+        CREATE OR REPLACE FUNCTION public.compact_fight_pools(p_fight_id BIGINT DEFAULT NULL)
+        RETURNS INTEGER AS $$
+        DECLARE
+            folded INTEGER;
+        BEGIN
+            -- Slots locked by bets in flight are skipped (folded on the next pass)
+            WITH taken AS (
+                DELETE FROM public.fight_pool_slots s
+                WHERE (s.fight_id, s.side, s.slot) IN (
+                    SELECT x.fight_id, x.side, x.slot FROM public.fight_pool_slots x
+                    WHERE x.slot >= 0 AND (p_fight_id IS NULL OR x.fight_id = p_fight_id)
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING s.fight_id, s.side, s.total, s.bets
+            ), merged AS (
+                -- Runs to completion although unreferenced (data-modifying CTE)
+                INSERT INTO public.fight_pool_slots AS p (fight_id, side, slot, total, bets)
+                SELECT fight_id, side, -1, SUM(total), SUM(bets) FROM taken
+                GROUP BY fight_id, side
+                ORDER BY fight_id, side
+                ON CONFLICT (fight_id, side, slot)
+                DO UPDATE SET total = p.total + EXCLUDED.total, bets = p.bets + EXCLUDED.bets
+            )
+            SELECT COUNT(*) INTO folded FROM taken;
+            RETURN folded;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Backfill on first install: tickets booked before the slots existed
+        INSERT INTO public.fight_pool_slots (fight_id, side, slot, total, bets)
+        SELECT fight_id, side, -1, SUM(amount), COUNT(*) FROM public.bet_tickets
+        WHERE status <> 'cancelled'
+        GROUP BY fight_id, side
+        ON CONFLICT (fight_id, side, slot) DO NOTHING;
+    """),
+    ("place_bet", """
+        -- One short transaction per bet (bet_engine.place_bet): ticket + 'bet' ledger row.
+        -- Idempotent on p_reference: a retried submission returns the ticket already booked.
+        CREATE OR REPLACE FUNCTION public.place_bet(
+            p_reference TEXT, p_fight_id BIGINT, p_cashier_id INTEGER, p_side TEXT,
+            p_amount NUMERIC, p_terminal TEXT, p_ticket_number TEXT DEFAULT NULL)
+        RETURNS TABLE (outcome TEXT, ticket_id BIGINT, ticket_number TEXT, reason TEXT) AS $$
+        #variable_conflict use_column
+        DECLARE
+            t public.bet_tickets%ROWTYPE;
+            f public.fights%ROWTYPE;
+            new_id BIGINT;
+        BEGIN
+            SELECT * INTO t FROM public.bet_tickets b WHERE b.reference_number = p_reference;
+            IF FOUND THEN
+                RETURN QUERY SELECT
+                    CASE WHEN t.fight_id = p_fight_id AND t.cashier_id = p_cashier_id
+                              AND t.side = p_side AND t.amount = p_amount
+                         THEN 'duplicate' ELSE 'conflict' END,
+                    t.ticket_id, t.ticket_number::TEXT, NULL::TEXT;
+                RETURN;
+            END IF;
+
+            -- FOR SHARE: closing the fight (an UPDATE of its row) waits for bets in flight,
+            -- and no bet passes this check once the close has committed
+            SELECT * INTO f FROM public.fights x WHERE x.fight_id = p_fight_id FOR SHARE;
+            IF NOT FOUND THEN
+                RETURN QUERY SELECT 'rejected', NULL::BIGINT, NULL::TEXT, 'unknown fight';
+                RETURN;
+            END IF;
+            IF f.status NOT IN ('open', 'last_call') THEN
+                RETURN QUERY SELECT 'rejected', NULL::BIGINT, NULL::TEXT, 'betting is ' || f.status;
+                RETURN;
+            END IF;
+            IF p_amount < f.min_bet OR (f.max_bet IS NOT NULL AND p_amount > f.max_bet) THEN
+                RETURN QUERY SELECT 'rejected', NULL::BIGINT, NULL::TEXT, 'amount outside the fight limits';
+                RETURN;
+            END IF;
+
+            new_id := nextval(pg_get_serial_sequence('public.bet_tickets', 'ticket_id'));
+            INSERT INTO public.bet_tickets AS b
+                (ticket_id, reference_number, ticket_number, fight_id, cashier_id, terminal, side, amount)
+            VALUES (new_id, p_reference, COALESCE(p_ticket_number, new_id::TEXT), p_fight_id,
+                    p_cashier_id, p_terminal, p_side, p_amount)
+            ON CONFLICT (reference_number) DO NOTHING
+            RETURNING b.* INTO t;
+            IF NOT FOUND THEN
+                -- The same reference was booked concurrently (a retry racing the original)
+                SELECT * INTO t FROM public.bet_tickets b WHERE b.reference_number = p_reference;
+                RETURN QUERY SELECT 'duplicate', t.ticket_id, t.ticket_number::TEXT, NULL::TEXT;
+                RETURN;
+            END IF;
+
+            INSERT INTO public.transactions (cashier_id, transaction_type, amount, reference_number, notes)
+            VALUES (p_cashier_id, 'bet', p_amount, p_reference, 'fight ' || p_fight_id || ' ' || p_side);
+            -- One slot per connection: a terminal's bets never wait on another terminal's slot
+            INSERT INTO public.fight_pool_slots AS p (fight_id, side, slot, total, bets)
+            VALUES (p_fight_id, p_side, pg_backend_pid() % """ + str(POOL_SLOTS) + """, p_amount, 1)
+            ON CONFLICT (fight_id, side, slot)
+            DO UPDATE SET total = p.total + EXCLUDED.total, bets = p.bets + 1;
+            RETURN QUERY SELECT 'placed', t.ticket_id, t.ticket_number::TEXT, NULL::TEXT;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+    ("settlement", """
+        ALTER TABLE public.fights ADD COLUMN IF NOT EXISTS result VARCHAR(9)
+            CHECK (result IN ('meron', 'wala', 'draw', 'cancelled'));
+        ALTER TABLE public.bet_tickets ADD COLUMN IF NOT EXISTS payout NUMERIC(15, 2);
+        ALTER TABLE public.bet_tickets ADD COLUMN IF NOT EXISTS settlement_id BIGINT;
+        ALTER TABLE public.bet_tickets ADD COLUMN IF NOT EXISTS paid_at TIMESTAMP;
+        ALTER TABLE public.bet_tickets ADD COLUMN IF NOT EXISTS paid_by INTEGER
+            REFERENCES public.users(user_id) ON DELETE SET NULL;
+        CREATE INDEX IF NOT EXISTS idx_bet_tickets_settlement
+            ON public.bet_tickets (settlement_id) WHERE settlement_id IS NOT NULL;
+        -- Ledger rows written by a settlement (and their reversal counter-entries)
+        ALTER TABLE public.transactions ADD COLUMN IF NOT EXISTS settlement_id BIGINT;
+        CREATE INDEX IF NOT EXISTS idx_transactions_settlement
+            ON public.transactions (settlement_id) WHERE settlement_id IS NOT NULL;
+
+        CREATE TABLE IF NOT EXISTS public.fight_settlements (
+            settlement_id BIGSERIAL PRIMARY KEY,
+            fight_id BIGINT NOT NULL REFERENCES public.fights(fight_id) ON DELETE CASCADE,
+            result VARCHAR(9) NOT NULL,
+            commission_rate NUMERIC(6, 4) NOT NULL,
+            draw_multiplier NUMERIC(6, 2) NOT NULL,
+            payout_ratio NUMERIC(12, 6),
+            tickets INTEGER NOT NULL DEFAULT 0,
+            winners INTEGER NOT NULL DEFAULT 0,
+            gross NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            payouts NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            refunds NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            house NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            settled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            reversed_at TIMESTAMP,
+            reverse_reason TEXT
+        );
+        -- At most one settlement in force per fight; reversed ones stay for the audit trail
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_fight_settlements_active
+            ON public.fight_settlements (fight_id) WHERE reversed_at IS NULL;
+
+        CREATE OR REPLACE FUNCTION public.reverse_settlement(p_fight_id BIGINT, p_reason TEXT DEFAULT NULL)
+        RETURNS BIGINT AS $$
+        DECLARE
+            s_id BIGINT;
+            paid INTEGER;
+        BEGIN
+            PERFORM 1 FROM public.fights WHERE fight_id = p_fight_id FOR UPDATE;
+            SELECT settlement_id INTO s_id FROM public.fight_settlements
+            WHERE fight_id = p_fight_id AND reversed_at IS NULL;
+            IF s_id IS NULL THEN
+                RETURN NULL;
+            END IF;
+            SELECT COUNT(*) INTO paid FROM public.bet_tickets
+            WHERE settlement_id = s_id AND paid_at IS NOT NULL;
+            IF paid > 0 THEN
+                RAISE EXCEPTION 'Cannot reverse: % ticket(s) of this fight are already paid', paid;
+            END IF;
+            -- Counter-entries dated like the originals roll the cashier summaries back
+            INSERT INTO public.transactions
+                (cashier_id, transaction_type, amount, transaction_date, reference_number, notes, settlement_id)
+            SELECT cashier_id, transaction_type, -amount, transaction_date, 'r' || substr(reference_number, 2),
+                   'reversal of settlement ' || s_id, s_id
+            FROM public.transactions
+            WHERE settlement_id = s_id AND reference_number LIKE 's%';
+            UPDATE public.bet_tickets SET status = 'open', payout = NULL, settlement_id = NULL
+            WHERE settlement_id = s_id;
+            UPDATE public.fight_settlements SET reversed_at = CURRENT_TIMESTAMP, reverse_reason = p_reason
+            WHERE settlement_id = s_id;
+            -- settled -> closed is refused outside settlement (fight_state.SETTLEMENT_TRANSITIONS)
+            PERFORM set_config('offline_lan.settlement', 'on', TRUE);
+            UPDATE public.fights SET status = 'closed', result = NULL WHERE fight_id = p_fight_id;
+            PERFORM set_config('offline_lan.settlement', 'off', TRUE);
+            RETURN s_id;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Whole fight in one transaction and a few set-based statements (settlement.py).
+        -- Re-running with the same result is a no-op while no ticket is left unsettled; a
+        -- different result (or unsettled tickets) reverses first.
+        CREATE OR REPLACE FUNCTION public.settle_fight(
+            p_fight_id BIGINT, p_result TEXT, p_commission NUMERIC, p_draw_multiplier NUMERIC)
+        RETURNS SETOF public.fight_settlements AS $$
+        DECLARE
+            f public.fights%ROWTYPE;
+            s public.fight_settlements%ROWTYPE;
+            win_total NUMERIC;
+            lose_total NUMERIC;
+            ratio NUMERIC;
+        BEGIN
+            -- Also waits for bets still in flight (they hold the fight row FOR SHARE)
+            SELECT * INTO f FROM public.fights WHERE fight_id = p_fight_id FOR UPDATE;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Unknown fight %', p_fight_id;
+            END IF;
+            IF f.status NOT IN ('closed', 'settled') THEN
+                RAISE EXCEPTION 'Fight % is %: close betting before settling', f.fight_number, f.status;
+            END IF;
+            SELECT * INTO s FROM public.fight_settlements
+            WHERE fight_id = p_fight_id AND reversed_at IS NULL;
+            IF FOUND THEN
+                -- A no-op only if every ticket is settled: unsettled ones change the pools, so
+                -- the whole fight is settled again (reversal refuses once tickets are paid)
+                IF s.result = p_result AND s.commission_rate = p_commission
+                   AND s.draw_multiplier = p_draw_multiplier
+                   AND NOT EXISTS (SELECT 1 FROM public.bet_tickets
+                                   WHERE fight_id = p_fight_id AND status = 'open') THEN
+                    RETURN NEXT s;
+                    RETURN;
+                END IF;
+                PERFORM public.reverse_settlement(p_fight_id,
+                    CASE WHEN s.result = p_result THEN 'resettled with unsettled tickets'
+                         ELSE 'corrected to ' || p_result END);
+            END IF;
+
+            IF p_result IN ('meron', 'wala') THEN
+                SELECT COALESCE(SUM(amount) FILTER (WHERE side = p_result), 0),
+                       COALESCE(SUM(amount) FILTER (WHERE side IN ('meron', 'wala') AND side <> p_result), 0)
+                INTO win_total, lose_total
+                FROM public.bet_tickets
+                WHERE fight_id = p_fight_id AND status = 'open';
+                -- Stake back plus the losing pool pro rata, less commission on the winnings
+                ratio := CASE WHEN win_total > 0 THEN 1 + lose_total * (1 - p_commission) / win_total END;
+            END IF;
+
+            INSERT INTO public.fight_settlements (fight_id, result, commission_rate, draw_multiplier, payout_ratio)
+            VALUES (p_fight_id, p_result, p_commission, p_draw_multiplier, round(ratio, 6))
+            RETURNING * INTO s;
+
+            -- Payouts are rounded down to the centavo (the remainder stays with the house)
+            WITH settled AS (
+                UPDATE public.bet_tickets b
+                SET settlement_id = s.settlement_id,
+                    status = CASE
+                        WHEN p_result = 'cancelled' THEN 'cancelled'
+                        WHEN b.side = p_result THEN 'won'
+                        WHEN p_result = 'draw' THEN 'refunded'
+                        ELSE 'lost' END,
+                    payout = CASE
+                        WHEN p_result = 'cancelled' THEN b.amount
+                        WHEN b.side = p_result AND p_result = 'draw' THEN floor(b.amount * p_draw_multiplier * 100) / 100
+                        WHEN b.side = p_result THEN floor(b.amount * ratio * 100) / 100
+                        WHEN p_result = 'draw' THEN b.amount
+                        ELSE 0 END
+                WHERE b.fight_id = p_fight_id AND b.status = 'open'
+                RETURNING b.ticket_id, b.cashier_id, b.status, b.amount, b.payout
+            ), ledger AS (
+                -- Winnings are owed until paid out ('unclaimed'); refunds count as draw/cancel bets
+                INSERT INTO public.transactions (cashier_id, transaction_type, amount, reference_number, notes, settlement_id)
+                SELECT cashier_id,
+                       CASE status WHEN 'won' THEN 'unclaimed' WHEN 'refunded' THEN 'draw' ELSE 'cancel' END,
+                       payout, 's' || s.settlement_id || ':' || ticket_id, 'settlement ' || s.settlement_id,
+                       s.settlement_id
+                FROM settled
+                WHERE payout > 0
+            )
+            UPDATE public.fight_settlements x
+            SET tickets = t.tickets, winners = t.winners, gross = t.gross, payouts = t.payouts,
+                refunds = t.refunds, house = t.gross - t.payouts - t.refunds
+            FROM (
+                SELECT COUNT(*) AS tickets,
+                       COUNT(*) FILTER (WHERE status = 'won') AS winners,
+                       COALESCE(SUM(amount), 0) AS gross,
+                       COALESCE(SUM(payout) FILTER (WHERE status = 'won'), 0) AS payouts,
+                       COALESCE(SUM(payout) FILTER (WHERE status IN ('refunded', 'cancelled')), 0) AS refunds
+                FROM settled
+            ) AS t
+            WHERE x.settlement_id = s.settlement_id
+            RETURNING x.* INTO s;
+
+            PERFORM set_config('offline_lan.settlement', 'on', TRUE);
+            UPDATE public.fights SET status = 'settled', result = p_result WHERE fight_id = p_fight_id;
+            PERFORM set_config('offline_lan.settlement', 'off', TRUE);
+            RETURN NEXT s;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Paying a settled ticket at a counter: cash out by the paying cashier, and the
+        -- winnings leave the selling cashier's unclaimed total
+        CREATE OR REPLACE FUNCTION public.pay_ticket(p_ticket_id BIGINT, p_cashier_id INTEGER)
+        RETURNS NUMERIC AS $$
+        DECLARE
+            t public.bet_tickets%ROWTYPE;
+        BEGIN
+            UPDATE public.bet_tickets
+            SET paid_at = CURRENT_TIMESTAMP, paid_by = p_cashier_id
+            WHERE ticket_id = p_ticket_id AND settlement_id IS NOT NULL AND paid_at IS NULL AND payout > 0
+            RETURNING * INTO t;
+            IF NOT FOUND THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO public.transactions (cashier_id, transaction_type, amount, reference_number, notes, settlement_id)
+            VALUES (p_cashier_id, 'cashout', t.payout, 'p' || t.ticket_id, 'payout ticket ' || t.ticket_number,
+                    t.settlement_id);
+            IF t.status = 'won' THEN
+                INSERT INTO public.transactions (cashier_id, transaction_type, amount, reference_number, notes, settlement_id)
+                VALUES (t.cashier_id, 'unclaimed', -t.payout, 'c' || t.ticket_id, 'claimed ticket ' || t.ticket_number,
+                        t.settlement_id);
+            END IF;
+            RETURN t.payout;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+    ("fight_state", """
+        -- Race days; fights belong to one (fight_state.create_fight creates it on first use)
+        CREATE TABLE IF NOT EXISTS public.events (
+            event_id BIGSERIAL PRIMARY KEY,
+            event_date DATE NOT NULL UNIQUE,
+            name VARCHAR(100),
+            status VARCHAR(10) NOT NULL DEFAULT 'scheduled' CHECK (status IN ('scheduled', 'live', 'ended')),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        ALTER TABLE public.fights ADD COLUMN IF NOT EXISTS event_id BIGINT REFERENCES public.events(event_id);
+        -- Set when betting closes, after the bets in flight have committed (see fight_state.close_stats)
+        ALTER TABLE public.fights ADD COLUMN IF NOT EXISTS closed_at TIMESTAMP;
+        ALTER TABLE public.fights ADD COLUMN IF NOT EXISTS close_wait_ms NUMERIC(10, 3);
+        -- Time the ticket row was written, inside place_bet's lock on the fight (placed_at is
+        -- the transaction start); existing tickets keep NULL
+        ALTER TABLE public.bet_tickets ADD COLUMN IF NOT EXISTS accepted_at TIMESTAMP;
+        ALTER TABLE public.bet_tickets ALTER COLUMN accepted_at SET DEFAULT clock_timestamp()::timestamp;
+
+        INSERT INTO public.events (event_date)
+        SELECT DISTINCT event_date FROM public.fights WHERE event_id IS NULL
+        ON CONFLICT (event_date) DO NOTHING;
+        UPDATE public.fights f SET event_id = e.event_id
+        FROM public.events e
+        WHERE f.event_id IS NULL AND e.event_date = f.event_date;
+
+        CREATE TABLE IF NOT EXISTS public.fight_state_log (
+            log_id BIGSERIAL PRIMARY KEY,
+            fight_id BIGINT NOT NULL REFERENCES public.fights(fight_id) ON DELETE CASCADE,
+            from_status VARCHAR(12),
+            to_status VARCHAR(12) NOT NULL,
+            changed_by INTEGER,
+            changed_at TIMESTAMP NOT NULL DEFAULT clock_timestamp()::timestamp
+        );
+        CREATE INDEX IF NOT EXISTS idx_fight_state_log_fight ON public.fight_state_log (fight_id, log_id);
+
+        -- The state machine (fight_state.FIGHT_TRANSITIONS, SETTLEMENT_TRANSITIONS). A close takes the fight row lock,
+        -- so it waits here for the bets in flight (they hold it FOR SHARE) and closed_at
+        -- comes after every accepted bet.
+        CREATE OR REPLACE FUNCTION public.fight_state_guard()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NEW.status <> 'pending' THEN
+                    RAISE EXCEPTION 'A new fight must be pending, not %', NEW.status;
+                END IF;
+                IF NEW.event_id IS NULL THEN
+                    INSERT INTO public.events (event_date) VALUES (NEW.event_date)
+                    ON CONFLICT (event_date) DO UPDATE SET event_date = EXCLUDED.event_date
+                    RETURNING event_id INTO NEW.event_id;
+                END IF;
+                RETURN NEW;
+            END IF;
+            IF NEW.status IS NOT DISTINCT FROM OLD.status THEN
+                RETURN NEW;
+            END IF;
+            IF (OLD.status, NEW.status) IN (""" + _transition_pairs(SETTLEMENT_TRANSITIONS) + """) THEN
+                -- Raised by settle_fight / reverse_settlement around their own update only
+                IF current_setting('offline_lan.settlement', TRUE) IS DISTINCT FROM 'on' THEN
+                    RAISE EXCEPTION 'Fight % goes from % to % only through settlement', OLD.fight_number,
+                        OLD.status, NEW.status;
+                END IF;
+            ELSIF (OLD.status, NEW.status) NOT IN (""" + _transition_pairs(FIGHT_TRANSITIONS) + """) THEN
+                RAISE EXCEPTION 'Fight % cannot go from % to %', OLD.fight_number, OLD.status, NEW.status;
+            END IF;
+            IF NEW.status = 'open' THEN
+                UPDATE public.events SET status = 'live' WHERE event_id = NEW.event_id AND status = 'scheduled';
+                IF EXISTS (SELECT 1 FROM public.events WHERE event_id = NEW.event_id AND status = 'ended') THEN
+                    RAISE EXCEPTION 'The event of fight % has ended', NEW.fight_number;
+                END IF;
+            END IF;
+            IF NEW.status = 'closed' AND OLD.status IN """ + _sql_list(BETTING_OPEN) + """ THEN
+                NEW.closed_at := clock_timestamp()::timestamp;
+                NEW.close_wait_ms := EXTRACT(EPOCH FROM clock_timestamp() - statement_timestamp()) * 1000;
+            ELSIF NEW.status IN """ + _sql_list(BETTING_OPEN) + """ THEN
+                NEW.closed_at := NULL;
+                NEW.close_wait_ms := NULL;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_fights_state_guard ON public.fights;
+        CREATE TRIGGER trg_fights_state_guard
+        BEFORE INSERT OR UPDATE OF status ON public.fights
+        FOR EACH ROW EXECUTE FUNCTION public.fight_state_guard();
+
+        -- Log every change and push it to every terminal (delivered on commit)
+        CREATE OR REPLACE FUNCTION public.fight_state_notify()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            prev TEXT := CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END;
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO public.fight_state_log (fight_id, from_status, to_status, changed_by)
+            VALUES (NEW.fight_id, prev, NEW.status,
+                    NULLIF(current_setting('offline_lan.user_id', TRUE), '')::INTEGER);
+            PERFORM pg_notify('""" + FIGHT_STATE_CHANNEL + """', json_build_object(
+                'kind', 'fight', 'fight_id', NEW.fight_id, 'event_id', NEW.event_id,
+                'fight_number', NEW.fight_number, 'status', NEW.status, 'from', prev,
+                'result', NEW.result, 'at', EXTRACT(EPOCH FROM clock_timestamp())
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_fights_state_notify ON public.fights;
+        CREATE TRIGGER trg_fights_state_notify
+        AFTER INSERT OR UPDATE OF status ON public.fights
+        FOR EACH ROW EXECUTE FUNCTION public.fight_state_notify();
+
+        CREATE OR REPLACE FUNCTION public.event_state_guard()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.status IS NOT DISTINCT FROM OLD.status THEN
+                RETURN NEW;
+            END IF;
+            IF (OLD.status, NEW.status) NOT IN (""" + _transition_pairs(EVENT_TRANSITIONS) + """) THEN
+                RAISE EXCEPTION 'Event cannot go from % to %', OLD.status, NEW.status;
+            END IF;
+            IF NEW.status = 'ended' AND EXISTS (
+                SELECT 1 FROM public.fights WHERE event_id = NEW.event_id AND status IN """ + _sql_list(BETTING_OPEN) + """
+            ) THEN
+                RAISE EXCEPTION 'Close betting on every fight before ending the event';
+            END IF;
+            PERFORM pg_notify('""" + FIGHT_STATE_CHANNEL + """', json_build_object(
+                'kind', 'event', 'event_id', NEW.event_id, 'event_date', NEW.event_date,
+                'status', NEW.status, 'from', OLD.status, 'at', EXTRACT(EPOCH FROM clock_timestamp())
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_events_state_guard ON public.events;
+        CREATE TRIGGER trg_events_state_guard
+        BEFORE UPDATE OF status ON public.events
+        FOR EACH ROW EXECUTE FUNCTION public.event_state_guard();
+
+        -- Last line of defence for any writer other than place_bet (which rejects cleanly
+        -- first): no ticket row for a fight that is not taking bets. FOR SHARE, as in place_bet.
+        CREATE OR REPLACE FUNCTION public.bet_tickets_require_open()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM 1 FROM public.fights
+            WHERE fight_id = NEW.fight_id AND status IN """ + _sql_list(BETTING_OPEN) + """
+            FOR SHARE;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Betting is closed for fight %', NEW.fight_id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_bet_tickets_require_open ON public.bet_tickets;
+        CREATE TRIGGER trg_bet_tickets_require_open
+        BEFORE INSERT ON public.bet_tickets
+        FOR EACH ROW EXECUTE FUNCTION public.bet_tickets_require_open();
+
+        -- fight_state.transition: the user id reaches the log trigger through a setting
+        -- local to the transaction
+        CREATE OR REPLACE FUNCTION public.fight_transition(p_fight_id BIGINT, p_status TEXT, p_user_id INTEGER DEFAULT NULL)
+        RETURNS SETOF public.fights AS $$
+        BEGIN
+            IF p_status = 'settled' THEN
+                RAISE EXCEPTION 'Fights are settled through settle_fight';
+            END IF;
+            PERFORM set_config('offline_lan.user_id', COALESCE(p_user_id::TEXT, ''), TRUE);
+            RETURN QUERY UPDATE public.fights SET status = p_status WHERE fight_id = p_fight_id RETURNING *;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'Unknown fight %', p_fight_id;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+    ("ticket_blocks", """
+        -- Printed ticket numbers, leased to terminals in blocks (ticket_numbers.py): one row
+        -- update per block instead of one round trip per ticket
+        CREATE TABLE IF NOT EXISTS public.ticket_number_series (
+            series VARCHAR(20) PRIMARY KEY,
+            next_number BIGINT NOT NULL DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS public.ticket_blocks (
+            block_id BIGSERIAL PRIMARY KEY,
+            series VARCHAR(20) NOT NULL REFERENCES public.ticket_number_series(series),
+            terminal VARCHAR(100) NOT NULL,
+            first_number BIGINT NOT NULL,
+            last_number BIGINT NOT NULL,
+            leased_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            closed_at TIMESTAMP,
+            issued_through BIGINT,
+            close_reason VARCHAR(10) CHECK (close_reason IN ('exhausted', 'released', 'expired')),
+            CHECK (last_number >= first_number)
+        );
+        CREATE INDEX IF NOT EXISTS idx_ticket_blocks_open ON public.ticket_blocks (leased_at) WHERE closed_at IS NULL;
+        -- Numbers of a block that were never issued (or, for 'restart', not confirmed issued)
+        CREATE TABLE IF NOT EXISTS public.ticket_number_gaps (
+            gap_id BIGSERIAL PRIMARY KEY,
+            block_id BIGINT NOT NULL REFERENCES public.ticket_blocks(block_id) ON DELETE CASCADE,
+            first_number BIGINT NOT NULL,
+            last_number BIGINT NOT NULL,
+            reason VARCHAR(10) NOT NULL CHECK (reason IN ('restart', 'released', 'expired', 'void')),
+            recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (block_id, first_number, reason)
+        );
+
+        CREATE OR REPLACE FUNCTION public.lease_ticket_block(p_series TEXT, p_terminal TEXT, p_size INTEGER)
+        RETURNS public.ticket_blocks AS $$
+        DECLARE
+            b public.ticket_blocks%ROWTYPE;
+            first_n BIGINT;
+        BEGIN
+            IF p_size < 1 THEN
+                RAISE EXCEPTION 'Block size must be positive';
+            END IF;
+            INSERT INTO public.ticket_number_series (series) VALUES (p_series) ON CONFLICT (series) DO NOTHING;
+            -- The only shared row lock, held for one short statement per block
+            UPDATE public.ticket_number_series SET next_number = next_number + p_size
+            WHERE series = p_series
+            RETURNING next_number - p_size INTO first_n;
+            INSERT INTO public.ticket_blocks (series, terminal, first_number, last_number)
+            VALUES (p_series, p_terminal, first_n, first_n + p_size - 1)
+            RETURNING * INTO b;
+            RETURN b;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Idempotent (terminals replay it from their journal): returns the numbers voided
+        CREATE OR REPLACE FUNCTION public.close_ticket_block(p_block_id BIGINT, p_issued_through BIGINT, p_reason TEXT)
+        RETURNS BIGINT AS $$
+        DECLARE
+            b public.ticket_blocks%ROWTYPE;
+        BEGIN
+            UPDATE public.ticket_blocks
+            SET closed_at = CURRENT_TIMESTAMP, close_reason = p_reason,
+                issued_through = LEAST(last_number, GREATEST(first_number - 1, p_issued_through, issued_through))
+            WHERE block_id = p_block_id AND closed_at IS NULL
+            RETURNING * INTO b;
+            IF NOT FOUND OR b.issued_through >= b.last_number THEN
+                RETURN 0;
+            END IF;
+            INSERT INTO public.ticket_number_gaps (block_id, first_number, last_number, reason)
+            VALUES (b.block_id, b.issued_through + 1, b.last_number,
+                    CASE WHEN p_reason = 'expired' THEN 'expired' ELSE 'released' END)
+            ON CONFLICT (block_id, first_number, reason) DO NOTHING;
+            RETURN b.last_number - b.issued_through;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- Blocks of terminals that never came back: everything after the last number the
+        -- terminal reported is void
+        CREATE OR REPLACE FUNCTION public.expire_ticket_blocks(p_max_age INTERVAL)
+        RETURNS INTEGER AS $$
+        DECLARE
+            expired INTEGER := 0;
+            b RECORD;
+        BEGIN
+            FOR b IN
+                SELECT block_id, issued_through FROM public.ticket_blocks
+                WHERE closed_at IS NULL AND leased_at < CURRENT_TIMESTAMP - p_max_age
+                ORDER BY block_id
+                FOR UPDATE SKIP LOCKED
+            LOOP
+                PERFORM public.close_ticket_block(b.block_id, b.issued_through, 'expired');
+                expired := expired + 1;
+            END LOOP;
+            RETURN expired;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+]
+
+
+def ensure_schema() -> bool:
+    """Apply every schema step. Returns False (and prints the error) on the first failure."""
+    for name, sql in SCHEMA_STEPS:
+        if not db.execute(sql):
+            print(f"Schema step '{name}' failed: {db.get_last_error()}")
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    if ensure_schema():
+        print(f"Schema up to date ({len(SCHEMA_STEPS)} steps).")
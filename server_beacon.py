@@ -0,0 +1,33 @@
+# server_beacon.py
+"""
+LAN discovery beacon for the arena server. Answers the UDP broadcast that clients send
+when config.DB_DISCOVERY is on and DB_HOST cannot be resolved (see host_resolver.py).
+
+Run on the database server (next to PostgreSQL):
+    python server_beacon.py
+"""
+
+import socket
+
+import config
+from host_resolver import BEACON_QUERY, BEACON_REPLY
+
+
+def serve(port: int = None) -> None:
+    port = port or config.DB_DISCOVERY_PORT
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        reply = BEACON_REPLY + b" " + str(config.DB_PORT).encode()
+        print(f"Discovery beacon listening on UDP {port}")
+        while True:
+            data, addr = sock.recvfrom(256)
+            if data.strip() == BEACON_QUERY:
+                sock.sendto(reply, addr)
+
+
+if __name__ == "__main__":
+    try:
+        serve()
+    except KeyboardInterrupt:
+        pass
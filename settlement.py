@@ -0,0 +1,126 @@
+# settlement.py
+"""
+Fight settlement: one call to public.settle_fight (schema.py) settles every ticket of a
+fight in one transaction with set-based statements:
+
+  - winners get stake + losing pool pro rata, less config.SETTLE_COMMISSION on the winnings
+    (draw bets pay stake x config.SETTLE_DRAW_MULTIPLIER when the result is a draw),
+  - Meron/Wala bets are refunded on a draw, every bet on a cancelled fight,
+  - ledger rows per ticket ('unclaimed' winnings, 'draw'/'cancel' refunds) update the
+    cashier summaries shown by the Cashier Overview.
+
+Settling again with the same result does nothing unless tickets were left unsettled; with
+another result (a correction), or such tickets, the previous settlement is reversed first,
+in the same transaction. Reversal writes
+counter-entries, so the ledger keeps the full history.
+
+    python settlement.py settle FIGHT_ID meron|wala|draw|cancelled
+    python settlement.py reverse FIGHT_ID [REASON]
+    python settlement.py show FIGHT_ID
+"""
+
+import sys
+
+import config
+import db
+
+RESULTS = ("meron", "wala", "draw", "cancelled")
+
+_COLUMNS = ("settlement_id", "fight_id", "result", "commission_rate", "draw_multiplier", "payout_ratio",
+            "tickets", "winners", "gross", "payouts", "refunds", "house", "settled_at", "reversed_at",
+            "reverse_reason")
+_MONEY = ("commission_rate", "draw_multiplier", "payout_ratio", "gross", "payouts", "refunds", "house")
+
+
+def _settlement_dict(row) -> dict:
+    d = dict(zip(_COLUMNS, row))
+    for key in _MONEY:
+        if d[key] is not None:
+            d[key] = float(d[key])
+    return d
+
+
+def settle_fight(fight_id: int, result: str, commission: float = None, draw_multiplier: float = None):
+    """
+    Settle a closed fight (or re-settle a settled one). Returns the settlement dict
+    (see _COLUMNS), or None on error (see get_last_error(); nothing is written).
+    """
+    if result not in RESULTS:
+        return None
+    commission = config.SETTLE_COMMISSION if commission is None else commission
+    draw_multiplier = config.SETTLE_DRAW_MULTIPLIER if draw_multiplier is None else draw_multiplier
+    rows = db.execute_fetch(
+        f"SELECT {', '.join(_COLUMNS)} FROM public.settle_fight(%s, %s, %s, %s);",
+        (fight_id, result, commission, draw_multiplier)
+    )
+    return _settlement_dict(rows[0]) if rows else None
+
+
+def reverse_settlement(fight_id: int, reason: str = None):
+    """
+    Undo a fight's settlement (the fight goes back to 'closed'). Refused once any of its
+    tickets is paid. Returns the reversed settlement_id, False if the fight had none in
+    force, or None on error (see get_last_error()).
+    """
+    rows = db.execute_fetch("SELECT public.reverse_settlement(%s, %s);", (fight_id, reason))
+    if rows is None:
+        return None
+    return rows[0][0] or False
+
+
+def pay_ticket(ticket_id: int, cashier_id: int):
+    """
+    Pay out a settled ticket at cashier_id's counter (winnings or refund). Returns the amount
+    paid, False if there is nothing to pay (unsettled, lost or already paid), or None on error.
+    """
+    rows = db.execute_fetch("SELECT public.pay_ticket(%s, %s);", (ticket_id, cashier_id))
+    if rows is None:
+        return None
+    return float(rows[0][0]) if rows[0][0] is not None else False
+
+
+def fetch_settlement(fight_id: int):
+    """The settlement in force for a fight, or None if unsettled or on error."""
+    row = db.fetch_one(
+        f"""
+        SELECT {', '.join(_COLUMNS)} FROM public.fight_settlements
+        WHERE fight_id = %s AND reversed_at IS NULL;
+        """,
+        (fight_id,)
+    )
+    return _settlement_dict(row) if row else None
+
+
+def _print_settlement(s: dict) -> None:
+    ratio = f"{s['payout_ratio']:.4f}" if s["payout_ratio"] is not None else "-"
+    print(f"Fight {s['fight_id']}: {s['result']} (settlement {s['settlement_id']}, {s['settled_at']})")
+    print(f"  tickets {s['tickets']}, winners {s['winners']}, payout ratio {ratio}")
+    print(f"  gross {s['gross']:,.2f}  payouts {s['payouts']:,.2f}  refunds {s['refunds']:,.2f}  "
+          f"house {s['house']:,.2f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ("settle", "reverse", "show") or not args[1].isdigit() \
+            or (args[0] == "settle" and (len(args) < 3 or args[2] not in RESULTS)):
+        print(__doc__)
+        sys.exit(2)
+    fight = int(args[1])
+    if args[0] == "settle":
+        settled = settle_fight(fight, args[2])
+        if settled is None:
+            print(f"Settlement failed: {db.get_last_error()}")
+            sys.exit(1)
+        _print_settlement(settled)
+    elif args[0] == "reverse":
+        reversed_id = reverse_settlement(fight, " ".join(args[2:]) or None)
+        if reversed_id is None:
+            print(f"Reversal failed: {db.get_last_error()}")
+            sys.exit(1)
+        print(f"Settlement {reversed_id} reversed." if reversed_id else "Fight has no settlement in force.")
+    else:
+        settled = fetch_settlement(fight)
+        if settled is None:
+            print("Fight has no settlement in force.")
+        else:
+            _print_settlement(settled)
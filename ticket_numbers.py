@@ -0,0 +1,390 @@
+# ticket_numbers.py
+"""
+Printed ticket/receipt numbers without a round trip per ticket.
+
+Each terminal leases blocks of config.TICKET_BLOCK_SIZE consecutive numbers per series from
+the server (public.lease_ticket_block, schema.py "ticket_blocks" step: one row update per
+block) and issues them locally:
+
+    number = ticket_allocator().next_number()        # "ticket" series (bets)
+    number = ticket_allocator("card").next_number()  # printed transaction cards
+
+The next block is leased in the background before the current one runs out, so issuing
+never waits on the server in steady state.
+
+Crash safety: the lease is kept in a journal file (config.TICKET_JOURNAL), written before
+any number of it is issued. Numbers are reserved in steps of config.TICKET_RESERVE_STEP
+(one fsync per step); after a crash the terminal resumes after the last reserved step, so
+a number is never issued twice. Numbers that were never issued are recorded in
+public.ticket_number_gaps:
+  restart  - the reserved step in progress when the terminal stopped uncleanly (some of
+             these may have been issued: ticket_gap_report() counts the booked ones)
+  released - the rest of a block given back with release()
+  expired  - a block whose terminal never came back (expire_blocks(); may also hold
+             issued numbers, counted the same way)
+  void     - issued but not used (bet rejected, print cancelled): void(number)
+
+    python ticket_numbers.py report [SERIES]
+    python ticket_numbers.py expire [--days 7]
+"""
+
+import argparse
+import json
+import os
+import threading
+
+import config
+import db
+
+_BLOCK_COLUMNS = ("block_id", "series", "terminal", "first_number", "last_number", "leased_at", "closed_at",
+                  "issued_through", "close_reason")
+
+
+def lease_block(series: str, terminal: str, size: int):
+    """Lease the next size numbers of a series for terminal. Returns the block dict, or None on error."""
+    rows = db.execute_fetch(
+        f"SELECT {', '.join(_BLOCK_COLUMNS)} FROM public.lease_ticket_block(%s, %s, %s);",
+        (series, terminal, size)
+    )
+    return dict(zip(_BLOCK_COLUMNS, rows[0])) if rows else None
+
+
+def close_block(block_id: int, issued_through: int, reason: str):
+    """
+    Close a block; numbers after issued_through are recorded as a gap with reason.
+    Idempotent. Returns the gap size, or None on error.
+    """
+    rows = db.execute_fetch("SELECT public.close_ticket_block(%s, %s, %s);", (block_id, issued_through, reason))
+    return rows[0][0] if rows else None
+
+
+def record_gap(block_id: int, first: int, last: int, reason: str) -> bool:
+    """Record numbers first..last of a block as never issued (idempotent)."""
+    return db.execute(
+        """
+        INSERT INTO public.ticket_number_gaps (block_id, first_number, last_number, reason)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (block_id, first_number, reason) DO NOTHING;
+        """,
+        (block_id, first, last, reason)
+    )
+
+
+def expire_blocks(days: float = 7):
+    """Close blocks leased more than days ago and never closed. Returns how many, or None on error."""
+    rows = db.execute_fetch("SELECT public.expire_ticket_blocks(%s * INTERVAL '1 day');", (days,))
+    return rows[0][0] if rows else None
+
+
+def ticket_gap_report(series: str = None) -> list:
+    """
+    Gaps per series and terminal, newest first:
+    {"series", "terminal", "block_id", "first_number", "last_number", "reason", "recorded_at", "booked"}
+    booked: bet tickets of that terminal carrying a number of the gap (possible only for
+    'restart' and 'expired' gaps, whose numbers may have been issued before the terminal stopped).
+    """
+    rows = db.fetch_all(
+        """
+        SELECT b.series, b.terminal, g.block_id, g.first_number, g.last_number, g.reason, g.recorded_at,
+               (SELECT COUNT(*) FROM public.bet_tickets t
+                WHERE g.reason IN ('restart', 'expired') AND t.terminal = b.terminal
+                  AND t.ticket_number IN (SELECT n::TEXT FROM generate_series(g.first_number, g.last_number) AS n))
+        FROM public.ticket_number_gaps g
+        JOIN public.ticket_blocks b ON b.block_id = g.block_id
+        WHERE %s::TEXT IS NULL OR b.series = %s
+        ORDER BY g.recorded_at DESC, g.gap_id DESC;
+        """,
+        (series, series)
+    )
+    keys = ("series", "terminal", "block_id", "first_number", "last_number", "reason", "recorded_at", "booked")
+    return [dict(zip(keys, r)) for r in rows]
+
+
+def _replay(op: list) -> bool:
+    """
+    Make one journaled server call: ["close", block_id, issued_through, reason] or
+    ["gap", block_id, first, last, reason].
+    """
+    if op[0] == "close":
+        return close_block(*op[1:]) is not None
+    return record_gap(*op[1:])
+
+
+class TicketAllocator:
+    """
+    Thread-safe. Issues numbers from this terminal's leased block; see the module docstring.
+    next_number() returns None only when no block could be leased (server unreachable and
+    nothing left locally).
+    """
+
+    def __init__(self, series: str = "ticket", terminal: str = None, block_size: int = None,
+                 reserve_step: int = None, journal_path: str = None):
+        self.series = series
+        self.terminal = terminal or db.terminal_id()
+        self.block_size = block_size or config.TICKET_BLOCK_SIZE
+        self.reserve_step = max(1, min(reserve_step or config.TICKET_RESERVE_STEP, self.block_size))
+        self.journal_path = journal_path or config.TICKET_JOURNAL.format(series=series)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._block = None  # {"block_id", "first", "last"}
+        self._spare = None  # next block, leased ahead
+        self._previous = None  # last exhausted block (its numbers may still be voided)
+        self._next = None
+        self._reserved_from = None  # reserved step in progress: numbers up to _reserved_through
+        self._reserved_through = None
+        self._pending = []  # journaled server calls not yet made (see _replay)
+        self._syncing = False
+        self.stats = {"issued": 0, "leases": 0, "journal_writes": 0, "sync_waits": 0}
+
+    # ---------- issuing ----------
+
+    def next_number(self):
+        """Next number as a string (no round trip in steady state), or None if none can be issued."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._block is None or self._next > self._block["last"]:
+                if not self._advance():
+                    return None
+            n = self._next
+            if n > self._reserved_through:
+                self._reserved_from = n
+                self._reserved_through = min(self._block["last"], n + self.reserve_step - 1)
+                if not self._write_journal():
+                    # Not persisted: a crash could reissue these, so issue nothing
+                    self._reserved_through = n - 1
+                    return None
+            self._next = n + 1
+            self.stats["issued"] += 1
+            if (self._spare is None or self._pending) and self._block["last"] - n < self.block_size // 4:
+                self._start_sync()
+            return str(n)
+
+    def _advance(self) -> bool:
+        """Switch to the spare block (or lease one now). Lock held."""
+        if self._block is not None:
+            self._pending.append(["close", self._block["block_id"], self._block["last"], "exhausted"])
+            self._previous = self._block
+        block = self._spare
+        if block is None:
+            self.stats["sync_waits"] += 1
+            block = self._lease()
+            if block is None:
+                self._block = None
+                self._write_journal()
+                return False
+        self._block, self._spare = block, None
+        self._next = block["first"]
+        self._reserved_from, self._reserved_through = block["first"], block["first"] - 1
+        self._write_journal()
+        self._start_sync()
+        return True
+
+    def _lease(self):
+        leased = lease_block(self.series, self.terminal, self.block_size)
+        if leased is None:
+            return None
+        self.stats["leases"] += 1
+        return {"block_id": leased["block_id"], "first": leased["first_number"], "last": leased["last_number"]}
+
+    # ---------- background: lease ahead, replay pending server calls ----------
+
+    def _start_sync(self):
+        """Lock held."""
+        if not self._syncing:
+            self._syncing = True
+            threading.Thread(target=self._sync, name=f"ticket-blocks-{self.series}", daemon=True).start()
+
+    def _sync(self):
+        try:
+            if not db.is_online():
+                return
+            with self._lock:
+                pending = list(self._pending)
+                need_spare = self._spare is None
+            done = 0
+            for op in pending:
+                ok = _replay(op)
+                if not ok:
+                    break
+                done += 1
+            spare = self._lease() if need_spare else None
+            with self._lock:
+                for op in pending[:done]:
+                    if op in self._pending:
+                        self._pending.remove(op)
+                if spare is not None:
+                    if self._spare is None:
+                        self._spare = spare
+                    else:
+                        self._pending.append(["close", spare["block_id"], spare["first"] - 1, "released"])
+                if done or spare is not None:
+                    self._write_journal()
+        finally:
+            with self._lock:
+                self._syncing = False
+
+    # ---------- journal ----------
+
+    def _load(self):
+        """Resume the lease from the journal. Lock held."""
+        self._loaded = True
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ticket journal error:\n{e}")
+            return
+        if state.get("series") != self.series or state.get("terminal") != self.terminal:
+            return
+        self._block, self._spare = state.get("block"), state.get("spare")
+        self._pending = state.get("pending", [])
+        if self._block is not None:
+            reserved_from, reserved_through = state["reserved_from"], state["reserved_through"]
+            if reserved_through >= reserved_from:
+                # Stopped without close(): the reserved step may be partly unissued
+                self._pending.append(["gap", self._block["block_id"], reserved_from, reserved_through, "restart"])
+            self._next = reserved_through + 1
+            self._reserved_from, self._reserved_through = self._next, reserved_through
+            self._write_journal()
+        if self._pending or self._spare is None:
+            self._start_sync()
+
+    def _write_journal(self) -> bool:
+        """Atomically replace the journal (fsync'd). Lock held."""
+        state = {
+            "series": self.series, "terminal": self.terminal, "block": self._block, "spare": self._spare,
+            "reserved_from": self._reserved_from, "reserved_through": self._reserved_through,
+            "pending": self._pending,
+        }
+        tmp = f"{self.journal_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_path)
+        except OSError as e:
+            print(f"Ticket journal error:\n{e}")
+            return False
+        self.stats["journal_writes"] += 1
+        return True
+
+    def void(self, number) -> bool:
+        """
+        An issued number was not used (bet rejected, print cancelled): record it as a 'void'
+        gap. Numbers that are not from this allocator's current or previous block are ignored.
+        """
+        try:
+            n = int(number)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            block = next((b for b in (self._block, self._previous) if b and b["first"] <= n <= b["last"]), None)
+            if block is None or (block is self._block and n >= self._next):
+                return False
+            self._pending.append(["gap", block["block_id"], n, n, "void"])
+            self._write_journal()
+            self._start_sync()
+            return True
+
+    # ---------- shutdown ----------
+
+    def close(self) -> None:
+        """Clean shutdown: keep the lease for the next start without voiding the reserved step."""
+        with self._lock:
+            if not self._loaded or self._block is None:
+                return
+            self._reserved_from, self._reserved_through = self._next, self._next - 1
+            self._write_journal()
+
+    def release(self) -> bool:
+        """
+        Give the leased numbers back (terminal retired or reassigned): the unissued rest of the
+        blocks is recorded as 'released' gaps. Returns False if the server could not be told
+        (the journal is kept and replayed on the next start).
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._block is not None:
+                self._pending.append(["close", self._block["block_id"], self._next - 1, "released"])
+            if self._spare is not None:
+                self._pending.append(["close", self._spare["block_id"], self._spare["first"] - 1, "released"])
+            self._block = self._spare = None
+            done = 0
+            for op in self._pending:
+                ok = _replay(op)
+                if not ok:
+                    break
+                done += 1
+            del self._pending[:done]
+            if self._pending:
+                self._write_journal()
+                return False
+            try:
+                os.remove(self.journal_path)
+            except OSError:
+                pass
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            remaining = self._block["last"] - self._next + 1 if self._block is not None else 0
+            return dict(self.stats, block=self._block, spare=self._spare, remaining=remaining,
+                        pending=len(self._pending))
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def ticket_allocator(series: str = "ticket") -> TicketAllocator:
+    """Return this terminal's process-wide allocator for a series (created on first use)."""
+    with _allocators_lock:
+        if series not in _allocators:
+            _allocators[series] = TicketAllocator(series)
+        return _allocators[series]
+
+
+def close_allocators() -> None:
+    """Persist every allocator for a clean restart (on application exit)."""
+    with _allocators_lock:
+        allocators = list(_allocators.values())
+    for allocator in allocators:
+        allocator.close()
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Leased ticket number blocks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="list numbers never issued")
+    report.add_argument("series", nargs="?")
+    expire = sub.add_parser("expire", help="close blocks of terminals that never came back")
+    expire.add_argument("--days", type=float, default=7)
+    args = parser.parse_args()
+
+    if args.command == "expire":
+        closed = expire_blocks(args.days)
+        if closed is None:
+            print(f"Error: {db.get_last_error()}")
+            return
+        print(f"{closed} block(s) expired.")
+        return
+
+    gaps = ticket_gap_report(args.series)
+    if not gaps and not db.is_online():
+        print(f"Error: {db.get_last_error() or 'cannot read ticket gaps'}")
+        return
+    for g in gaps:
+        count = g["last_number"] - g["first_number"] + 1
+        booked = f", {g['booked']} booked" if g["booked"] else ""
+        print(f"{g['series']:<8} {g['terminal']:<20} {g['first_number']:>10}-{g['last_number']:<10} "
+              f"{count:>6} {g['reason']:<9}{booked}")
+    print(f"({len(gaps)} gaps)")
+
+
+if __name__ == "__main__":
+    _main()